@@ -1,6 +1,10 @@
+from typing import List
+
 class EmbeddingServiceBase:
     """Interface for embedding services."""
     
     def generate_embedding(self, text: str):
         raise NotImplementedError("Embedding service must implement `generate_embedding` method.")
 
+    def generate_embeddings(self, texts: List[str]):
+        raise NotImplementedError("Embedding service must implement `generate_embeddings` method.")
@@ -3,3 +3,6 @@ class SearchServiceBase:
 
     def search(self, query_embedding, k: int):
         raise NotImplementedError("Search service must implement `search` method.")
+
+    def search_batch(self, query_embeddings, ks):
+        raise NotImplementedError("Search service must implement `search_batch` method.")
@@ -1,4 +1,4 @@
-from typing import List
+from typing import AsyncIterator, List
 
 class SummarizationBase:
     """Interface for summarization services."""
@@ -6,3 +6,5 @@ class SummarizationBase:
     def summarize(self, docs: List[str], summarizer_choice: str) -> str:
         raise NotImplementedError("Summarization service must implement `summarize` method.")
 
+    def summarize_stream(self, docs: List[str], question: str) -> AsyncIterator[str]:
+        raise NotImplementedError("Summarization service must implement `summarize_stream` method.")
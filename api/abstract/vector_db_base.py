@@ -1,4 +1,4 @@
-from typing import List
+from typing import List, Optional
 
 class VectorDBBase:
     """Interface for vector database services."""
@@ -6,3 +6,9 @@ class VectorDBBase:
     def search(self, query_embedding, k: int) -> List[dict]:
         raise NotImplementedError("Vector database service must implement `search` method.")
 
+    def search_batch(self, query_embeddings, ks: List[int]) -> List[List[dict]]:
+        raise NotImplementedError("Vector database service must implement `search_batch` method.")
+
+    async def get_collection_version(self) -> Optional[str]:
+        """Returns a stamp that changes whenever the collection contents change, or None if unknown."""
+        return None
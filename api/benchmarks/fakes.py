@@ -0,0 +1,81 @@
+# benchmarks/fakes.py
+
+"""Deterministic stand-ins for the model and Qdrant, used by the microbenchmarks.
+
+Everything is derived from fixed seeds, so two runs do identical work and timing
+differences come from the code under test.
+"""
+
+import hashlib
+from typing import List
+
+import numpy as np
+from qdrant_client.http import models as qdrant_models
+
+from services.mmap_vector_service import ScoredHit
+
+DIM = 384
+SEED = 1234
+
+
+def make_texts(n: int, words: int = 80) -> List[str]:
+    """`n` distinct pseudo-sentences of about `words` words."""
+    rng = np.random.default_rng(SEED)
+    vocabulary = [f"word{i}" for i in range(2000)]
+    return [" ".join(vocabulary[j] for j in rng.integers(0, len(vocabulary), words)) for _ in range(n)]
+
+
+def make_hits(k: int) -> List[ScoredHit]:
+    """`k` search hits with realistic payload sizes, as returned by a vector backend."""
+    return [
+        ScoredHit(id=i, score=1.0 - i / (k + 1), payload={"text": text, "file_path": f"file_{i % 16}.csv"})
+        for i, text in enumerate(make_texts(k))
+    ]
+
+
+class FakeSentenceTransformer:
+    """Mimics `SentenceTransformer.encode` cost: a fixed per-call overhead plus a per-text projection."""
+
+    def __init__(self, model_name=None, cache_folder=None, dim: int = DIM):
+        rng = np.random.default_rng(SEED)
+        self.dim = dim
+        self.projection = rng.standard_normal((dim, dim)).astype(np.float32)
+        self.call_overhead = rng.standard_normal((64, dim)).astype(np.float32)
+
+    def _text_vector(self, text: str) -> np.ndarray:
+        seed = int.from_bytes(hashlib.blake2b(text.encode("utf-8"), digest_size=8).digest(), "little")
+        return np.random.default_rng(seed).standard_normal(self.dim).astype(np.float32)
+
+    def encode(self, texts):
+        single = isinstance(texts, str)
+        batch = np.stack([self._text_vector(text) for text in ([texts] if single else texts)])
+        np.tanh(self.call_overhead @ self.projection)  # Per-call work independent of batch size
+        embeddings = np.tanh(batch @ self.projection)
+        embeddings /= np.linalg.norm(embeddings, axis=1, keepdims=True)
+        return embeddings[0] if single else embeddings
+
+    def get_sentence_embedding_dimension(self) -> int:
+        return self.dim
+
+
+class FakeQdrantClient:
+    """In-process exact search over fixed random vectors, answering like `QdrantClient.search`."""
+
+    def __init__(self, points: int = 10000, dim: int = DIM):
+        rng = np.random.default_rng(SEED)
+        vectors = rng.standard_normal((points, dim)).astype(np.float32)
+        self.vectors = vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+        self.payloads = [{"text": text, "file_path": f"file_{i % 16}.csv"} for i, text in enumerate(make_texts(256))]
+
+    def search(self, collection_name: str, query_vector, limit: int, **kwargs):
+        scores = self.vectors @ np.asarray(query_vector, dtype=np.float32)
+        top = np.argpartition(-scores, limit)[:limit]
+        top = top[np.argsort(-scores[top])]
+        return [
+            qdrant_models.ScoredPoint(id=int(i), version=0, score=float(scores[i]),
+                                      payload=self.payloads[i % len(self.payloads)])
+            for i in top
+        ]
+
+    def search_batch(self, collection_name: str, requests, **kwargs):
+        return [self.search(collection_name, request.vector, request.limit) for request in requests]
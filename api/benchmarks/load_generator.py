@@ -0,0 +1,264 @@
+# benchmarks/load_generator.py
+
+"""Open-loop load generator for the search API.
+
+Requests are sent on a fixed schedule (or Poisson arrivals) at the target rate,
+whether or not earlier ones have completed, and latency is measured from each
+request's scheduled send time. A slow server therefore shows up as queueing in the
+percentiles instead of silently lowering the offered load (coordinated omission).
+Per-stage timings are read from the `Server-Timing` header the API returns.
+
+    python -m benchmarks.load_generator --url http://localhost:8000 --rps 20 --duration 30
+    python -m benchmarks.load_generator --stub --rps 50 --duration 30 --json report.json
+    python -m benchmarks.load_generator --requests recorded.jsonl --rps 10
+
+`--stub` starts `benchmarks.stub_app` (stubbed Qdrant and Gemini) in a subprocess
+and points the run at it.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import subprocess
+import sys
+import time
+from collections import Counter, defaultdict
+from typing import Dict, List, Optional
+
+import httpx
+
+QUESTIONS_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "questions.txt")
+PERCENTILES = (50, 90, 99, 99.9)
+
+
+def load_requests(requests_file: Optional[str], questions_file: Optional[str], k: int, summarizer: bool) -> List[dict]:
+    """Request bodies to replay: JSON lines from `requests_file`, else one request per question."""
+    if requests_file:
+        with open(requests_file, "r", encoding="utf-8") as f:
+            bodies = [json.loads(line) for line in f if line.strip()]
+        return [{"k": k, "summarizer": summarizer, **body} for body in bodies]
+    with open(questions_file or QUESTIONS_FILE, "r", encoding="utf-8") as f:
+        return [{"query": line.strip(), "k": k, "summarizer": summarizer} for line in f if line.strip()]
+
+
+def parse_server_timing(header: Optional[str]) -> Dict[str, float]:
+    """Parses `name;dur=12.3, other;dur=4` into seconds per metric name."""
+    timings = {}
+    for metric in (header or "").split(","):
+        name, _, params = metric.strip().partition(";")
+        for param in params.split(";"):
+            key, _, value = param.strip().partition("=")
+            if key == "dur" and name:
+                timings[name] = float(value) / 1000
+    return timings
+
+
+def percentile(sorted_values: List[float], p: float) -> float:
+    """Nearest-rank percentile of an ascending list."""
+    if not sorted_values:
+        return float("nan")
+    rank = max(1, int(-(-p * len(sorted_values) // 100)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+class LoadResult:
+    """Outcome of the requests of one run."""
+
+    def __init__(self):
+        self.latencies = []
+        self.service_times = []
+        self.stage_timings = defaultdict(list)
+        self.statuses = Counter()
+        self.errors = Counter()
+        self.dropped = 0
+        self.max_send_lag = 0.0
+        self.elapsed = 0.0
+
+    def record(self, status: int, latency: float, service_time: float, timings: Dict[str, float]):
+        self.statuses[status] += 1
+        if status == 200:
+            self.latencies.append(latency)
+            self.service_times.append(service_time)
+            for stage, seconds in timings.items():
+                self.stage_timings[stage].append(seconds)
+
+    def summary(self) -> dict:
+        def distribution(values):
+            values = sorted(values)
+            if not values:
+                return {"count": 0}
+            return {
+                "count": len(values),
+                "mean_ms": sum(values) / len(values) * 1000,
+                **{f"p{p:g}_ms": percentile(values, p) * 1000 for p in PERCENTILES},
+                "max_ms": values[-1] * 1000,
+            }
+
+        sent = sum(self.statuses.values()) + sum(self.errors.values())
+        return {
+            "sent": sent,
+            "ok": self.statuses.get(200, 0),
+            "statuses": {str(status): count for status, count in sorted(self.statuses.items())},
+            "errors": dict(self.errors),
+            "dropped": self.dropped,
+            "elapsed_seconds": self.elapsed,
+            "throughput_rps": self.statuses.get(200, 0) / self.elapsed if self.elapsed else 0.0,
+            "max_send_lag_ms": self.max_send_lag * 1000,
+            "latency": distribution(self.latencies),
+            "service_time": distribution(self.service_times),
+            "stages": {stage: distribution(values) for stage, values in sorted(self.stage_timings.items())},
+        }
+
+
+async def run_load(
+    client: httpx.AsyncClient,
+    bodies: List[dict],
+    rps: float,
+    duration: float,
+    endpoint: str = "/api/search",
+    warmup: float = 0.0,
+    poisson: bool = False,
+    max_in_flight: int = 1000,
+    timeout: float = 60.0,
+    seed: Optional[int] = None,
+) -> LoadResult:
+    """Offers `rps` requests per second for `warmup + duration` seconds; warm-up requests are not recorded."""
+    rng = random.Random(seed)
+    result = LoadResult()
+    in_flight = set()
+    loop = asyncio.get_running_loop()
+    start = loop.time()
+    measure_from = start + warmup
+    end = measure_from + duration
+
+    async def send(body: dict, scheduled: float, record: bool):
+        try:
+            response = await client.post(endpoint, json=body, timeout=timeout)
+            finished = loop.time()
+            if record:
+                timings = parse_server_timing(response.headers.get("server-timing"))
+                # Latency counts from the scheduled send time; service time is what the server reports.
+                result.record(response.status_code, finished - scheduled, timings.pop("total", float("nan")), timings)
+        except httpx.HTTPError as e:
+            if record:
+                result.errors[type(e).__name__] += 1
+
+    next_send = start
+    index = 0
+    while next_send < end:
+        now = loop.time()
+        if next_send > now:
+            await asyncio.sleep(next_send - now)
+        record = next_send >= measure_from
+        if record:
+            result.max_send_lag = max(result.max_send_lag, loop.time() - next_send)
+        if len(in_flight) >= max_in_flight:
+            if record:
+                result.dropped += 1
+        else:
+            task = asyncio.ensure_future(send(bodies[index % len(bodies)], next_send, record))
+            in_flight.add(task)
+            task.add_done_callback(in_flight.discard)
+        index += 1
+        next_send += rng.expovariate(rps) if poisson else 1.0 / rps
+
+    if in_flight:
+        await asyncio.gather(*in_flight)
+    result.elapsed = loop.time() - measure_from
+    return result
+
+
+def format_report(summary: dict, rps: float) -> str:
+    def row(name, stats):
+        if not stats["count"]:
+            return f"  {name:<16} {'-':>8}"
+        cells = "".join(f"{stats[f'p{p:g}_ms']:>10.1f}" for p in PERCENTILES)
+        return f"  {name:<16} {stats['count']:>8}{stats['mean_ms']:>10.1f}{cells}{stats['max_ms']:>10.1f}"
+
+    header = "".join(f"{f'p{p:g}':>10}" for p in PERCENTILES)
+    lines = [
+        f"Offered {rps:g} rps, completed {summary['ok']} of {summary['sent']} requests "
+        f"in {summary['elapsed_seconds']:.1f}s ({summary['throughput_rps']:.1f} rps)",
+        f"Statuses: {summary['statuses']}  errors: {summary['errors']}  dropped: {summary['dropped']}  "
+        f"max send lag: {summary['max_send_lag_ms']:.1f} ms",
+        "",
+        f"  {'(ms)':<16} {'count':>8}{'mean':>10}{header}{'max':>10}",
+        row("latency", summary["latency"]),
+        row("service time", summary["service_time"]),
+    ]
+    lines += [row(stage, stats) for stage, stats in summary["stages"].items()]
+    return "\n".join(lines)
+
+
+def start_stub_server(port: int) -> subprocess.Popen:
+    """Runs `benchmarks.stub_app` under uvicorn and waits until it answers /health."""
+    api_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "benchmarks.stub_app:app", "--port", str(port), "--log-level", "warning"],
+        cwd=api_dir,
+    )
+    deadline = time.monotonic() + 120
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"Stub server exited with code {process.returncode}")
+        try:
+            if httpx.get(f"http://127.0.0.1:{port}/health", timeout=1).status_code == 200:
+                return process
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.5)
+    process.terminate()
+    raise RuntimeError("Stub server did not become healthy within 120 seconds")
+
+
+async def main(args: argparse.Namespace) -> dict:
+    bodies = load_requests(args.requests, args.questions, args.k, args.summarizer)
+    limits = httpx.Limits(max_connections=args.max_in_flight, max_keepalive_connections=args.max_in_flight)
+    async with httpx.AsyncClient(base_url=args.url, limits=limits) as client:
+        result = await run_load(
+            client, bodies, args.rps, args.duration, endpoint=args.endpoint, warmup=args.warmup,
+            poisson=args.poisson, max_in_flight=args.max_in_flight, timeout=args.timeout, seed=args.seed,
+        )
+    summary = result.summary()
+    print(format_report(summary, args.rps))
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"config": vars(args), "results": summary}, f, indent=2)
+    return summary
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default="http://localhost:8000", help="Base URL of the API")
+    parser.add_argument("--endpoint", default="/api/search")
+    parser.add_argument("--rps", type=float, default=5.0, help="Offered requests per second")
+    parser.add_argument("--duration", type=float, default=10.0, help="Measured seconds")
+    parser.add_argument("--warmup", type=float, default=0.0, help="Seconds of load sent before measuring")
+    parser.add_argument("--poisson", action="store_true", help="Exponential inter-arrival times instead of a fixed interval")
+    parser.add_argument("--requests", help="JSON lines file of request bodies to replay")
+    parser.add_argument("--questions", help=f"Text file with one question per line (default {QUESTIONS_FILE})")
+    parser.add_argument("--k", type=int, default=30, help="k for requests that do not set it")
+    parser.add_argument("--summarizer", action="store_true", help="Request summaries when a body does not say")
+    parser.add_argument("--max-in-flight", type=int, default=1000, help="Requests beyond this many outstanding are dropped")
+    parser.add_argument("--timeout", type=float, default=60.0)
+    parser.add_argument("--seed", type=int)
+    parser.add_argument("--json", help="Also write the report to this file")
+    parser.add_argument("--stub", action="store_true", help="Start benchmarks.stub_app and run against it")
+    parser.add_argument("--stub-port", type=int, default=8001)
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    stub_server = None
+    if args.stub:
+        stub_server = start_stub_server(args.stub_port)
+        args.url = f"http://127.0.0.1:{args.stub_port}"
+    try:
+        asyncio.run(main(args))
+    finally:
+        if stub_server is not None:
+            stub_server.terminate()
+            stub_server.wait()
@@ -0,0 +1,273 @@
+# benchmarks/microbench.py
+
+"""Microbenchmarks of the search hot path with regression baselines.
+
+    python -m benchmarks.microbench run                                  # print timings
+    python -m benchmarks.microbench run --output benchmarks/baseline.json  # record a baseline
+    python -m benchmarks.microbench run --compare benchmarks/baseline.json # fail on regressions
+    python -m benchmarks.microbench compare old.json new.json --threshold 0.15
+
+Each benchmark is timed in `repeat` rounds of enough iterations to last at least
+`--min-time` seconds. The fastest round's per-call time is compared against the
+baseline, since slower rounds mostly measure interference from the rest of the machine.
+Baselines are only comparable on the machine that recorded them.
+"""
+
+import argparse
+import asyncio
+import datetime
+import inspect
+import json
+import os
+import platform
+import re
+import statistics
+import sys
+import tempfile
+import time
+from typing import Callable, Dict, List, Optional
+from unittest.mock import patch
+
+from threadpoolctl import threadpool_limits
+
+from benchmarks.fakes import FakeQdrantClient, FakeSentenceTransformer, make_hits, make_texts
+
+# name -> setup function returning the callable (or coroutine function) to time
+BENCHMARKS: Dict[str, Callable[[], Callable]] = {}
+
+
+def benchmark(name: str):
+    def register(setup: Callable[[], Callable]) -> Callable[[], Callable]:
+        BENCHMARKS[name] = setup
+        return setup
+    return register
+
+
+for _k in (5, 30, 100):
+    @benchmark(f"formatter.format_documents[k={_k}]")
+    def _format_documents(k=_k):
+        from services.document_formatter import DocumentFormatter
+
+        formatter, hits = DocumentFormatter(), make_hits(k)
+        return lambda: formatter.format_documents(hits)
+
+
+for _k in (5, 30, 100):
+    @benchmark(f"schema.SearchResponse.build[k={_k}]")
+    def _build_response(k=_k):
+        from services.document_formatter import DocumentFormatter
+        from services.schema import SearchResponse
+
+        documents = DocumentFormatter().format_documents(make_hits(k))
+        return lambda: SearchResponse(documents=documents, summary="A short summary of the documents.")
+
+    @benchmark(f"schema.SearchResponse.serialize[k={_k}]")
+    def _serialize_response(k=_k):
+        from services.document_formatter import DocumentFormatter
+        from services.schema import SearchResponse
+
+        response = SearchResponse(documents=DocumentFormatter().format_documents(make_hits(k)), summary="Summary.")
+        return response.model_dump_json
+
+
+def _embedding_service():
+    from services.sentence_transformer_service import SentenceTransformerEmbeddingService
+
+    with patch("services.sentence_transformer_service.SentenceTransformer", FakeSentenceTransformer):
+        return SentenceTransformerEmbeddingService()
+
+
+@benchmark("embedding.single")
+def _embed_single():
+    service, text = _embedding_service(), make_texts(1)[0]
+    return lambda: service.generate_embedding(text)
+
+
+@benchmark("embedding.concurrent_single[n=32]")
+def _embed_concurrent():
+    service, texts = _embedding_service(), make_texts(32)
+    return lambda: asyncio.gather(*(service.generate_embedding(text) for text in texts))
+
+
+@benchmark("embedding.batch[n=32]")
+def _embed_batch():
+    service, texts = _embedding_service(), make_texts(32)
+    return lambda: service.generate_embeddings(texts)
+
+
+@benchmark("qdrant.search[k=30]")
+def _qdrant_search():
+    from services.qdrant_service import QdrantService
+
+    with patch("services.qdrant_service.QdrantClient", lambda **kwargs: FakeQdrantClient()):
+        service = QdrantService()
+    query = FakeSentenceTransformer().encode("What is the capital of France?")
+    return lambda: service.search(query, 30)
+
+
+@benchmark("prompt.get_prompt")
+def _get_prompt():
+    from services.prompt_service import FilePromptService
+
+    with tempfile.NamedTemporaryFile("w", suffix=".txt", delete=False) as f:
+        f.write("Answer the question using only the documents.\n\nQuestion: $question\n\nDocuments:\n$documents\n")
+    try:
+        service = FilePromptService(f.name)
+    finally:
+        os.remove(f.name)
+    documents = "\n\n".join(make_texts(5))
+    return lambda: service.get_prompt(question="What is the capital of France?", documents=documents)
+
+
+def _timer(loop: asyncio.AbstractEventLoop, fn: Callable) -> Callable[[int], float]:
+    """Returns `time(number)` for `fn`, awaiting its result when it returns an awaitable."""
+    if not inspect.isawaitable(first := fn()):
+        def time_sync(number: int) -> float:
+            start = time.perf_counter()
+            for _ in range(number):
+                fn()
+            return time.perf_counter() - start
+        return time_sync
+
+    loop.run_until_complete(first)
+
+    async def calls(number: int) -> float:
+        start = time.perf_counter()
+        for _ in range(number):
+            await fn()
+        return time.perf_counter() - start
+
+    return lambda number: loop.run_until_complete(calls(number))
+
+
+def measure(fn: Callable, loop: asyncio.AbstractEventLoop, repeat: int = 5, min_time: float = 0.1) -> dict:
+    """Times `fn` in `repeat` rounds, each with enough calls to last at least `min_time` seconds."""
+    time_calls = _timer(loop, fn)
+    number = 1
+    while (elapsed := time_calls(number)) < min_time:
+        number = max(number * 2, int(number * min_time / max(elapsed, 1e-9) * 1.2))
+    per_call = sorted(time_calls(number) / number for _ in range(repeat))
+    return {
+        "median_ns": statistics.median(per_call) * 1e9,
+        "min_ns": per_call[0] * 1e9,
+        "number": number,
+        "repeat": repeat,
+    }
+
+
+def run(pattern: Optional[str] = None, repeat: int = 5, min_time: float = 0.1) -> dict:
+    from services.executors import shutdown_executors
+
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+    results = {}
+    # Services stay referenced until the end: the loop only holds weak references to their background tasks
+    benchmarked = []
+    # Single-threaded BLAS keeps the numpy work of the fakes from competing with the code under test
+    blas_limits = threadpool_limits(limits=1)
+    try:
+        for name, setup in BENCHMARKS.items():
+            if pattern and not re.search(pattern, name):
+                continue
+            benchmarked.append(setup())
+            results[name] = measure(benchmarked[-1], loop, repeat, min_time)
+            print(f"{name:<40} {format_ns(results[name]['min_ns']):>12}", flush=True)
+    finally:
+        # Stop background tasks the services started on the loop (e.g. the embedding batcher)
+        pending = asyncio.all_tasks(loop)
+        for task in pending:
+            task.cancel()
+        loop.run_until_complete(asyncio.gather(*pending, return_exceptions=True))
+        shutdown_executors()
+        loop.close()
+        blas_limits.restore_original_limits()
+    return {
+        "meta": {
+            "created": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "processor": platform.processor(),
+            "cpus": os.cpu_count(),
+        },
+        "results": results,
+    }
+
+
+def format_ns(ns: float) -> str:
+    for unit, scale in (("s", 1e9), ("ms", 1e6), ("us", 1e3)):
+        if ns >= scale:
+            return f"{ns / scale:.2f} {unit}"
+    return f"{ns:.0f} ns"
+
+
+def compare(baseline: dict, current: dict, threshold: float = 0.10) -> List[dict]:
+    """Compares the fastest per-call times; a change beyond `threshold` is a regression or improvement."""
+    rows = []
+    for name in sorted(set(baseline["results"]) | set(current["results"])):
+        old, new = baseline["results"].get(name), current["results"].get(name)
+        if old is None or new is None:
+            rows.append({"name": name, "status": "new" if old is None else "missing",
+                         "baseline_ns": old and old["min_ns"], "current_ns": new and new["min_ns"], "change": None})
+            continue
+        change = new["min_ns"] / old["min_ns"] - 1
+        status = "regressed" if change > threshold else "improved" if change < -threshold else "ok"
+        rows.append({"name": name, "status": status, "baseline_ns": old["min_ns"], "current_ns": new["min_ns"],
+                     "change": change})
+    return rows
+
+
+def print_comparison(rows: List[dict], threshold: float):
+    print(f"\n{'benchmark':<40} {'baseline':>12} {'current':>12} {'change':>9}  (threshold {threshold:.0%})")
+    for row in rows:
+        baseline = format_ns(row["baseline_ns"]) if row["baseline_ns"] is not None else "-"
+        current = format_ns(row["current_ns"]) if row["current_ns"] is not None else "-"
+        change = f"{row['change']:+.1%}" if row["change"] is not None else "-"
+        print(f"{row['name']:<40} {baseline:>12} {current:>12} {change:>9}  {row['status']}")
+
+
+def _load(path: str) -> dict:
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest="command", required=True)
+    run_parser = commands.add_parser("run", help="Run the benchmarks")
+    run_parser.add_argument("-k", "--filter", help="Only run benchmarks whose name matches this regex")
+    run_parser.add_argument("--repeat", type=int, default=5)
+    run_parser.add_argument("--min-time", type=float, default=0.1, help="Minimum seconds per timing round")
+    run_parser.add_argument("--output", help="Write the results (e.g. a new baseline) to this JSON file")
+    run_parser.add_argument("--compare", help="Baseline JSON file to compare the results against")
+    run_parser.add_argument("--threshold", type=float, default=0.10, help="Relative slowdown counted as a regression")
+    compare_parser = commands.add_parser("compare", help="Compare two result files")
+    compare_parser.add_argument("baseline")
+    compare_parser.add_argument("current")
+    compare_parser.add_argument("--threshold", type=float, default=0.10)
+    args = parser.parse_args(argv)
+
+    if args.command == "run":
+        current = run(args.filter, args.repeat, args.min_time)
+        if args.output:
+            with open(args.output, "w", encoding="utf-8") as f:
+                json.dump(current, f, indent=2)
+        if not args.compare:
+            return 0
+        baseline = _load(args.compare)
+        if args.filter:
+            baseline = {**baseline, "results": {name: result for name, result in baseline["results"].items()
+                                                if re.search(args.filter, name)}}
+    else:
+        baseline, current = _load(args.baseline), _load(args.current)
+
+    rows = compare(baseline, current, args.threshold)
+    print_comparison(rows, args.threshold)
+    regressions = [row["name"] for row in rows if row["status"] == "regressed"]
+    if regressions:
+        print(f"\n{len(regressions)} benchmark(s) regressed by more than {args.threshold:.0%}: {', '.join(regressions)}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
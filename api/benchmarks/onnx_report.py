@@ -0,0 +1,156 @@
+# benchmarks/onnx_report.py
+
+"""Compares the ONNX Runtime embedding backend with PyTorch: parity, latency and throughput.
+
+    python -m benchmarks.onnx_report                                # SENTENCE_TRANSFORMER, export if needed
+    python -m benchmarks.onnx_report --model all-MiniLM-L6-v2 --export --json onnx.json
+    python -m benchmarks.onnx_report --texts recorded_queries.txt --batch-size 32 --threads 4
+
+Every backend encodes the same texts (one per line, by default the load-test questions):
+
+- parity: cosine similarity of each embedding with the PyTorch one, and how many of
+  each text's 10 nearest neighbours among the texts are unchanged;
+- latency: per-call percentiles of single-text encodes, as for a query;
+- throughput: texts per second when encoding batches of `--batch-size`.
+
+All backends get the same number of intra-op threads. Exits with status 1 when a
+variant's minimum cosine similarity is below `--min-cosine`.
+"""
+
+import argparse
+import functools
+import json
+import os
+import sys
+import time
+from typing import Callable, Dict, List
+
+import numpy as np
+
+from benchmarks.load_generator import QUESTIONS_FILE, percentile
+from services.onnx_embedding_service import (
+    MODEL_FILES,
+    OnnxEncoder,
+    cosine_similarities,
+    default_model_dir,
+    export_onnx_model,
+)
+
+NEIGHBOURS = 10
+
+
+def neighbour_overlap(reference: np.ndarray, candidate: np.ndarray, k: int = NEIGHBOURS) -> float:
+    """Mean fraction of each text's `k` nearest other texts that both embeddings agree on."""
+    def nearest(embeddings):
+        embeddings = embeddings / np.linalg.norm(embeddings, axis=1, keepdims=True)
+        similarities = embeddings @ embeddings.T
+        np.fill_diagonal(similarities, -np.inf)
+        return np.argsort(-similarities, axis=1)[:, :k]
+
+    k = min(k, len(reference) - 1)
+    if k < 1:
+        return float("nan")
+    return float(np.mean([len(set(a) & set(b)) / k for a, b in zip(nearest(reference), nearest(candidate))]))
+
+
+def parity(reference: np.ndarray, candidate: np.ndarray) -> dict:
+    similarities = cosine_similarities(reference, candidate)
+    return {
+        "min_cosine": float(similarities.min()),
+        "mean_cosine": float(similarities.mean()),
+        "max_abs_diff": float(np.abs(np.asarray(reference) - np.asarray(candidate)).max()),
+        f"top{NEIGHBOURS}_overlap": neighbour_overlap(np.asarray(reference), np.asarray(candidate)),
+    }
+
+
+def latency(encode: Callable, texts: List[str], min_time: float) -> dict:
+    """Single-text encode latency percentiles over at least `min_time` seconds of calls."""
+    encode(texts[0])
+    timings = []
+    deadline = time.perf_counter() + min_time
+    while time.perf_counter() < deadline or len(timings) < len(texts):
+        text = texts[len(timings) % len(texts)]
+        start = time.perf_counter()
+        encode(text)
+        timings.append(time.perf_counter() - start)
+    timings.sort()
+    return {"calls": len(timings), **{f"p{p}_ms": percentile(timings, p) * 1000 for p in (50, 90, 99)}}
+
+
+def throughput(encode: Callable, texts: List[str], batch_size: int, min_time: float) -> dict:
+    """Texts per second when encoding consecutive batches of `batch_size` texts."""
+    batches = [texts[i:i + batch_size] for i in range(0, len(texts), batch_size)]
+    encode(batches[0])
+    encoded = 0
+    start = time.perf_counter()
+    while (elapsed := time.perf_counter() - start) < min_time or encoded < len(texts):
+        batch = batches[(encoded // batch_size) % len(batches)]
+        encode(batch)
+        encoded += len(batch)
+    return {"texts": encoded, "texts_per_second": encoded / elapsed}
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--model", default=os.getenv("SENTENCE_TRANSFORMER"), help="Sentence-transformer model name")
+    parser.add_argument("--cache-folder", default=os.getenv("TRANSFORMERS_CACHE", "/tmp/cache"))
+    parser.add_argument("--model-dir", default=os.getenv("ONNX_MODEL_DIR"), help="ONNX export directory")
+    parser.add_argument("--export", action="store_true", help="Re-export even when an export exists")
+    parser.add_argument("--texts", default=QUESTIONS_FILE, help="Text file with one text per line")
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("--threads", type=int, default=1, help="Intra-op threads of every backend")
+    parser.add_argument("--min-time", type=float, default=3.0, help="Seconds spent per latency or throughput run")
+    parser.add_argument("--min-cosine", type=float, default=0.99, help="Lowest acceptable cosine similarity")
+    parser.add_argument("--json", help="Also write the report to this file")
+    args = parser.parse_args(argv)
+    if not args.model:
+        parser.error("--model or SENTENCE_TRANSFORMER is required")
+
+    import torch
+    from sentence_transformers import SentenceTransformer
+
+    model_dir = args.model_dir or default_model_dir(args.model, args.cache_folder)
+    if args.export or not all(os.path.exists(os.path.join(model_dir, name)) for name in MODEL_FILES.values()):
+        export_onnx_model(args.model, args.cache_folder, model_dir, quantize=True)
+    with open(args.texts, "r", encoding="utf-8") as f:
+        texts = [line.strip() for line in f if line.strip()]
+
+    torch.set_num_threads(args.threads)
+    torch_model = SentenceTransformer(args.model, cache_folder=args.cache_folder, device="cpu")
+    backends: Dict[str, Callable] = {"torch": functools.partial(torch_model.encode, show_progress_bar=False)}
+    for variant in MODEL_FILES:
+        backends[f"onnx-{variant}"] = OnnxEncoder(model_dir, variant, num_threads=args.threads).encode
+
+    reference = np.asarray(backends["torch"](texts))
+    report = {"model": args.model, "model_dir": model_dir, "texts": len(texts), "batch_size": args.batch_size,
+              "threads": args.threads, "backends": {}}
+    for name, encode in backends.items():
+        report["backends"][name] = {
+            "parity": parity(reference, np.asarray(encode(texts))),
+            "latency": latency(encode, texts, args.min_time),
+            "throughput": throughput(encode, texts, args.batch_size, args.min_time),
+        }
+
+    print(f"{len(texts)} texts, batch size {args.batch_size}, {args.threads} thread(s)\n")
+    print(f"{'backend':<10} {'min cos':>9} {'mean cos':>9} {f'top{NEIGHBOURS}':>7} {'p50 ms':>8} {'p99 ms':>8} "
+          f"{'texts/s':>9} {'speedup':>8}")
+    torch_p50 = report["backends"]["torch"]["latency"]["p50_ms"]
+    for name, result in report["backends"].items():
+        print(f"{name:<10} {result['parity']['min_cosine']:>9.5f} {result['parity']['mean_cosine']:>9.5f} "
+              f"{result['parity'][f'top{NEIGHBOURS}_overlap']:>7.1%} {result['latency']['p50_ms']:>8.2f} "
+              f"{result['latency']['p99_ms']:>8.2f} {result['throughput']['texts_per_second']:>9.1f} "
+              f"{torch_p50 / result['latency']['p50_ms']:>7.2f}x")
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+    failing = [name for name, result in report["backends"].items()
+               if result["parity"]["min_cosine"] < args.min_cosine]
+    if failing:
+        print(f"\nBelow the minimum cosine similarity of {args.min_cosine}: {', '.join(failing)}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,125 @@
+# benchmarks/startup_report.py
+
+"""Reports how long the API takes to import and to build its services, and what that loads.
+
+Every measurement runs in a fresh interpreter so earlier imports cannot hide costs:
+
+    python -m benchmarks.startup_report                         # import time, RSS, heavy modules, top imports
+    python -m benchmarks.startup_report --build                 # also build the services (loads the model)
+    python -m benchmarks.startup_report --build --fake-backends # build with the benchmark fakes, offline
+    python -m benchmarks.startup_report --env VECTOR_DB_TYPE=mmap --json startup.json
+
+`--env` settings apply to the measured process, e.g. to compare backends.
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+from typing import Dict, List
+
+API_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HEAVY_MODULES = ("torch", "transformers", "sentence_transformers", "onnxruntime", "qdrant_client",
+                 "google.generativeai", "numpy", "sklearn", "scipy")
+
+
+def _rss_mb() -> float:
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2 ** 20
+    except OSError:
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024  # Peak, in KiB on Linux
+
+
+def _loaded_heavy_modules() -> List[str]:
+    return [name for name in HEAVY_MODULES if name in sys.modules]
+
+
+def measure_in_process(build: bool, fake_backends: bool) -> dict:
+    """Runs in the child interpreter: imports the app and optionally builds the services."""
+    report = {"baseline_rss_mb": _rss_mb()}
+    start_time = time.perf_counter()
+    import my_app  # noqa: F401
+    report["import"] = {"seconds": time.perf_counter() - start_time, "rss_mb": _rss_mb(),
+                        "heavy_modules": _loaded_heavy_modules()}
+    if build:
+        from contextlib import ExitStack
+        from unittest.mock import patch
+        from services.warmup import build_services
+
+        # Timed from here: importing the selected backends is part of building the services
+        start_time = time.perf_counter()
+        with ExitStack() as stack:
+            if fake_backends:
+                from benchmarks.fakes import FakeQdrantClient, FakeSentenceTransformer
+                import services.qdrant_service
+                import services.sentence_transformer_service
+                stack.enter_context(patch.object(services.sentence_transformer_service, "SentenceTransformer",
+                                                 FakeSentenceTransformer))
+                stack.enter_context(patch.object(services.qdrant_service, "QdrantClient",
+                                                 lambda **kwargs: FakeQdrantClient()))
+            build_services()
+            report["build"] = {"seconds": time.perf_counter() - start_time, "rss_mb": _rss_mb(),
+                               "heavy_modules": _loaded_heavy_modules()}
+    return report
+
+
+def top_imports(env: Dict[str, str], top: int) -> List[dict]:
+    """The modules with the largest cumulative import time under `python -X importtime`."""
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", "import my_app"],
+                            cwd=API_DIR, env=env, capture_output=True, text=True)
+    imports = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        self_us, cumulative_us, name = (part.strip() for part in line[len("import time:"):].split("|"))
+        imports.append({"module": name, "self_ms": int(self_us) / 1000, "cumulative_ms": int(cumulative_us) / 1000})
+    return sorted(imports, key=lambda entry: entry["cumulative_ms"], reverse=True)[:top]
+
+
+def main(argv=None) -> dict:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--build", action="store_true", help="Also build the services as the lifespan hook does")
+    parser.add_argument("--fake-backends", action="store_true", help="Build with the fake model and Qdrant client")
+    parser.add_argument("--env", action="append", default=[], metavar="KEY=VALUE", help="Environment override")
+    parser.add_argument("--top", type=int, default=15, help="Number of slowest imports to list")
+    parser.add_argument("--json", help="Also write the report to this file")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.child:
+        print(json.dumps(measure_in_process(args.build, args.fake_backends)))
+        return {}
+
+    env = {**os.environ, **dict(setting.split("=", 1) for setting in args.env)}
+    command = [sys.executable, "-m", "benchmarks.startup_report", "--child"]
+    command += ["--build"] * args.build + ["--fake-backends"] * args.fake_backends
+    start_time = time.perf_counter()
+    child = subprocess.run(command, cwd=API_DIR, env=env, capture_output=True, text=True)
+    wall_seconds = time.perf_counter() - start_time
+    if child.returncode != 0:
+        sys.stderr.write(child.stderr)
+        raise SystemExit(f"Measurement process failed with code {child.returncode}")
+    report = {"env": dict(setting.split("=", 1) for setting in args.env), "wall_seconds": wall_seconds,
+              **json.loads(child.stdout.strip().splitlines()[-1]), "top_imports": top_imports(env, args.top)}
+
+    print(f"Interpreter start to exit: {wall_seconds:.2f}s (baseline RSS {report['baseline_rss_mb']:.0f} MB)")
+    for phase in ("import", "build"):
+        if phase in report:
+            stats = report[phase]
+            print(f"{phase:<7} {stats['seconds']:>7.2f}s  RSS {stats['rss_mb']:>7.0f} MB  "
+                  f"heavy modules: {', '.join(stats['heavy_modules']) or '-'}")
+    print(f"\n{'module':<60} {'self ms':>10} {'cumulative ms':>14}")
+    for entry in report["top_imports"]:
+        print(f"{entry['module']:<60} {entry['self_ms']:>10.1f} {entry['cumulative_ms']:>14.1f}")
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    return report
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+# benchmarks/stub_app.py
+
+"""The search API with Qdrant and Gemini replaced by in-process stubs of configurable latency.
+
+Serves the real routes, handler, admission control, formatter and (unless
+STUB_EMBEDDINGS is set) the real embedding model, so load tests measure the API
+itself without a vector database or an LLM quota:
+
+    uvicorn benchmarks.stub_app:app --port 8001
+
+The response cache is disabled so every request runs the full pipeline.
+"""
+
+import asyncio
+import hashlib
+import os
+from typing import List
+
+import numpy as np
+
+from abstract.embedding_base import EmbeddingServiceBase
+from abstract.summarization_base import SummarizationBase
+from abstract.vector_db_base import VectorDBBase
+from my_app import app
+from services.mmap_vector_service import ScoredHit
+from services.search_service import SearchService
+from services.service_factory import (
+    get_embedding_service,
+    get_response_cache,
+    get_search_service,
+    get_summarization_service,
+)
+
+STUB_TEXT = ("Paris is the capital and most populous city of France, with an estimated population of "
+             "2,102,650 residents in January 2023 in an area of more than 105 km2.")
+
+
+def _latency(name: str, default: str) -> float:
+    return float(os.getenv(name, default)) / 1000
+
+
+class StubVectorDB(VectorDBBase):
+    """Returns `k` fixed hits after a simulated network round trip."""
+
+    def __init__(self, latency_seconds: float):
+        self.latency_seconds = latency_seconds
+
+    @staticmethod
+    def _hits(k: int) -> List[ScoredHit]:
+        return [
+            ScoredHit(id=i, score=1.0 - i / (k + 1), payload={"text": STUB_TEXT, "file_path": f"stub_{i % 8}.csv"})
+            for i in range(k)
+        ]
+
+    async def search(self, query_embedding, k: int):
+        await asyncio.sleep(self.latency_seconds)
+        return self._hits(k)
+
+    async def search_batch(self, query_embeddings, ks: List[int]):
+        await asyncio.sleep(self.latency_seconds)
+        return [self._hits(k) for k in ks]
+
+
+class StubSummarizationService(SummarizationBase):
+    """Answers after a delay resembling an LLM call; streams the answer in a few chunks."""
+
+    def __init__(self, latency_seconds: float, chunks: int = 4):
+        self.latency_seconds = latency_seconds
+        self.chunks = chunks
+
+    async def summarize(self, texts: List[str], question: str) -> str:
+        await asyncio.sleep(self.latency_seconds)
+        return f"Stub summary of {len(texts)} documents for: {question}"
+
+    async def summarize_stream(self, texts: List[str], question: str):
+        for i in range(self.chunks):
+            await asyncio.sleep(self.latency_seconds / self.chunks)
+            yield f"chunk {i} "
+
+
+class StubEmbeddingService(EmbeddingServiceBase):
+    """Deterministic pseudo-embeddings derived from a hash of the text, for runs without the model."""
+
+    def __init__(self, dim: int = 384, latency_seconds: float = 0.0):
+        self.dim = dim
+        self.latency_seconds = latency_seconds
+
+    def _embed(self, text: str) -> np.ndarray:
+        seed = int.from_bytes(hashlib.blake2b(text.encode("utf-8"), digest_size=8).digest(), "little")
+        vector = np.random.default_rng(seed).standard_normal(self.dim).astype(np.float32)
+        return vector / np.linalg.norm(vector)
+
+    async def generate_embedding(self, text: str):
+        if self.latency_seconds:
+            await asyncio.sleep(self.latency_seconds)
+        return self._embed(text)
+
+    async def generate_embeddings(self, texts: List[str]):
+        if self.latency_seconds:
+            await asyncio.sleep(self.latency_seconds)
+        return [self._embed(text) for text in texts]
+
+
+_search_service = SearchService(StubVectorDB(_latency("STUB_SEARCH_LATENCY_MS", "5")))
+_summarization_service = StubSummarizationService(_latency("STUB_SUMMARY_LATENCY_MS", "800"))
+
+app.dependency_overrides[get_search_service] = lambda: _search_service
+app.dependency_overrides[get_summarization_service] = lambda: _summarization_service
+app.dependency_overrides[get_response_cache] = lambda: None
+
+if os.getenv("STUB_EMBEDDINGS", "False").lower() in ('true', '1', 't'):
+    _embedding_service = StubEmbeddingService(latency_seconds=_latency("STUB_EMBEDDING_LATENCY_MS", "0"))
+    app.dependency_overrides[get_embedding_service] = lambda: _embedding_service
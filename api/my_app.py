@@ -1,18 +1,82 @@
 # my_app.py
 
-from fastapi import FastAPI, Request
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Request, Response
 from fastapi.responses import JSONResponse
+from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
+import asyncio
+import math
+import os
+
 from services.search_service_handler import search_router
+from services.profiling_handler import profiling_router
+from services.admission_control import ServiceOverloadedError
+from services.executors import get_executor_pools, shutdown_executors
+from services.metrics import register_stats_collector
+from services.service_factory import (
+    get_admission_controller,
+    get_embedding_service,
+    get_memory_profiler,
+    get_response_cache,
+    get_search_service,
+)
+from services.warmup import build_services, get_readiness_state, warm_up
 import services.logger_base  # Ensure logging is configured
 
 import logging
 
 logger = logging.getLogger(__name__)
 
-app = FastAPI()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Start tracemalloc (when enabled) before the services are built so their allocations are traced too
+    get_memory_profiler()
+
+    readiness = get_readiness_state()
+    warmup_task = None
+    if os.getenv("WARMUP_ENABLED", "True").lower() in ('true', '1', 't'):
+        # Load the model and create the clients before accepting requests, then warm them up in the
+        # background; /ready reports 503 until the warm-up queries have succeeded. Services are resolved
+        # like the routes resolve them, so dependency overrides (e.g. benchmarks.stub_app) are honoured.
+        def resolve(factory):
+            return app.dependency_overrides.get(factory, factory)()
+
+        build_services(resolve)
+        warmup_task = asyncio.create_task(warm_up(
+            readiness,
+            resolve(get_embedding_service),
+            resolve(get_search_service),
+            iterations=int(os.getenv("WARMUP_ITERATIONS", "3")),
+            k=int(os.getenv("WARMUP_K", "5")),
+            concurrency=max(1, int(os.getenv("EMBEDDING_PROCESS_WORKERS", "0"))),
+            retry_seconds=float(os.getenv("WARMUP_RETRY_SECONDS", "5")),
+            max_attempts=int(os.getenv("WARMUP_MAX_ATTEMPTS", "60")),
+        ))
+    else:
+        readiness.mark_ready()
+
+    yield
+
+    if warmup_task is not None:
+        warmup_task.cancel()
+    shutdown_executors()
+
+
+app = FastAPI(lifespan=lifespan)
 
 # Include search router for modularized endpoints
 app.include_router(search_router)
+app.include_router(profiling_router)
+
+
+@app.exception_handler(ServiceOverloadedError)
+async def service_overloaded_handler(request: Request, exc: ServiceOverloadedError):
+    return JSONResponse(
+        status_code=503,
+        content={"detail": "Service overloaded, retry later."},
+        headers={"Retry-After": str(max(1, math.ceil(exc.retry_after)))},
+    )
 
 
 @app.exception_handler(Exception)
@@ -32,3 +96,46 @@ async def root():
 @app.get("/health")
 async def health():
     return {"status": "healthy"}
+
+
+@app.get("/ready")
+async def ready():
+    """Succeeds once the services are built and warm-up encodes and searches have completed."""
+    readiness = get_readiness_state()
+    return JSONResponse(status_code=200 if readiness.ready else 503, content=readiness.snapshot())
+
+
+def _built(factory):
+    """The factory's service if it has already been created, else None; reporting never builds a service."""
+    return factory() if factory.cache_info().currsize else None
+
+
+def service_stats() -> dict:
+    """Collects admission-control, executor and cache counters from the shared services that exist."""
+    embedding_service = _built(get_embedding_service)
+    admission_controller = _built(get_admission_controller)
+    response_cache = _built(get_response_cache)
+    executor_pools = _built(get_executor_pools)
+    return {
+        "admission": admission_controller.stats() if admission_controller else None,
+        "executors": executor_pools.stats() if executor_pools else None,
+        "embedding_cache": getattr(embedding_service, "get_cache_metrics", dict)(),
+        "embedding_batching": getattr(embedding_service, "get_batch_metrics", dict)(),
+        "response_cache": response_cache.stats() if response_cache else None,
+    }
+
+
+# Cache, admission and executor counters are read from service_stats() when /metrics is scraped
+register_stats_collector(service_stats)
+
+
+@app.get("/stats")
+async def stats():
+    """Reports admission-control, executor and cache counters for capacity planning."""
+    return service_stats()
+
+
+@app.get("/metrics")
+async def metrics():
+    """Exposes latency histograms and service counters in the Prometheus text format."""
+    return Response(generate_latest(), media_type=CONTENT_TYPE_LATEST)
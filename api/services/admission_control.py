@@ -0,0 +1,150 @@
+# services/admission_control.py
+
+import asyncio
+import logging
+from typing import Dict, Optional
+
+import services.logger_base  # Ensure logging is configured
+
+logger = logging.getLogger(__name__)
+
+
+class ServiceOverloadedError(Exception):
+    """Raised when a request cannot even be queued; mapped to 503 with Retry-After."""
+
+    def __init__(self, retry_after: float):
+        super().__init__("Service overloaded, retry later.")
+        self.retry_after = retry_after
+
+
+class _NoLimit:
+    """Async context manager that admits immediately."""
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        return False
+
+
+NO_LIMIT = _NoLimit()
+
+
+class StageLimiter:
+    """Caps concurrent work in one pipeline stage and tracks how many callers wait for it."""
+
+    def __init__(self, name: str, limit: int):
+        self.name = name
+        self.limit = limit
+        self.in_flight = 0
+        self.waiting = 0
+        self._semaphore = asyncio.Semaphore(limit)
+
+    async def __aenter__(self):
+        self.waiting += 1
+        try:
+            await self._semaphore.acquire()
+        finally:
+            self.waiting -= 1
+        self.in_flight += 1
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        self.in_flight -= 1
+        self._semaphore.release()
+        return False
+
+
+class AdmissionTicket:
+    """A reserved place in the admission queue; entering it waits for a request slot."""
+
+    def __init__(self, controller: "AdmissionController"):
+        self.controller = controller
+
+    async def __aenter__(self):
+        controller = self.controller
+        try:
+            await controller._slots.acquire()
+        finally:
+            controller.waiting -= 1
+        controller.in_flight += 1
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        self.controller.in_flight -= 1
+        self.controller._slots.release()
+        return False
+
+
+class AdmissionController:
+    """Bounds in-flight search requests, their wait queue and per-stage concurrency.
+
+    `reserve()` fails fast with `ServiceOverloadedError` once `max_in_flight`
+    requests are running and `max_queue` more are already waiting, so a spike is
+    rejected immediately instead of slowing every request down. Under lighter
+    overload, `should_shed_summarization()` lets the handler drop the most
+    expensive optional stage first.
+    """
+
+    def __init__(
+        self,
+        max_in_flight: int = 64,
+        max_queue: int = 256,
+        stage_limits: Optional[Dict[str, int]] = None,
+        degrade_queue_depth: int = 32,
+        retry_after_seconds: float = 1.0,
+    ):
+        self.max_in_flight = max_in_flight
+        self.max_queue = max_queue
+        self.degrade_queue_depth = degrade_queue_depth
+        self.retry_after_seconds = retry_after_seconds
+        self.stages = {
+            name: StageLimiter(name, limit) for name, limit in (stage_limits or {}).items() if limit > 0
+        }
+        self.in_flight = 0
+        self.waiting = 0
+        self.admitted = 0
+        self.rejected = 0
+        self.degraded = 0
+        self._slots = asyncio.Semaphore(max_in_flight)
+
+    def check(self):
+        """Raises `ServiceOverloadedError` if both the request slots and the wait queue are full."""
+        if self.in_flight + self.waiting >= self.max_in_flight + self.max_queue:
+            self.rejected += 1
+            logger.warning(f"Rejecting request: {self.in_flight} in flight, {self.waiting} queued.")
+            raise ServiceOverloadedError(self.retry_after_seconds)
+
+    def reserve(self) -> AdmissionTicket:
+        """Claims a queue position or raises `ServiceOverloadedError` without waiting."""
+        self.check()
+        self.waiting += 1
+        self.admitted += 1
+        return AdmissionTicket(self)
+
+    def stage(self, name: str):
+        """Returns the limiter for a pipeline stage, or a no-op when the stage is unlimited."""
+        return self.stages.get(name, NO_LIMIT)
+
+    def queue_depth(self) -> int:
+        return self.waiting + sum(stage.waiting for stage in self.stages.values())
+
+    def should_shed_summarization(self) -> bool:
+        """True when the backlog is deep enough that summaries should be skipped."""
+        if self.degrade_queue_depth <= 0 or self.queue_depth() < self.degrade_queue_depth:
+            return False
+        self.degraded += 1
+        return True
+
+    def stats(self) -> dict:
+        return {
+            "in_flight": self.in_flight,
+            "queue_depth": self.waiting,
+            "admitted": self.admitted,
+            "rejected": self.rejected,
+            "degraded": self.degraded,
+            "stages": {
+                name: {"limit": stage.limit, "in_flight": stage.in_flight, "waiting": stage.waiting}
+                for name, stage in self.stages.items()
+            },
+        }
@@ -0,0 +1,109 @@
+# services/async_qdrant_service.py
+
+import os
+import math
+import logging
+import asyncio
+
+import httpx
+from qdrant_client import AsyncQdrantClient
+
+from abstract.vector_db_base import VectorDBBase
+from services.qdrant_service import (
+    VERSION_COLLECTION_SUFFIX,
+    VERSION_POINT_ID,
+    build_search_params,
+    build_search_requests,
+)
+import services.logger_base  # Ensure logging is configured
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncQdrantService(VectorDBBase):
+    """Service for interacting with Qdrant through the native async client.
+
+    Searches run on the event loop over a pooled keep-alive HTTP connection set, so
+    they never occupy executor threads.
+    """
+
+    def __init__(self):
+        qdrant_url = os.getenv("QDRANT_URL")
+        self.collection_name = os.getenv('TABLE')
+        self.timeout = float(os.getenv("QDRANT_TIMEOUT_SECONDS", "5"))
+        limits = httpx.Limits(
+            max_connections=int(os.getenv("QDRANT_POOL_MAX_CONNECTIONS", "100")),
+            max_keepalive_connections=int(os.getenv("QDRANT_POOL_MAX_KEEPALIVE", "20")),
+            keepalive_expiry=float(os.getenv("QDRANT_KEEPALIVE_EXPIRY_SECONDS", "30")),
+        )
+        # Extra keyword arguments are forwarded to the underlying httpx.AsyncClient.
+        self.client = AsyncQdrantClient(url=qdrant_url, timeout=math.ceil(self.timeout), limits=limits)
+        self.search_params = build_search_params()
+        logger.info(
+            f"Async Qdrant client initialized with URL: {qdrant_url} "
+            f"(max_connections={limits.max_connections}, max_keepalive={limits.max_keepalive_connections}, "
+            f"search params: {self.search_params})"
+        )
+
+    async def search(self, query_embedding, k: int):
+        """Performs a search in the Qdrant database, bounded by the per-call timeout."""
+        try:
+            results = await asyncio.wait_for(
+                self.client.search(
+                    collection_name=self.collection_name,
+                    query_vector=query_embedding,
+                    limit=k,
+                    search_params=self.search_params
+                ),
+                timeout=self.timeout
+            )
+            logger.debug(f"Qdrant search results: {results}")
+            return results
+        except asyncio.TimeoutError:
+            logger.error(f"Qdrant search timed out after {self.timeout} seconds.")
+            raise
+        except Exception as e:
+            logger.error(f"Error during Qdrant search: {e}", exc_info=True)
+            raise
+
+    async def search_batch(self, query_embeddings, ks):
+        """Performs several searches in one Qdrant round trip, bounded by the per-call timeout."""
+        try:
+            results = await asyncio.wait_for(
+                self.client.search_batch(
+                    collection_name=self.collection_name,
+                    requests=build_search_requests(query_embeddings, ks, self.search_params)
+                ),
+                timeout=self.timeout
+            )
+            logger.debug(f"Qdrant batch search returned {len(results)} result lists.")
+            return results
+        except asyncio.TimeoutError:
+            logger.error(f"Qdrant batch search timed out after {self.timeout} seconds.")
+            raise
+        except Exception as e:
+            logger.error(f"Error during Qdrant batch search: {e}", exc_info=True)
+            raise
+
+    async def get_collection_version(self):
+        """Reads the version stamp the uploader bumps after every collection change."""
+        try:
+            points = await asyncio.wait_for(
+                self.client.retrieve(
+                    collection_name=f"{self.collection_name}{VERSION_COLLECTION_SUFFIX}",
+                    ids=[VERSION_POINT_ID],
+                    with_payload=True,
+                    with_vectors=False
+                ),
+                timeout=self.timeout
+            )
+        except Exception as e:
+            logger.debug(f"Collection version unavailable: {e}")
+            return None
+        if not points:
+            return None
+        return str(points[0].payload.get("version"))
+
+    async def close(self):
+        """Closes the pooled connections."""
+        await self.client.close()
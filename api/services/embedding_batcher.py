@@ -0,0 +1,133 @@
+# services/embedding_batcher.py
+
+import asyncio
+import logging
+import threading
+import time
+from typing import Awaitable, Callable, List, Optional, Sequence
+
+from services.executors import run_cpu
+import services.logger_base  # Ensure logging is configured
+
+logger = logging.getLogger(__name__)
+
+
+class BatchMetrics:
+    """Thread-safe counters describing the batches the batcher actually dispatched."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.batches = 0
+        self.items = 0
+        self.max_batch_size = 0
+        self.encode_seconds = 0.0
+        self.size_histogram = {}
+
+    def record(self, batch_size: int, encode_seconds: float):
+        with self._lock:
+            self.batches += 1
+            self.items += batch_size
+            self.max_batch_size = max(self.max_batch_size, batch_size)
+            self.encode_seconds += encode_seconds
+            self.size_histogram[batch_size] = self.size_histogram.get(batch_size, 0) + 1
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "batches": self.batches,
+                "items": self.items,
+                "avg_batch_size": self.items / self.batches if self.batches else 0.0,
+                "max_batch_size": self.max_batch_size,
+                "encode_seconds": self.encode_seconds,
+                "size_histogram": dict(sorted(self.size_histogram.items())),
+            }
+
+
+class EmbeddingBatcher:
+    """Coalesces concurrent single-text encode requests into one batched encode call.
+
+    Callers await `submit(text)`. A single worker task takes the first queued text,
+    keeps collecting until `max_batch_size` texts are pending or `max_wait_ms` has
+    elapsed, runs `encode_batch` once on the whole batch through `run_blocking`
+    (the CPU executor by default) and resolves each caller's future with its own row. While a batch is encoding, new
+    requests keep queueing, so batches grow naturally with load.
+    """
+
+    def __init__(
+        self,
+        encode_batch: Callable[[List[str]], Sequence],
+        max_batch_size: int = 32,
+        max_wait_ms: float = 2.0,
+        run_blocking: Optional[Callable[..., Awaitable]] = None,
+    ):
+        if max_batch_size < 1:
+            raise ValueError("max_batch_size must be at least 1.")
+        if max_wait_ms < 0:
+            raise ValueError("max_wait_ms must not be negative.")
+        self.encode_batch = encode_batch
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+        self.run_blocking = run_blocking or run_cpu
+        self.metrics = BatchMetrics()
+        self._loop = None
+        self._queue = None
+        self._worker = None
+
+    def _ensure_worker(self):
+        """Starts (or restarts) the worker on the currently running event loop."""
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop or self._worker is None or self._worker.done():
+            self._loop = loop
+            self._queue = asyncio.Queue()
+            self._worker = loop.create_task(self._run())
+            logger.debug("Embedding batcher worker started.")
+
+    async def submit(self, text: str):
+        """Queues `text` for the next batch and returns its embedding."""
+        self._ensure_worker()
+        future = self._loop.create_future()
+        self._queue.put_nowait((text, future))
+        return await future
+
+    async def _collect(self) -> list:
+        """Waits for the first request, then gathers more until the batch is full or the window closes."""
+        batch = [await self._queue.get()]
+        deadline = self._loop.time() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            if not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+                continue
+            remaining = deadline - self._loop.time()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _run(self):
+        while True:
+            batch = await self._collect()
+            # Callers that gave up (e.g. client disconnects) don't need a row.
+            batch = [(text, future) for text, future in batch if not future.done()]
+            if batch:
+                await self._dispatch(batch)
+
+    async def _dispatch(self, batch: list):
+        texts = [text for text, _ in batch]
+        start_time = time.perf_counter()
+        try:
+            embeddings = await self.run_blocking(self.encode_batch, texts)
+        except Exception as e:
+            logger.error(f"Batched encode of {len(texts)} texts failed: {e}", exc_info=True)
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        elapsed_time = time.perf_counter() - start_time
+        self.metrics.record(len(texts), elapsed_time)
+        logger.debug(f"Encoded batch of {len(texts)} texts in {elapsed_time:.4f} seconds.")
+        for (_, future), embedding in zip(batch, embeddings):
+            if not future.done():
+                future.set_result(embedding)
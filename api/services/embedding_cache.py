@@ -0,0 +1,147 @@
+# services/embedding_cache.py
+
+import logging
+import re
+import time
+import unicodedata
+from collections import OrderedDict
+from typing import List
+
+import numpy as np
+
+from abstract.embedding_base import EmbeddingServiceBase
+import services.logger_base  # Ensure logging is configured
+
+logger = logging.getLogger(__name__)
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_query(text: str, casefold: bool = True) -> str:
+    """Normalizes query text so trivially different spellings share a cache entry."""
+    normalized = _WHITESPACE.sub(" ", unicodedata.normalize("NFKC", text)).strip()
+    return normalized.casefold() if casefold else normalized
+
+
+class EmbeddingCache:
+    """Memory-bounded LRU cache of float32 embeddings with an optional TTL."""
+
+    def __init__(self, max_bytes: int = 32 * 1024 * 1024, ttl_seconds: float = 3600.0):
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self._entries = OrderedDict()  # key -> (embedding, expires_at)
+
+    def get(self, key):
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        embedding, expires_at = entry
+        if expires_at is not None and expires_at <= time.monotonic():
+            self._remove(key)
+            self.expirations += 1
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return embedding
+
+    def put(self, key, embedding):
+        embedding = np.ascontiguousarray(embedding, dtype=np.float32)
+        embedding.setflags(write=False)  # Cached rows are shared between callers
+        if embedding.nbytes > self.max_bytes:
+            return embedding
+        if key in self._entries:
+            self._remove(key)
+        expires_at = time.monotonic() + self.ttl_seconds if self.ttl_seconds > 0 else None
+        self._entries[key] = (embedding, expires_at)
+        self.current_bytes += embedding.nbytes
+        while self.current_bytes > self.max_bytes:
+            oldest_key = next(iter(self._entries))
+            self._remove(oldest_key)
+            self.evictions += 1
+        return embedding
+
+    def _remove(self, key):
+        embedding, _ = self._entries.pop(key)
+        self.current_bytes -= embedding.nbytes
+
+    def clear(self):
+        self._entries.clear()
+        self.current_bytes = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "bytes": self.current_bytes,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+
+class CachedEmbeddingService(EmbeddingServiceBase):
+    """Embedding service decorator that serves repeated queries from an `EmbeddingCache`.
+
+    Keys combine the wrapped service's model name with the normalized query text, so
+    swapping models never returns stale vectors. Any attribute not defined here is
+    delegated to the wrapped service.
+    """
+
+    def __init__(self, embedding_service: EmbeddingServiceBase, cache: EmbeddingCache, casefold: bool = True):
+        self.embedding_service = embedding_service
+        self.cache = cache
+        self.casefold = casefold
+        self.model_name = getattr(embedding_service, "model_name", type(embedding_service).__name__)
+        logger.info(f"Embedding cache enabled for model '{self.model_name}' (max_bytes={cache.max_bytes}).")
+
+    def _key(self, text: str):
+        return (self.model_name, normalize_query(text, self.casefold))
+
+    async def generate_embedding(self, text: str):
+        """Returns the cached embedding for `text`, computing and storing it on a miss."""
+        key = self._key(text)
+        embedding = self.cache.get(key)
+        if embedding is not None:
+            logger.debug("Embedding cache hit.")
+            return embedding
+        embedding = await self.embedding_service.generate_embedding(text)
+        return self.cache.put(key, embedding)
+
+    async def generate_embeddings(self, texts: List[str]):
+        """Returns embeddings for `texts`, encoding only the cache misses in one batch."""
+        keys = [self._key(text) for text in texts]
+        embeddings = [self.cache.get(key) for key in keys]
+        misses = {}
+        for i, embedding in enumerate(embeddings):
+            if embedding is None:
+                misses.setdefault(keys[i], []).append(i)
+        if misses:
+            miss_texts = [texts[positions[0]] for positions in misses.values()]
+            computed = await self.embedding_service.generate_embeddings(miss_texts)
+            for (key, positions), embedding in zip(misses.items(), computed):
+                embedding = self.cache.put(key, embedding)
+                for i in positions:
+                    embeddings[i] = embedding
+        return embeddings
+
+    def get_cache_metrics(self) -> dict:
+        """Returns hit/miss/eviction counters for sizing the cache."""
+        return self.cache.stats()
+
+    def __getattr__(self, name):
+        if name == "embedding_service":
+            raise AttributeError(name)
+        return getattr(self.embedding_service, name)
@@ -0,0 +1,139 @@
+# services/executors.py
+
+import os
+import sys
+import asyncio
+import logging
+import functools
+import threading
+import multiprocessing
+from concurrent.futures import Executor, ThreadPoolExecutor, ProcessPoolExecutor
+from functools import lru_cache
+from typing import Callable
+
+import services.logger_base  # Ensure logging is configured
+
+logger = logging.getLogger(__name__)
+
+
+def available_cpus() -> int:
+    """Number of CPUs this process may run on (respects container/affinity limits)."""
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+class TrackedPool:
+    """An executor plus counters of the calls submitted to it."""
+
+    def __init__(self, name: str, executor: Executor, workers: int):
+        self.name = name
+        self.executor = executor
+        self.workers = workers
+        self.submitted = 0
+        self.active = 0
+        self._lock = threading.Lock()
+
+    async def run(self, func: Callable, *args, **kwargs):
+        with self._lock:
+            self.submitted += 1
+            self.active += 1
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self.executor, functools.partial(func, *args, **kwargs))
+        finally:
+            with self._lock:
+                self.active -= 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "submitted": self.submitted,
+                # Calls running or waiting for a worker
+                "active": self.active,
+            }
+
+
+class ExecutorPools:
+    """Dedicated executors so blocking work of different kinds cannot starve each other.
+
+    - `cpu`: a small thread pool for model inference and NumPy scans. Each call may
+      itself use several torch/BLAS threads, so `cpu_workers * torch_threads` is kept
+      at about the number of available cores instead of oversubscribing them.
+    - `io`: a larger thread pool for blocking network calls (Qdrant, Gemini), which
+      spend their time waiting, not computing.
+
+    Process pools for embedding are created separately with `start_process_pool`,
+    since their workers must load the model themselves.
+    """
+
+    def __init__(self, cpu_workers: int, io_workers: int, torch_threads: int):
+        self.torch_threads = torch_threads
+        self.cpu = TrackedPool(
+            "cpu", ThreadPoolExecutor(max_workers=cpu_workers, thread_name_prefix="cpu"), cpu_workers
+        )
+        self.io = TrackedPool(
+            "io", ThreadPoolExecutor(max_workers=io_workers, thread_name_prefix="io"), io_workers
+        )
+        set_torch_threads(torch_threads)
+        logger.info(
+            f"Executors initialized (cpu_workers={cpu_workers}, io_workers={io_workers}, torch_threads={torch_threads})"
+        )
+
+    def shutdown(self):
+        for pool in (self.cpu, self.io):
+            pool.executor.shutdown(wait=False, cancel_futures=True)
+
+    def stats(self) -> dict:
+        return {"torch_threads": self.torch_threads, "cpu": self.cpu.stats(), "io": self.io.stats()}
+
+
+def start_process_pool(name: str, workers: int, initializer: Callable, initargs: tuple = ()) -> TrackedPool:
+    """Starts a process pool with `spawn`, so workers never inherit a forked torch runtime."""
+    executor = ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=initializer,
+        initargs=initargs,
+    )
+    logger.info(f"Process pool '{name}' started with {workers} workers.")
+    return TrackedPool(name, executor, workers)
+
+
+def set_torch_threads(num_threads: int):
+    """Caps torch intra-op threads if torch is loaded; torch-based backends apply the cap when they load it."""
+    torch = sys.modules.get("torch")
+    if torch is not None:
+        torch.set_num_threads(num_threads)
+
+
+@lru_cache()
+def get_executor_pools() -> ExecutorPools:
+    """Provides the process-wide executors, sized from the environment."""
+    cpus = available_cpus()
+    cpu_workers = int(os.getenv("EXECUTOR_CPU_WORKERS", str(min(2, cpus))))
+    torch_threads = int(os.getenv("TORCH_NUM_THREADS", "0")) or max(1, cpus // cpu_workers)
+    return ExecutorPools(
+        cpu_workers=cpu_workers,
+        io_workers=int(os.getenv("EXECUTOR_IO_WORKERS", "32")),
+        torch_threads=torch_threads,
+    )
+
+
+async def run_cpu(func: Callable, *args, **kwargs):
+    """Runs CPU-bound `func` (inference, vector scans) on the dedicated CPU pool."""
+    return await get_executor_pools().cpu.run(func, *args, **kwargs)
+
+
+async def run_io(func: Callable, *args, **kwargs):
+    """Runs blocking network call `func` on the dedicated I/O pool."""
+    return await get_executor_pools().io.run(func, *args, **kwargs)
+
+
+def shutdown_executors():
+    """Stops the pools if they were ever created."""
+    if get_executor_pools.cache_info().currsize:
+        get_executor_pools().shutdown()
+        get_executor_pools.cache_clear()
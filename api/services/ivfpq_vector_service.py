@@ -0,0 +1,139 @@
+# services/ivfpq_vector_service.py
+
+import os
+import logging
+import time
+
+import numpy as np
+
+from abstract.vector_db_base import VectorDBBase
+from services.mmap_vector_service import MmapIndex, ScoredHit
+from services.executors import run_cpu
+import services.logger_base  # Ensure logging is configured
+
+logger = logging.getLogger(__name__)
+
+
+class IvfPqIndex:
+    """Approximate inner-product search over an index built by `data/ivfpq_build.py`.
+
+    Vectors are stored as `coarse centroid + PQ-coded residual`. For normalized
+    vectors, `q . x ~= q . c_list + sum_j q_j . codebook_j[code_j]`, so one
+    `(m, ksub)` lookup table per query scores every candidate in every probed list
+    with a single gather-and-sum. The top `rerank` candidates are optionally
+    re-scored exactly against the memory-mapped original vectors, touching only
+    those rows.
+    """
+
+    def __init__(self, path: str):
+        self.exact = MmapIndex(path)
+        self.path = self.exact.path
+        self.meta = self.exact.meta
+        if self.meta.get("index") != "ivfpq":
+            raise ValueError(f"{self.path} is not an IVF-PQ index.")
+        # Small arrays are read into memory; codes and ids stay memory-mapped.
+        self.coarse_centroids = np.load(os.path.join(self.path, "coarse_centroids.npy"))
+        self.pq_codebooks = np.load(os.path.join(self.path, "pq_codebooks.npy"))
+        self.list_offsets = np.load(os.path.join(self.path, "list_offsets.npy"))
+        self.codes = np.load(os.path.join(self.path, "codes.npy"), mmap_mode="r")
+        self.ids = np.load(os.path.join(self.path, "ids.npy"), mmap_mode="r")
+        self.m, self.ksub, self.dsub = self.pq_codebooks.shape
+        self._subquantizers = np.arange(self.m)
+
+    @property
+    def version(self):
+        return self.exact.version
+
+    def search(self, query_embedding, k: int, nprobe: int = 16, rerank: int = 100):
+        """Approximate top-k, probing `nprobe` lists and exactly re-ranking `rerank` candidates."""
+        query = np.asarray(query_embedding, dtype=np.float32).ravel()
+        if query.shape[0] != self.coarse_centroids.shape[1]:
+            raise ValueError(f"Query dimension {query.shape[0]} does not match index dimension {self.coarse_centroids.shape[1]}.")
+        if self.exact.normalize_queries:
+            norm = np.linalg.norm(query)
+            if norm > 0:
+                query = query / norm
+
+        coarse_scores = self.coarse_centroids @ query
+        nprobe = min(nprobe, len(coarse_scores))
+        probes = np.argpartition(coarse_scores, len(coarse_scores) - nprobe)[len(coarse_scores) - nprobe:]
+        starts, ends = self.list_offsets[probes], self.list_offsets[probes + 1]
+        non_empty = ends > starts
+        probes, starts, ends = probes[non_empty], starts[non_empty], ends[non_empty]
+        if len(probes) == 0:
+            return []
+
+        codes = np.concatenate([self.codes[start:end] for start, end in zip(starts, ends)])
+        ids = np.concatenate([self.ids[start:end] for start, end in zip(starts, ends)])
+        lookup_table = np.einsum("jd,jcd->jc", query.reshape(self.m, self.dsub), self.pq_codebooks)
+        scores = np.repeat(coarse_scores[probes], ends - starts) \
+            + lookup_table[self._subquantizers, codes].sum(axis=1, dtype=np.float32)
+
+        depth = min(max(k, rerank), len(scores))
+        candidates = np.argpartition(scores, len(scores) - depth)[len(scores) - depth:]
+        if rerank > 0:
+            rows = np.sort(ids[candidates])  # Sequential page access in the mmapped vectors
+            scores = np.asarray(self.exact.vectors[rows], dtype=np.float32) @ query
+        else:
+            rows, scores = ids[candidates], scores[candidates]
+
+        k = min(k, len(rows))
+        top = np.argsort(scores)[::-1][:k]
+        return [ScoredHit(int(rows[i]), float(scores[i]), self.exact.payload(int(rows[i]))) for i in top]
+
+    def search_batch(self, query_embeddings, ks, nprobe: int = 16, rerank: int = 100):
+        """Runs `search` for each query; probed lists differ per query, so there is no shared scan."""
+        return [self.search(embedding, k, nprobe, rerank) for embedding, k in zip(query_embeddings, ks)]
+
+
+class IvfPqVectorService(VectorDBBase):
+    """In-process approximate-search backend over a compressed IVF-PQ index."""
+
+    def __init__(self, index_path: str = None):
+        self.index_path = index_path or os.getenv("IVFPQ_INDEX_PATH", "/mnt/data/ivfpq/current")
+        self.nprobe = int(os.getenv("IVFPQ_NPROBE", "16"))
+        self.rerank = int(os.getenv("IVFPQ_RERANK", "100"))
+        self.reload_check_seconds = float(os.getenv("IVFPQ_RELOAD_CHECK_SECONDS", "5"))
+        self.index = IvfPqIndex(self.index_path)
+        self._last_reload_check = time.monotonic()
+        logger.info(
+            f"IVF-PQ index loaded from {self.index.path} (nlist={len(self.index.coarse_centroids)}, "
+            f"m={self.index.m}, nprobe={self.nprobe}, rerank={self.rerank})"
+        )
+
+    def _reload_if_changed(self):
+        """Swaps in a newly built index once the `current` link points elsewhere."""
+        now = time.monotonic()
+        if now - self._last_reload_check < self.reload_check_seconds:
+            return
+        self._last_reload_check = now
+        if os.path.realpath(self.index_path) != self.index.path:
+            self.index = IvfPqIndex(self.index_path)
+            logger.info(f"Reloaded IVF-PQ index from {self.index.path}")
+
+    async def search(self, query_embedding, k: int):
+        """Performs an approximate top-k search with optional exact re-ranking."""
+        try:
+            self._reload_if_changed()
+            results = await run_cpu(self.index.search, query_embedding, k, self.nprobe, self.rerank)
+            logger.debug(f"IVF-PQ search results: {results}")
+            return results
+        except Exception as e:
+            logger.error(f"Error during IVF-PQ search: {e}", exc_info=True)
+            raise
+
+    async def search_batch(self, query_embeddings, ks):
+        """Performs approximate searches for several queries in one worker-thread hop."""
+        try:
+            self._reload_if_changed()
+            results = await run_cpu(self.index.search_batch, query_embeddings, ks, self.nprobe, self.rerank)
+            logger.debug(f"IVF-PQ batch search returned {len(results)} result lists.")
+            return results
+        except Exception as e:
+            logger.error(f"Error during IVF-PQ batch search: {e}", exc_info=True)
+            raise
+
+    async def get_collection_version(self):
+        self._reload_if_changed()
+        version = self.index.version
+        return None if version is None else str(version)
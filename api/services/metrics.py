@@ -0,0 +1,145 @@
+# services/metrics.py
+
+import logging
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, Dict, Generator, Optional
+
+from prometheus_client import Counter, Gauge, Histogram, REGISTRY
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily
+
+import services.logger_base  # Ensure logging is configured
+
+logger = logging.getLogger(__name__)
+
+# Latency buckets from 1 ms to 30 s; summarization dominates the upper range.
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+STAGE_SECONDS = Histogram(
+    "search_stage_duration_seconds", "Time spent in one stage of the search pipeline.", ["stage"],
+    buckets=LATENCY_BUCKETS,
+)
+REQUEST_SECONDS = Histogram(
+    "search_request_duration_seconds", "End-to-end handling time of search requests.", ["endpoint"],
+    buckets=LATENCY_BUCKETS,
+)
+REQUEST_ERRORS = Counter("search_request_errors_total", "Search requests that failed.", ["endpoint"])
+REQUESTS_IN_FLIGHT = Gauge("search_requests_in_flight", "Search requests currently being handled.")
+SUMMARIZATION_RETRIES = Counter("summarization_retries_total", "Summarization attempts retried after a request error.")
+
+# Label children are resolved once; observing on them is a lock and a bucket search.
+_stage_histograms = {}
+# Stage durations of the current request, reported back to the client in a Server-Timing header.
+_stage_timings: ContextVar[Optional[Dict[str, float]]] = ContextVar("stage_timings", default=None)
+
+
+def observe_stage(stage: str, seconds: float):
+    histogram = _stage_histograms.get(stage)
+    if histogram is None:
+        histogram = _stage_histograms[stage] = STAGE_SECONDS.labels(stage)
+    histogram.observe(seconds)
+    timings = _stage_timings.get()
+    if timings is not None:
+        timings[stage] = timings.get(stage, 0.0) + seconds
+
+
+@contextmanager
+def collect_stage_timings() -> Generator[Dict[str, float], None, None]:
+    """Collects the stage durations observed inside the block, including in tasks it spawns."""
+    timings = {}
+    token = _stage_timings.set(timings)
+    start_time = time.perf_counter()
+    try:
+        yield timings
+    finally:
+        timings["total"] = time.perf_counter() - start_time
+        _stage_timings.reset(token)
+
+
+def server_timing_header(timings: Dict[str, float]) -> str:
+    """Formats stage durations as a Server-Timing header value, e.g. `embedding;dur=12.31, total;dur=15.02`."""
+    return ", ".join(f"{stage};dur={seconds * 1000:.2f}" for stage, seconds in timings.items())
+
+
+@contextmanager
+def track_request(endpoint: str) -> Generator[None, None, None]:
+    """Records the duration, in-flight count and failure of one request to `endpoint`."""
+    REQUESTS_IN_FLIGHT.inc()
+    start_time = time.perf_counter()
+    try:
+        yield
+    except Exception:
+        REQUEST_ERRORS.labels(endpoint).inc()
+        raise
+    finally:
+        REQUEST_SECONDS.labels(endpoint).observe(time.perf_counter() - start_time)
+        REQUESTS_IN_FLIGHT.dec()
+
+
+class ServiceStatsCollector:
+    """Exposes counters the services already keep (caches, admission control, executors) at scrape time.
+
+    Nothing is recorded per request; `stats_provider` returns the same dict as the
+    `/stats` endpoint and is only called when Prometheus scrapes `/metrics`.
+    """
+
+    def __init__(self, stats_provider: Callable[[], dict]):
+        self.stats_provider = stats_provider
+
+    def describe(self):
+        # Without describe(), registering would call collect() and build the services at import time
+        return []
+
+    def collect(self):
+        # A failing provider drops the service series from this scrape instead of failing the whole exposition
+        try:
+            families = list(self._metric_families(self.stats_provider()))
+        except Exception as e:
+            logger.warning(f"Service stats unavailable for this scrape: {e}", exc_info=True)
+            return
+        yield from families
+
+    def _metric_families(self, stats: dict):
+        cache_hits = CounterMetricFamily("cache_hits", "Cache lookups that were served from the cache.", labels=["cache"])
+        cache_misses = CounterMetricFamily("cache_misses", "Cache lookups that missed.", labels=["cache"])
+        for cache in ("embedding_cache", "response_cache"):
+            cache_stats = stats.get(cache) or {}
+            if "hits" in cache_stats:
+                cache_hits.add_metric([cache], cache_stats["hits"])
+                cache_misses.add_metric([cache], cache_stats["misses"])
+        yield cache_hits
+        yield cache_misses
+
+        admission = stats.get("admission")
+        if admission:
+            yield GaugeMetricFamily("admission_queue_depth", "Requests waiting for an admission slot.",
+                                    value=admission["queue_depth"])
+            outcomes = CounterMetricFamily("admission_outcomes", "Admission decisions by outcome.", labels=["outcome"])
+            for outcome in ("admitted", "rejected", "degraded"):
+                outcomes.add_metric([outcome], admission[outcome])
+            yield outcomes
+            stage_waiting = GaugeMetricFamily("admission_stage_waiting", "Requests waiting for a stage slot.",
+                                              labels=["stage"])
+            for stage, stage_stats in admission["stages"].items():
+                stage_waiting.add_metric([stage], stage_stats["waiting"])
+            yield stage_waiting
+
+        executors = stats.get("executors")
+        if executors:
+            queue_depth = GaugeMetricFamily("executor_queue_depth", "Calls waiting for an executor worker.",
+                                            labels=["pool"])
+            active = GaugeMetricFamily("executor_active_calls", "Calls running or waiting on an executor.",
+                                       labels=["pool"])
+            for pool in ("cpu", "io"):
+                pool_stats = executors[pool]
+                queue_depth.add_metric([pool], max(0, pool_stats["active"] - pool_stats["workers"]))
+                active.add_metric([pool], pool_stats["active"])
+            yield queue_depth
+            yield active
+
+
+def register_stats_collector(stats_provider: Callable[[], dict]) -> ServiceStatsCollector:
+    collector = ServiceStatsCollector(stats_provider)
+    REGISTRY.register(collector)
+    return collector
@@ -0,0 +1,165 @@
+# services/mmap_vector_service.py
+
+import os
+import json
+import logging
+import time
+
+import numpy as np
+
+from abstract.vector_db_base import VectorDBBase
+from services.executors import run_cpu
+import services.logger_base  # Ensure logging is configured
+
+logger = logging.getLogger(__name__)
+
+# Rows scored per matrix product; bounds the float32 scratch space needed for float16 indexes.
+SEARCH_CHUNK_ROWS = 65536
+
+
+class ScoredHit:
+    """Minimal search hit exposing the `id`, `score` and `payload` attributes used by the formatter."""
+
+    __slots__ = ("id", "score", "payload")
+
+    def __init__(self, id: int, score: float, payload: dict):
+        self.id = id
+        self.score = score
+        self.payload = payload
+
+    def __repr__(self):
+        return f"ScoredHit(id={self.id}, score={self.score:.4f})"
+
+
+class MmapIndex:
+    """Read-only view of an index directory written by `data/mmap_export.py`.
+
+    Layout:
+        meta.json            {"count", "dim", "dtype", "distance", "version"}
+        vectors.bin          raw (count, dim) float32/float16 rows, L2-normalized for cosine
+        payload_offsets.npy  (count + 1,) int64 byte offsets into payloads.bin
+        payloads.bin         concatenated UTF-8 JSON payloads
+
+    Everything is opened with `mmap`, so worker processes loading the same directory
+    share one copy of the pages through the OS page cache.
+    """
+
+    def __init__(self, path: str):
+        self.path = os.path.realpath(path)
+        with open(os.path.join(self.path, "meta.json"), "r") as f:
+            self.meta = json.load(f)
+        count, dim = self.meta["count"], self.meta["dim"]
+        self.vectors = np.memmap(os.path.join(self.path, "vectors.bin"), dtype=self.meta["dtype"], mode="r",
+                                 shape=(count, dim)) if count else np.zeros((0, dim), dtype=self.meta["dtype"])
+        self.offsets = np.load(os.path.join(self.path, "payload_offsets.npy"), mmap_mode="r")
+        self.payloads = np.memmap(os.path.join(self.path, "payloads.bin"), dtype=np.uint8, mode="r") \
+            if self.offsets[-1] > 0 else np.zeros(0, dtype=np.uint8)
+        self.normalize_queries = self.meta.get("distance", "Cosine") == "Cosine"
+        if self.vectors.shape[0] != len(self.offsets) - 1:
+            raise ValueError(f"Corrupt mmap index at {self.path}: vector and payload counts differ.")
+
+    @property
+    def version(self):
+        return self.meta.get("version")
+
+    def payload(self, row: int) -> dict:
+        start, end = int(self.offsets[row]), int(self.offsets[row + 1])
+        return json.loads(self.payloads[start:end].tobytes().decode("utf-8"))
+
+    def _queries(self, query_embeddings) -> np.ndarray:
+        queries = np.atleast_2d(np.asarray(query_embeddings, dtype=np.float32))
+        if queries.shape[1] != self.vectors.shape[1]:
+            raise ValueError(f"Query dimension {queries.shape[1]} does not match index dimension {self.vectors.shape[1]}.")
+        if self.normalize_queries:
+            norms = np.linalg.norm(queries, axis=1, keepdims=True)
+            queries = queries / np.where(norms == 0, 1, norms)
+        return queries
+
+    def search(self, query_embedding, k: int):
+        """Exact top-k by inner product (cosine for normalized indexes)."""
+        return self.search_batch([query_embedding], [k])[0]
+
+    def search_batch(self, query_embeddings, ks):
+        """Exact top-k for several queries with one pass over the vectors.
+
+        Each chunk contributes only its own per-query top candidates, so scratch
+        memory stays at `SEARCH_CHUNK_ROWS x len(queries)` regardless of index size.
+        """
+        queries = self._queries(query_embeddings)
+        count = self.vectors.shape[0]
+        max_k = min(max(ks), count)
+        if max_k <= 0:
+            return [[] for _ in ks]
+        candidate_rows, candidate_scores = [], []
+        for start in range(0, count, SEARCH_CHUNK_ROWS):
+            chunk = self.vectors[start:start + SEARCH_CHUNK_ROWS]
+            if chunk.dtype != np.float32:
+                chunk = chunk.astype(np.float32)
+            chunk_scores = chunk @ queries.T
+            if len(chunk) > max_k:
+                rows = np.argpartition(chunk_scores, len(chunk) - max_k, axis=0)[len(chunk) - max_k:]
+            else:
+                rows = np.broadcast_to(np.arange(len(chunk))[:, None], chunk_scores.shape)
+            candidate_scores.append(np.take_along_axis(chunk_scores, rows, axis=0))
+            candidate_rows.append(rows + start)
+        candidate_rows = np.concatenate(candidate_rows)
+        candidate_scores = np.concatenate(candidate_scores)
+
+        results = []
+        for column, k in enumerate(ks):
+            k = min(k, count)
+            order = np.argsort(candidate_scores[:, column])[::-1][:k]
+            rows, scores = candidate_rows[order, column], candidate_scores[order, column]
+            results.append([ScoredHit(int(row), float(score), self.payload(int(row))) for row, score in zip(rows, scores)])
+        return results
+
+
+class MmapVectorService(VectorDBBase):
+    """In-process exact-search backend over a memory-mapped vector file."""
+
+    def __init__(self, index_path: str = None):
+        self.index_path = index_path or os.getenv("MMAP_INDEX_PATH", "/mnt/data/index/current")
+        self.reload_check_seconds = float(os.getenv("MMAP_RELOAD_CHECK_SECONDS", "5"))
+        self.index = MmapIndex(self.index_path)
+        self._last_reload_check = time.monotonic()
+        logger.info(
+            f"Mmap index loaded from {self.index.path} "
+            f"({self.index.vectors.shape[0]} vectors, dim {self.index.vectors.shape[1]}, {self.index.vectors.dtype})"
+        )
+
+    def _reload_if_changed(self):
+        """Swaps in a newly exported index once the `current` link points elsewhere."""
+        now = time.monotonic()
+        if now - self._last_reload_check < self.reload_check_seconds:
+            return
+        self._last_reload_check = now
+        if os.path.realpath(self.index_path) != self.index.path:
+            self.index = MmapIndex(self.index_path)
+            logger.info(f"Reloaded mmap index from {self.index.path}")
+
+    async def search(self, query_embedding, k: int):
+        """Performs an exact top-k search over the memory-mapped vectors."""
+        try:
+            self._reload_if_changed()
+            results = await run_cpu(self.index.search, query_embedding, k)
+            logger.debug(f"Mmap search results: {results}")
+            return results
+        except Exception as e:
+            logger.error(f"Error during mmap search: {e}", exc_info=True)
+            raise
+
+    async def search_batch(self, query_embeddings, ks):
+        """Performs exact top-k searches for several queries in one pass."""
+        try:
+            self._reload_if_changed()
+            results = await run_cpu(self.index.search_batch, query_embeddings, ks)
+            logger.debug(f"Mmap batch search returned {len(results)} result lists.")
+            return results
+        except Exception as e:
+            logger.error(f"Error during mmap batch search: {e}", exc_info=True)
+            raise
+
+    async def get_collection_version(self):
+        self._reload_if_changed()
+        version = self.index.version
+        return None if version is None else str(version)
@@ -0,0 +1,251 @@
+# services/onnx_embedding_service.py
+
+import json
+import logging
+import os
+import re
+from typing import List
+
+import numpy as np
+import onnxruntime
+from tokenizers import Tokenizer
+
+from abstract.embedding_base import EmbeddingServiceBase
+from services.embedding_batcher import EmbeddingBatcher
+from services.executors import get_executor_pools, run_cpu
+import services.logger_base  # Ensure logging is configured
+
+logger = logging.getLogger(__name__)
+
+CONFIG_FILE = "onnx_config.json"
+TOKENIZER_FILE = "tokenizer.json"
+MODEL_FILES = {"fp32": "model.onnx", "int8": "model.int8.onnx"}
+
+# Encoded by both the PyTorch model and the exported model to record how closely they agree
+PARITY_TEXTS = (
+    "What is the capital of France?",
+    "Who wrote the theory of general relativity?",
+    "When did the Second World War end?",
+    "How does photosynthesis work in plants?",
+    "The Normans were the people who in the 10th and 11th centuries gave their name to Normandy.",
+    "Computational complexity theory classifies computational problems according to their inherent difficulty.",
+    "a",
+    "Steam engines are external combustion engines, where the working fluid is separate from the combustion "
+    "products. Non-combustion heat sources such as solar power, nuclear power or geothermal energy may be used.",
+)
+
+
+def default_model_dir(model_name: str, cache_folder: str) -> str:
+    """Where the ONNX export of `model_name` is kept when ONNX_MODEL_DIR is not set."""
+    return os.path.join(cache_folder, "onnx", re.sub(r"[^A-Za-z0-9_.-]+", "__", model_name))
+
+
+def pool(token_embeddings: np.ndarray, attention_mask: np.ndarray, mode: str) -> np.ndarray:
+    """Reduces (batch, tokens, dim) token embeddings to one vector per text, ignoring padding."""
+    if mode == "cls":
+        return token_embeddings[:, 0]
+    mask = attention_mask[..., None].astype(token_embeddings.dtype)
+    if mode == "mean":
+        return (token_embeddings * mask).sum(axis=1) / np.maximum(mask.sum(axis=1), 1e-9)
+    if mode == "max":
+        return np.where(mask > 0, token_embeddings, -1e9).max(axis=1)
+    raise ValueError(f"Unsupported pooling mode: {mode}")
+
+
+def cosine_similarities(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """Row-wise cosine similarity of two (n, dim) arrays."""
+    a, b = np.asarray(a, dtype=np.float64), np.asarray(b, dtype=np.float64)
+    return (a * b).sum(axis=1) / np.maximum(np.linalg.norm(a, axis=1) * np.linalg.norm(b, axis=1), 1e-12)
+
+
+class OnnxEncoder:
+    """Runs an exported sentence-transformer: tokenization, the ONNX graph and pooling, without torch."""
+
+    def __init__(self, model_dir: str, variant: str = "int8", num_threads: int = 1):
+        with open(os.path.join(model_dir, CONFIG_FILE), "r", encoding="utf-8") as f:
+            self.config = json.load(f)
+        self.variant = variant
+        self.pooling_mode = self.config["pooling_mode"]
+        self.normalize = self.config["normalize"]
+
+        self.tokenizer = Tokenizer.from_file(os.path.join(model_dir, TOKENIZER_FILE))
+        self.tokenizer.enable_truncation(max_length=self.config["max_seq_length"])
+        self.tokenizer.enable_padding(pad_id=self.config["pad_token_id"], pad_token=self.config["pad_token"])
+
+        options = onnxruntime.SessionOptions()
+        options.intra_op_num_threads = num_threads
+        options.inter_op_num_threads = 1
+        options.graph_optimization_level = onnxruntime.GraphOptimizationLevel.ORT_ENABLE_ALL
+        self.session = onnxruntime.InferenceSession(
+            os.path.join(model_dir, MODEL_FILES[variant]), options, providers=["CPUExecutionProvider"]
+        )
+        self.input_names = [model_input.name for model_input in self.session.get_inputs()]
+
+    def encode(self, texts):
+        """Encodes a text or a list of texts like `SentenceTransformer.encode`: one row per text."""
+        single = isinstance(texts, str)
+        encodings = self.tokenizer.encode_batch([texts] if single else list(texts))
+        attention_mask = np.array([encoding.attention_mask for encoding in encodings], dtype=np.int64)
+        features = {
+            "input_ids": np.array([encoding.ids for encoding in encodings], dtype=np.int64),
+            "attention_mask": attention_mask,
+            "token_type_ids": np.array([encoding.type_ids for encoding in encodings], dtype=np.int64),
+        }
+        token_embeddings = self.session.run(None, {name: features[name] for name in self.input_names})[0]
+        embeddings = pool(token_embeddings, attention_mask, self.pooling_mode).astype(np.float32)
+        if self.normalize:
+            embeddings /= np.maximum(np.linalg.norm(embeddings, axis=1, keepdims=True), 1e-12)
+        return embeddings[0] if single else embeddings
+
+
+def _pooling_mode(pooling) -> str:
+    config = pooling.get_config_dict()
+    if "pooling_mode" in config:
+        return config["pooling_mode"]
+    for mode, flag in (("cls", "pooling_mode_cls_token"), ("mean", "pooling_mode_mean_tokens"),
+                       ("max", "pooling_mode_max_tokens")):
+        if config.get(flag):
+            return mode
+    raise ValueError(f"Unsupported pooling configuration: {config}")
+
+
+def export_onnx_model(model_name: str, cache_folder: str, output_dir: str, quantize: bool = True,
+                      opset: int = 17) -> dict:
+    """Exports a sentence-transformer to ONNX, optionally with dynamic int8 quantization.
+
+    Writes the fp32 graph, the int8 graph, the tokenizer and `onnx_config.json` (pooling,
+    normalization and the parity of each graph against the PyTorch embeddings of PARITY_TEXTS)
+    to `output_dir`. Needs torch and sentence-transformers, which only this function imports.
+    """
+    import torch
+    from sentence_transformers import SentenceTransformer
+
+    os.makedirs(output_dir, exist_ok=True)
+    model = SentenceTransformer(model_name, cache_folder=cache_folder, device="cpu")
+    module_types = [type(module).__name__ for module in model]
+    if module_types[:2] != ["Transformer", "Pooling"] or set(module_types[2:]) - {"Normalize"}:
+        raise ValueError(f"Cannot export {model_name}: unsupported modules {module_types}")
+
+    tokenizer = model.tokenizer
+    tokenizer.save_pretrained(output_dir)
+    if not os.path.exists(os.path.join(output_dir, TOKENIZER_FILE)):
+        raise ValueError(f"Cannot export {model_name}: its tokenizer has no fast (tokenizer.json) version")
+
+    input_names = [name for name in ("input_ids", "attention_mask", "token_type_ids")
+                   if name in tokenizer.model_input_names]
+    transformer = model[0].auto_model.eval()
+
+    class TokenEmbeddings(torch.nn.Module):
+        def __init__(self):
+            super().__init__()
+            self.transformer = transformer
+
+        def forward(self, *inputs):
+            return self.transformer(**dict(zip(input_names, inputs))).last_hidden_state
+
+    sample = tokenizer(list(PARITY_TEXTS[:2]), padding=True, return_tensors="pt")
+    dynamic_axes = {name: {0: "batch", 1: "sequence"} for name in input_names + ["token_embeddings"]}
+    fp32_path = os.path.join(output_dir, MODEL_FILES["fp32"])
+    with torch.no_grad():
+        torch.onnx.export(
+            TokenEmbeddings(), tuple(sample[name] for name in input_names), fp32_path, input_names=input_names,
+            output_names=["token_embeddings"], dynamic_axes=dynamic_axes, opset_version=opset, dynamo=False,
+        )
+    variants = ["fp32"]
+    if quantize:
+        from onnxruntime.quantization import QuantType, quantize_dynamic
+
+        quantize_dynamic(fp32_path, os.path.join(output_dir, MODEL_FILES["int8"]), weight_type=QuantType.QInt8)
+        variants.append("int8")
+
+    config = {
+        "model_name": model_name,
+        "pooling_mode": _pooling_mode(model[1]),
+        "normalize": "Normalize" in module_types,
+        "max_seq_length": model.max_seq_length,
+        "pad_token": tokenizer.pad_token,
+        "pad_token_id": tokenizer.pad_token_id,
+        "opset": opset,
+    }
+    with open(os.path.join(output_dir, CONFIG_FILE), "w", encoding="utf-8") as f:
+        json.dump(config, f, indent=2)
+
+    reference = model.encode(list(PARITY_TEXTS), show_progress_bar=False)
+    config["parity"] = {}
+    for variant in variants:
+        embeddings = OnnxEncoder(output_dir, variant).encode(list(PARITY_TEXTS))
+        similarities = cosine_similarities(reference, embeddings)
+        config["parity"][variant] = {
+            "min_cosine": float(similarities.min()),
+            "mean_cosine": float(similarities.mean()),
+            "max_abs_diff": float(np.abs(reference - embeddings).max()),
+        }
+        logger.info(f"ONNX {variant} export of {model_name} against PyTorch: {config['parity'][variant]}")
+    with open(os.path.join(output_dir, CONFIG_FILE), "w", encoding="utf-8") as f:
+        json.dump(config, f, indent=2)
+    return config
+
+
+class OnnxEmbeddingService(EmbeddingServiceBase):
+    """Service for generating embeddings with an ONNX Runtime export of the SentenceTransformer model."""
+
+    def __init__(self):
+        model_name = os.getenv("SENTENCE_TRANSFORMER", "default-model-name")
+        cache_folder = os.getenv("TRANSFORMERS_CACHE", "/tmp/cache")
+        model_dir = os.getenv("ONNX_MODEL_DIR") or default_model_dir(model_name, cache_folder)
+        quantize = os.getenv("ONNX_QUANTIZE", "True").lower() in ('true', '1', 't')
+        min_cosine = float(os.getenv("ONNX_MIN_COSINE", "0.99"))
+        variant = "int8" if quantize else "fp32"
+        self.model_name = model_name
+
+        if not os.path.exists(os.path.join(model_dir, MODEL_FILES[variant])):
+            logger.info(f"No ONNX {variant} model in {model_dir}; exporting {model_name} (loads PyTorch once).")
+            export_onnx_model(model_name, cache_folder, model_dir, quantize=quantize)
+
+        # ONNX Runtime releases the GIL, so it runs on the shared CPU executor with the torch thread budget
+        self.encoder = OnnxEncoder(model_dir, variant, num_threads=get_executor_pools().torch_threads)
+        parity = self.encoder.config.get("parity", {}).get(variant)
+        if parity is not None and parity["min_cosine"] < min_cosine:
+            raise ValueError(
+                f"ONNX {variant} model in {model_dir} deviates from PyTorch (min cosine {parity['min_cosine']:.4f} "
+                f"< ONNX_MIN_COSINE {min_cosine}); set ONNX_QUANTIZE=False or re-export the model."
+            )
+        self._encode = self.encoder.encode
+        logger.info(f"ONNX Runtime {variant} model initialized with model: {model_name} (parity {parity})")
+
+        # Concurrent requests are coalesced into one encode call; a max batch size of 1 disables batching.
+        max_batch_size = int(os.getenv("EMBEDDING_BATCH_MAX_SIZE", "32"))
+        max_wait_ms = float(os.getenv("EMBEDDING_BATCH_MAX_WAIT_MS", "2"))
+        self.batcher = None
+        if max_batch_size > 1:
+            self.batcher = EmbeddingBatcher(self._encode, max_batch_size, max_wait_ms, run_cpu)
+            logger.info(f"Embedding batching enabled (max_batch_size={max_batch_size}, max_wait_ms={max_wait_ms}).")
+
+    async def generate_embedding(self, text: str):
+        """Generates an embedding for the given text."""
+        try:
+            if self.batcher is not None:
+                embedding = await self.batcher.submit(text)
+            else:
+                embedding = await run_cpu(self._encode, text)
+            logger.debug("Generated embedding for text.")
+            return embedding
+        except Exception as e:
+            logger.error(f"Error generating embedding: {e}", exc_info=True)
+            raise
+
+    async def generate_embeddings(self, texts: List[str]):
+        """Generates embeddings for many texts with a single encode call."""
+        try:
+            embeddings = await run_cpu(self._encode, texts)
+            logger.debug(f"Generated embeddings for {len(texts)} texts.")
+            return embeddings
+        except Exception as e:
+            logger.error(f"Error generating embeddings: {e}", exc_info=True)
+            raise
+
+    def get_batch_metrics(self) -> dict:
+        """Returns achieved batch-size statistics, or an empty dict when batching is disabled."""
+        if self.batcher is None:
+            return {}
+        return self.batcher.metrics.snapshot()
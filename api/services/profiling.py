@@ -0,0 +1,183 @@
+# services/profiling.py
+
+import logging
+import os
+import random
+import re
+import sys
+import threading
+import time
+import tracemalloc
+import uuid
+from collections import Counter, deque
+from contextlib import contextmanager
+from typing import Callable, Generator, Optional
+
+import services.logger_base  # Ensure logging is configured
+
+logger = logging.getLogger(__name__)
+
+MAX_STACK_DEPTH = 64
+# Leaf frames of threads blocked waiting for work; their samples are dropped for background threads.
+_IDLE_FILES = ("threading.py", "queue.py", "selectors.py")
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})"
+
+
+def _fold_stack(frame) -> str:
+    """Formats a stack root-first as `a;b;c`, the collapsed format read by flame graph tools."""
+    labels = []
+    while frame is not None and len(labels) < MAX_STACK_DEPTH:
+        labels.append(_frame_label(frame))
+        frame = frame.f_back
+    return ";".join(reversed(labels))
+
+
+def _is_idle(frame) -> bool:
+    return os.path.basename(frame.f_code.co_filename) in _IDLE_FILES
+
+
+class StackSampler(threading.Thread):
+    """Samples the stacks of the event-loop thread and busy worker threads at a fixed interval.
+
+    Samples are keyed by thread (pool workers are grouped by pool name) and folded
+    stack. The event-loop thread is always sampled so time spent awaiting I/O shows up
+    as `select`; other threads are only counted while they are running something.
+    """
+
+    def __init__(self, interval_seconds: float, loop_thread_id: int):
+        super().__init__(name="profiler", daemon=True)
+        self.interval_seconds = interval_seconds
+        self.loop_thread_id = loop_thread_id
+        self.samples = 0
+        self.stacks = Counter()
+        self._stopped = threading.Event()
+
+    def run(self):
+        own_id = threading.get_ident()
+        thread_names = {}
+        while not self._stopped.wait(self.interval_seconds):
+            self.samples += 1
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id or (thread_id != self.loop_thread_id and _is_idle(frame)):
+                    continue
+                if thread_id not in thread_names:
+                    thread_names.update((thread.ident, re.sub(r"_\d+$", "", thread.name)) for thread in threading.enumerate())
+                name = "loop" if thread_id == self.loop_thread_id else thread_names.get(thread_id, str(thread_id))
+                self.stacks[f"{name};{_fold_stack(frame)}"] += 1
+
+    def stop(self):
+        self._stopped.set()
+        self.join()
+
+
+class RequestProfiler:
+    """Captures statistical CPU profiles of individual requests and keeps the most recent ones.
+
+    A request is profiled when the client asks for it or, with `sample_rate` > 0, at
+    random. Each profile gets its own sampler thread for the duration of the request;
+    requests that are not profiled cost one `should_profile` call.
+    """
+
+    def __init__(
+        self,
+        sample_rate: float = 0.0,
+        interval_seconds: float = 0.001,
+        history: int = 20,
+        top_stacks: int = 50,
+        random_source: Callable[[], float] = random.random,
+    ):
+        self.sample_rate = sample_rate
+        self.interval_seconds = interval_seconds
+        self.top_stacks = top_stacks
+        self.random_source = random_source
+        self._profiles = deque(maxlen=history)
+
+    def should_profile(self, requested: bool = False) -> bool:
+        return requested or (self.sample_rate > 0 and self.random_source() < self.sample_rate)
+
+    @contextmanager
+    def profile(self, name: str) -> Generator[str, None, None]:
+        """Samples stacks while the block runs and stores the result under the yielded profile ID."""
+        profile_id = uuid.uuid4().hex[:16]
+        sampler = StackSampler(self.interval_seconds, threading.get_ident())
+        started_at = time.time()
+        start_time = time.perf_counter()
+        sampler.start()
+        try:
+            yield profile_id
+        finally:
+            sampler.stop()
+            duration = time.perf_counter() - start_time
+            self._profiles.append(self._summarize(profile_id, name, started_at, duration, sampler))
+            logger.info(f"Captured profile {profile_id} of {name} ({sampler.samples} samples, {duration:.4f}s)")
+
+    def _summarize(self, profile_id: str, name: str, started_at: float, duration: float, sampler: StackSampler) -> dict:
+        functions = Counter()
+        for stack, count in sampler.stacks.items():
+            functions[stack.rsplit(";", 1)[-1]] += count
+        return {
+            "id": profile_id,
+            "name": name,
+            "started_at": started_at,
+            "duration_seconds": duration,
+            "interval_seconds": self.interval_seconds,
+            "samples": sampler.samples,
+            "top_functions": [{"function": function, "samples": count}
+                              for function, count in functions.most_common(self.top_stacks)],
+            "stacks": [{"stack": stack, "samples": count} for stack, count in sampler.stacks.most_common()],
+        }
+
+    def list_profiles(self) -> list:
+        return [
+            {key: profile[key] for key in ("id", "name", "started_at", "duration_seconds", "samples")}
+            for profile in reversed(self._profiles)
+        ]
+
+    def get_profile(self, profile_id: str) -> Optional[dict]:
+        return next((profile for profile in self._profiles if profile["id"] == profile_id), None)
+
+
+class MemoryProfiler:
+    """Reports the top allocation sites traced by `tracemalloc` and their change since the last report.
+
+    Tracing is started on construction and slows every allocation down, so this is
+    only created when explicitly enabled.
+    """
+
+    def __init__(self, frames: int = 10):
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(frames)
+            logger.info(f"Started tracemalloc with {frames} frames per traceback.")
+        self._previous = None
+        self._lock = threading.Lock()
+
+    def snapshot(self, limit: int = 20, key_type: str = "lineno") -> dict:
+        """Takes a snapshot; the `diff` is computed against the snapshot of the previous call."""
+        with self._lock:
+            snapshot = tracemalloc.take_snapshot().filter_traces((
+                tracemalloc.Filter(False, tracemalloc.__file__),
+                tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+                tracemalloc.Filter(False, "<unknown>"),
+            ))
+            traced_bytes, peak_bytes = tracemalloc.get_traced_memory()
+            result = {
+                "traced_bytes": traced_bytes,
+                "peak_bytes": peak_bytes,
+                "top": [
+                    {"location": str(stat.traceback[0]), "size_bytes": stat.size, "count": stat.count}
+                    for stat in snapshot.statistics(key_type)[:limit]
+                ],
+                "diff": None,
+            }
+            if self._previous is not None:
+                result["diff"] = [
+                    {"location": str(stat.traceback[0]), "size_bytes": stat.size, "size_diff_bytes": stat.size_diff,
+                     "count": stat.count, "count_diff": stat.count_diff}
+                    for stat in snapshot.compare_to(self._previous, key_type)[:limit]
+                ]
+            self._previous = snapshot
+            return result
@@ -0,0 +1,54 @@
+# services/profiling_handler.py
+
+import logging
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import PlainTextResponse
+from services.executors import run_io
+from services.profiling import MemoryProfiler, RequestProfiler
+from services.service_factory import get_memory_profiler, get_request_profiler
+import services.logger_base  # Ensure logging is configured
+
+logger = logging.getLogger(__name__)
+
+# Admin endpoints for inspecting a live worker; they answer 404 unless profiling is enabled
+profiling_router = APIRouter(prefix="/admin")
+
+
+def _require(profiler, setting: str):
+    if profiler is None:
+        raise HTTPException(status_code=404, detail=f"Profiling is disabled; set {setting}=true to enable it.")
+    return profiler
+
+
+@profiling_router.get("/profiles")
+async def list_profiles(profiler: Optional[RequestProfiler] = Depends(get_request_profiler)):
+    """Lists the most recent request profiles, newest first."""
+    return _require(profiler, "PROFILING_ENABLED").list_profiles()
+
+
+@profiling_router.get("/profiles/{profile_id}")
+async def get_profile(
+    profile_id: str,
+    format: str = Query("json", pattern="^(json|collapsed)$"),
+    profiler: Optional[RequestProfiler] = Depends(get_request_profiler),
+):
+    """Returns one profile as JSON, or as collapsed stacks (`stack count` lines) for flame graph tools."""
+    profile = _require(profiler, "PROFILING_ENABLED").get_profile(profile_id)
+    if profile is None:
+        raise HTTPException(status_code=404, detail=f"Profile {profile_id} not found.")
+    if format == "collapsed":
+        return PlainTextResponse("".join(f"{stack['stack']} {stack['samples']}\n" for stack in profile["stacks"]))
+    return profile
+
+
+@profiling_router.get("/memory")
+async def memory_snapshot(
+    limit: int = Query(20, ge=1, le=500),
+    group_by: str = Query("lineno", pattern="^(lineno|filename|traceback)$"),
+    profiler: Optional[MemoryProfiler] = Depends(get_memory_profiler),
+):
+    """Returns the top allocation sites and their growth since the previous call to this endpoint."""
+    profiler = _require(profiler, "TRACEMALLOC_ENABLED")
+    return await run_io(profiler.snapshot, limit, group_by)
@@ -2,14 +2,54 @@
 
 import os
 import logging
-import asyncio
 
 from abstract.vector_db_base import VectorDBBase
 from qdrant_client import QdrantClient
+from qdrant_client.http import models as qdrant_models
+from services.executors import run_io
 import services.logger_base  # Ensure logging is configured
 
 logger = logging.getLogger(__name__)
 
+# The uploader stamps collection changes into a one-point side collection (see data/qdrant_utils.py).
+VERSION_COLLECTION_SUFFIX = "__meta"
+VERSION_POINT_ID = 0
+
+
+def build_search_params():
+    """Search-time HNSW and quantization settings from the environment, or None for the collection's defaults.
+
+    QDRANT_HNSW_EF widens the HNSW candidate list (recall for latency). On quantized
+    collections, QDRANT_QUANTIZATION_OVERSAMPLING fetches that many times k candidates
+    with the compressed vectors and QDRANT_QUANTIZATION_RESCORE re-scores them with the
+    original vectors.
+    """
+    hnsw_ef = int(os.getenv("QDRANT_HNSW_EF", "0")) or None
+    oversampling = float(os.getenv("QDRANT_QUANTIZATION_OVERSAMPLING", "0")) or None
+    rescore = os.getenv("QDRANT_QUANTIZATION_RESCORE")
+    quantization = None
+    if oversampling is not None or rescore is not None:
+        quantization = qdrant_models.QuantizationSearchParams(
+            rescore=None if rescore is None else rescore.lower() in ('true', '1', 't'),
+            oversampling=oversampling
+        )
+    if hnsw_ef is None and quantization is None:
+        return None
+    return qdrant_models.SearchParams(hnsw_ef=hnsw_ef, quantization=quantization)
+
+
+def build_search_requests(query_embeddings, ks, search_params=None):
+    """Builds one Qdrant search request per query for `search_batch`."""
+    return [
+        qdrant_models.SearchRequest(
+            vector=embedding.tolist() if hasattr(embedding, "tolist") else list(embedding),
+            limit=k,
+            params=search_params,
+            with_payload=True
+        )
+        for embedding, k in zip(query_embeddings, ks)
+    ]
+
 
 class QdrantService(VectorDBBase):
     """Service for interacting with Qdrant vector database."""
@@ -18,19 +58,52 @@ class QdrantService(VectorDBBase):
         qdrant_url = os.getenv("QDRANT_URL")
         self.collection_name = os.getenv('TABLE')
         self.client = QdrantClient(url=qdrant_url)
-        logger.info(f"Qdrant client initialized with URL: {qdrant_url}")
+        self.search_params = build_search_params()
+        logger.info(f"Qdrant client initialized with URL: {qdrant_url} (search params: {self.search_params})")
 
     async def search(self, query_embedding, k: int):
         """Performs a search in the Qdrant database."""
         try:
-            results = await asyncio.to_thread(
+            results = await run_io(
                 self.client.search,
                 collection_name=self.collection_name,
                 query_vector=query_embedding,
-                limit=k
+                limit=k,
+                search_params=self.search_params
             )
             logger.debug(f"Qdrant search results: {results}")
             return results
         except Exception as e:
             logger.error(f"Error during Qdrant search: {e}", exc_info=True)
-            raise
\ No newline at end of file
+            raise
+
+    async def search_batch(self, query_embeddings, ks):
+        """Performs several searches in one Qdrant round trip."""
+        try:
+            results = await run_io(
+                self.client.search_batch,
+                collection_name=self.collection_name,
+                requests=build_search_requests(query_embeddings, ks, self.search_params)
+            )
+            logger.debug(f"Qdrant batch search returned {len(results)} result lists.")
+            return results
+        except Exception as e:
+            logger.error(f"Error during Qdrant batch search: {e}", exc_info=True)
+            raise
+
+    async def get_collection_version(self):
+        """Reads the version stamp the uploader bumps after every collection change."""
+        try:
+            points = await run_io(
+                self.client.retrieve,
+                collection_name=f"{self.collection_name}{VERSION_COLLECTION_SUFFIX}",
+                ids=[VERSION_POINT_ID],
+                with_payload=True,
+                with_vectors=False
+            )
+        except Exception as e:
+            logger.debug(f"Collection version unavailable: {e}")
+            return None
+        if not points:
+            return None
+        return str(points[0].payload.get("version"))
@@ -0,0 +1,155 @@
+# services/response_cache.py
+
+import logging
+import time
+from typing import Awaitable, Callable, Optional
+
+import numpy as np
+
+from services.schema import SearchRequest, SearchResponse
+import services.logger_base  # Ensure logging is configured
+
+logger = logging.getLogger(__name__)
+
+
+class _Partition:
+    """Fixed-capacity ring of unit-normalized query embeddings and their responses."""
+
+    def __init__(self, capacity: int, dim: int):
+        self.vectors = np.zeros((capacity, dim), dtype=np.float32)
+        self.responses = [None] * capacity
+        self.expires_at = np.zeros(capacity, dtype=np.float64)
+        self.size = 0
+        self.next_slot = 0
+
+    def insert(self, vector: np.ndarray, response: SearchResponse, expires_at: float):
+        slot = self.next_slot
+        self.vectors[slot] = vector
+        self.responses[slot] = response
+        self.expires_at[slot] = expires_at
+        self.next_slot = (slot + 1) % len(self.responses)
+        self.size = max(self.size, slot + 1)
+
+
+class SemanticResponseCache:
+    """Reuses `SearchResponse`s of previously answered queries with near-identical embeddings.
+
+    Entries are partitioned by `(k, summarizer)` so a cached response always has the
+    shape the request asked for. A lookup is one matrix-vector product over the
+    partition; the closest entry is reused if its cosine distance is within
+    `max_distance`. When a `version_provider` is given, it is polled at most every
+    `version_check_seconds` and the whole cache is dropped as soon as the collection
+    version changes. Callers pass the `generation` read before computing a response to
+    `store`, so a response computed across an invalidation is not cached.
+    """
+
+    def __init__(
+        self,
+        max_distance: float = 0.05,
+        capacity: int = 1024,
+        ttl_seconds: float = 300.0,
+        version_provider: Optional[Callable[[], Awaitable[Optional[str]]]] = None,
+        version_check_seconds: float = 5.0,
+    ):
+        self.max_distance = max_distance
+        self.capacity = capacity
+        self.ttl_seconds = ttl_seconds
+        self.version_provider = version_provider
+        self.version_check_seconds = version_check_seconds
+        self.version = None
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self.generation = 0
+        self._partitions = {}
+        self._last_version_check = float("-inf")
+
+    @staticmethod
+    def _partition_key(request: SearchRequest):
+        return request.k, bool(request.summarizer)
+
+    @staticmethod
+    def _unit(query_embedding) -> Optional[np.ndarray]:
+        vector = np.asarray(query_embedding, dtype=np.float32).ravel()
+        norm = float(np.linalg.norm(vector))
+        if norm == 0.0:
+            return None
+        return vector / norm
+
+    async def _refresh_version(self):
+        if self.version_provider is None:
+            return
+        now = time.monotonic()
+        if now - self._last_version_check < self.version_check_seconds:
+            return
+        self._last_version_check = now
+        try:
+            version = await self.version_provider()
+        except Exception as e:
+            logger.warning(f"Collection version check failed; keeping version {self.version}: {e}")
+            return
+        if version is None and self.version is not None:
+            # The stamp was readable before, so this is a failed read rather than a new collection
+            logger.warning(f"Collection version unavailable; keeping version {self.version}.")
+            return
+        if version != self.version:
+            if self._partitions:
+                logger.info(f"Collection version changed ({self.version} -> {version}); clearing response cache.")
+                self.invalidations += 1
+            self.clear()
+            self.version = version
+
+    async def lookup(self, query_embedding, request: SearchRequest) -> Optional[SearchResponse]:
+        """Returns a cached response for a semantically equivalent query, if any."""
+        await self._refresh_version()
+        partition = self._partitions.get(self._partition_key(request))
+        vector = self._unit(query_embedding)
+        if partition is None or vector is None or vector.shape[0] != partition.vectors.shape[1]:
+            self.misses += 1
+            return None
+
+        similarities = partition.vectors[:partition.size] @ vector
+        similarities[partition.expires_at[:partition.size] <= time.monotonic()] = -np.inf
+        best = int(np.argmax(similarities))
+        if 1.0 - similarities[best] <= self.max_distance:
+            self.hits += 1
+            logger.debug(f"Response cache hit (cosine distance {1.0 - similarities[best]:.4f}).")
+            return partition.responses[best]
+        self.misses += 1
+        return None
+
+    def store(self, query_embedding, request: SearchRequest, response: SearchResponse,
+              generation: Optional[int] = None):
+        """Remembers the response for later paraphrases of the same query.
+
+        With `generation` (read after the lookup), the response is dropped if the cache was
+        invalidated in the meantime, since it may have been computed against the old collection.
+        """
+        if generation is not None and generation != self.generation:
+            logger.debug("Response cache invalidated while the response was computed; not storing it.")
+            return
+        vector = self._unit(query_embedding)
+        if vector is None:
+            return
+        key = self._partition_key(request)
+        partition = self._partitions.get(key)
+        if partition is None or partition.vectors.shape[1] != vector.shape[0]:
+            partition = _Partition(self.capacity, vector.shape[0])
+            self._partitions[key] = partition
+        expires_at = time.monotonic() + self.ttl_seconds if self.ttl_seconds > 0 else np.inf
+        partition.insert(vector, response, expires_at)
+
+    def clear(self):
+        self._partitions.clear()
+        self.generation += 1
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "entries": sum(partition.size for partition in self._partitions.values()),
+            "hits": self.hits,
+            "misses": self.misses,
+            "invalidations": self.invalidations,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "collection_version": self.version,
+        }
@@ -1,9 +1,11 @@
 # services/schema.py
 
-from typing import List, Optional
+from typing import Any, Dict, List, Optional
 from pydantic import BaseModel, field_validator
 from abstract.schema_base import SchemaBase
 
+MAX_BATCH_SEARCH_SIZE = 512
+
 
 class Payload(BaseModel):
     """Encapsulates text and file_path for documents."""
@@ -43,3 +45,27 @@ class Document(BaseModel, SchemaBase):
 class SearchResponse(BaseModel, SchemaBase):
     documents: List[Document]
     summary: Optional[str] = None
+    degraded: bool = False  # True when summarization was skipped to shed load
+
+
+class BatchSearchRequest(BaseModel, SchemaBase):
+    # Items are validated one by one in the handler so a bad query is reported per item.
+    requests: List[Dict[str, Any]]
+
+    @field_validator('requests')
+    def requests_within_batch_limit(cls, v):
+        if not v:
+            raise ValueError('Batch must contain at least one request.')
+        if len(v) > MAX_BATCH_SEARCH_SIZE:
+            raise ValueError(f'Batch must not contain more than {MAX_BATCH_SEARCH_SIZE} requests.')
+        return v
+
+
+class BatchSearchResult(BaseModel, SchemaBase):
+    index: int
+    response: Optional[SearchResponse] = None
+    error: Optional[str] = None
+
+
+class BatchSearchResponse(BaseModel, SchemaBase):
+    results: List[BatchSearchResult]
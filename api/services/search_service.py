@@ -24,4 +24,14 @@ class SearchService(SearchServiceBase):
             return results
         except Exception as e:
             logger.error(f"Error during search: {e}", exc_info=True)
-            raise
\ No newline at end of file
+            raise
+
+    async def search_batch(self, query_embeddings, ks):
+        """Performs several searches using the vector database service's batch API."""
+        try:
+            results = await self.vector_db_service.search_batch(query_embeddings, ks)
+            logger.debug("Batch search completed.")
+            return results
+        except Exception as e:
+            logger.error(f"Error during batch search: {e}", exc_info=True)
+            raise
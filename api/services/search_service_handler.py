@@ -1,19 +1,42 @@
 # services/search_service_handler.py
 
+import asyncio
+import json
 import logging
 import time
 from contextlib import contextmanager
-from typing import Any, Generator
+from typing import Any, AsyncIterator, Generator, Optional
 
-from fastapi import APIRouter, Depends
-from services.schema import SearchRequest, SearchResponse
+from fastapi import APIRouter, Depends, Header, Response
+from fastapi.responses import StreamingResponse
+from pydantic import ValidationError
+from services.schema import (
+    SearchRequest,
+    SearchResponse,
+    BatchSearchRequest,
+    BatchSearchResult,
+    BatchSearchResponse,
+)
 from services.service_factory import (
     get_search_service,
     get_format_service,
     get_embedding_service,
     get_summarization_service,
+    get_response_cache,
+    get_admission_controller,
+    get_request_profiler,
 )
 from services.search_service import SearchService
+from services.response_cache import SemanticResponseCache
+from services.admission_control import AdmissionController, NO_LIMIT
+from services.profiling import RequestProfiler
+from services.metrics import (
+    REQUEST_ERRORS,
+    collect_stage_timings,
+    observe_stage,
+    server_timing_header,
+    track_request,
+)
 import services.logger_base  # Ensure logging is configured
 
 logger = logging.getLogger(__name__)
@@ -23,13 +46,21 @@ search_router = APIRouter()
 
 
 @contextmanager
-def timeit(name: str) -> Generator[None, None, None]:
+def timeit(name: str, stage: Optional[str] = None) -> Generator[None, None, None]:
+    """Logs the duration of a block and, when `stage` is given, records it in the stage latency histogram."""
     start_time = time.perf_counter()
     yield
     elapsed_time = time.perf_counter() - start_time
+    if stage is not None:
+        observe_stage(stage, elapsed_time)
     logger.debug(f"{name} completed in {elapsed_time:.4f} seconds.")
 
 
+def sse_event(event: str, data: Any) -> str:
+    """Formats one Server-Sent Events message with a JSON payload."""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
 class SearchServiceHandler:
     """Service handler class to perform search and summarization logic."""
 
@@ -38,49 +69,253 @@ class SearchServiceHandler:
         search_service: SearchService,
         embedding_service: Any,
         format_service: Any,
-        summarization_service: Any,
+        summarization_service: Optional[Any],
+        response_cache: Optional[SemanticResponseCache] = None,
+        admission_controller: Optional[AdmissionController] = None,
     ):
         self.search_service = search_service
         self.embedding_service = embedding_service
         self.format_service = format_service
         self.summarization_service = summarization_service
+        self.response_cache = response_cache
+        self.admission_controller = admission_controller
+
+    def _admit(self):
+        """Reserves an admission slot, raising ServiceOverloadedError when the queue is full."""
+        if self.admission_controller is None:
+            return NO_LIMIT
+        return self.admission_controller.reserve()
+
+    def _stage(self, name: str):
+        """Returns the concurrency limiter guarding a pipeline stage."""
+        if self.admission_controller is None:
+            return NO_LIMIT
+        return self.admission_controller.stage(name)
+
+    def _wants_summary(self, request: SearchRequest) -> bool:
+        """Summaries are skipped silently when no summarization service is configured."""
+        return request.summarizer and self.summarization_service is not None
+
+    def _shed_summarization(self) -> bool:
+        return self.admission_controller is not None and self.admission_controller.should_shed_summarization()
+
+    def check_admission(self):
+        """Fails fast with ServiceOverloadedError before a streaming response is started."""
+        if self.admission_controller is not None:
+            self.admission_controller.check()
 
     async def perform_search(self, request: SearchRequest) -> SearchResponse:
         logger.info("Received search request")
 
-        try:
-            # Generate embedding for the query
-            with timeit("Embedding generation"):
+        with track_request("search"):
+            return await self._perform_search(request)
+
+    async def _perform_search(self, request: SearchRequest) -> SearchResponse:
+        async with self._admit():
+            try:
+                # Generate embedding for the query
+                with timeit("Embedding generation", "embedding"):
+                    async with self._stage("embedding"):
+                        query_embedding = await self.embedding_service.generate_embedding(request.query)
+                    logger.debug(f"Query Embedding: {query_embedding}")
+
+                # Reuse the answer of a previously seen paraphrase, skipping search and summarization
+                cache_generation = None
+                if self.response_cache is not None:
+                    cached_response = await self.response_cache.lookup(query_embedding, request)
+                    if cached_response is not None:
+                        logger.info("Served search request from response cache")
+                        return cached_response
+                    cache_generation = self.response_cache.generation
+
+                # Search documents
+                with timeit("Document search", "search"):
+                    async with self._stage("search"):
+                        search_results = await self.search_service.search(query_embedding, request.k)
+                    logger.debug(f"Search Results: {search_results}")
+
+                # Format documents
+                with timeit("Document formatting", "formatting"):
+                    formatted_documents = self.format_service.format_documents(search_results)
+                    logger.debug(f"Formatted Documents: {formatted_documents}")
+
+                # Summarize if requested, unless the service is shedding load
+                summary = ""
+                degraded = False
+                if self._wants_summary(request) and self._shed_summarization():
+                    logger.warning("Skipping summarization under load")
+                    degraded = True
+                elif self._wants_summary(request):
+                    with timeit("Summarization", "summarization"):
+                        async with self._stage("summarization"):
+                            # Pass request.query as the question to the summarization service
+                            summary = await self.summarization_service.summarize(
+                                [doc.payload.text for doc in formatted_documents[:5]], request.query
+                            )
+                        logger.debug(f"Summary: {summary}")
+
+                logger.info("Processed search request")
+
+                response = SearchResponse(documents=formatted_documents, summary=summary, degraded=degraded)
+                if self.response_cache is not None and not degraded:
+                    self.response_cache.store(query_embedding, request, response, cache_generation)
+                return response
+
+            except Exception as e:
+                logger.error(f"Error in perform_search: {e}", exc_info=True)
+                raise
+
+    async def stream_search(self, request: SearchRequest) -> AsyncIterator[str]:
+        """Streams a search as Server-Sent Events.
+
+        Emits a `documents` event as soon as the vector search returns, then one
+        `summary` event per summary chunk when summarization is requested, and
+        finally a `done` event carrying the complete summary and the `degraded` flag. Failures are reported
+        as an `error` event since the response status has already been sent.
+        """
+        logger.info("Received streaming search request")
+        with track_request("stream"):
+            try:
+                async with self._admit():
+                    async for event in self._stream_search(request):
+                        yield event
+            except Exception as e:
+                logger.error(f"Error in stream_search: {e}", exc_info=True)
+                REQUEST_ERRORS.labels("stream").inc()
+                yield sse_event("error", {"detail": "Internal Server Error"})
+
+    async def _stream_search(self, request: SearchRequest) -> AsyncIterator[str]:
+        with timeit("Embedding generation", "embedding"):
+            async with self._stage("embedding"):
                 query_embedding = await self.embedding_service.generate_embedding(request.query)
-                logger.debug(f"Query Embedding: {query_embedding}")
 
-            # Search documents
-            with timeit("Document search"):
+        cache_generation = None
+        if self.response_cache is not None:
+            cached_response = await self.response_cache.lookup(query_embedding, request)
+            if cached_response is not None:
+                logger.info("Served streaming search request from response cache")
+                yield sse_event("documents", {"documents": [doc.model_dump() for doc in cached_response.documents]})
+                if cached_response.summary:
+                    yield sse_event("summary", {"token": cached_response.summary})
+                yield sse_event("done", {"summary": cached_response.summary})
+                return
+            cache_generation = self.response_cache.generation
+
+        with timeit("Document search", "search"):
+            async with self._stage("search"):
                 search_results = await self.search_service.search(query_embedding, request.k)
-                logger.debug(f"Search Results: {search_results}")
-
-            # Format documents
-            with timeit("Document formatting"):
-                formatted_documents = self.format_service.format_documents(search_results)
-                logger.debug(f"Formatted Documents: {formatted_documents}")
-
-            # Summarize if requested
-            summary = ""
-            if request.summarizer:
-                with timeit("Summarization"):
-                    # Pass request.query as the question to the summarization service
-                    summary = await self.summarization_service.summarize(
+
+        with timeit("Document formatting", "formatting"):
+            formatted_documents = self.format_service.format_documents(search_results)
+        yield sse_event("documents", {"documents": [doc.model_dump() for doc in formatted_documents]})
+
+        summary = ""
+        degraded = False
+        if self._wants_summary(request) and self._shed_summarization():
+            logger.warning("Skipping summarization under load")
+            degraded = True
+        elif self._wants_summary(request):
+            with timeit("Streaming summarization", "summarization"):
+                async with self._stage("summarization"):
+                    chunks = []
+                    async for chunk in self.summarization_service.summarize_stream(
                         [doc.payload.text for doc in formatted_documents[:5]], request.query
+                    ):
+                        chunks.append(chunk)
+                        yield sse_event("summary", {"token": chunk})
+                    summary = "".join(chunks)
+
+        if self.response_cache is not None and not degraded:
+            self.response_cache.store(
+                query_embedding, request, SearchResponse(documents=formatted_documents, summary=summary),
+                cache_generation
+            )
+        yield sse_event("done", {"summary": summary, "degraded": degraded})
+        logger.info("Processed streaming search request")
+
+    async def perform_batch_search(self, batch_request: BatchSearchRequest) -> BatchSearchResponse:
+        """Embeds, searches and formats many requests at once, reporting failures per item."""
+        logger.info(f"Received batch search request with {len(batch_request.requests)} items")
+        with track_request("batch"):
+            async with self._admit():
+                return await self._perform_batch_search(batch_request)
+
+    async def _perform_batch_search(self, batch_request: BatchSearchRequest) -> BatchSearchResponse:
+        results = [BatchSearchResult(index=i) for i in range(len(batch_request.requests))]
+
+        requests = {}
+        for i, item in enumerate(batch_request.requests):
+            try:
+                requests[i] = SearchRequest(**item)
+            except ValidationError as e:
+                results[i].error = "; ".join(error["msg"] for error in e.errors())
+        if not requests:
+            return BatchSearchResponse(results=results)
+        indices = list(requests)
+
+        # Generate all embeddings with one encode call
+        try:
+            with timeit("Batch embedding generation", "embedding"):
+                async with self._stage("embedding"):
+                    query_embeddings = await self.embedding_service.generate_embeddings(
+                        [requests[i].query for i in indices]
                     )
-                    logger.debug(f"Summary: {summary}")
+        except Exception as e:
+            logger.error(f"Error in batch embedding generation: {e}", exc_info=True)
+            for i in indices:
+                results[i].error = f"Embedding generation failed: {e}"
+            return BatchSearchResponse(results=results)
+
+        # Search documents for all queries in one round trip
+        with timeit("Batch document search", "search"):
+            async with self._stage("search"):
+                search_results = await self._search_batch(query_embeddings, [requests[i].k for i in indices])
+
+        # Format documents
+        with timeit("Batch document formatting", "formatting"):
+            for i, hits in zip(indices, search_results):
+                if isinstance(hits, Exception):
+                    results[i].error = f"Search failed: {hits}"
+                else:
+                    results[i].response = SearchResponse(documents=self.format_service.format_documents(hits), summary="")
+
+        # Summarize the requests that asked for it, concurrently
+        to_summarize = [i for i in indices if self._wants_summary(requests[i]) and results[i].response is not None]
+        if to_summarize and self._shed_summarization():
+            logger.warning("Skipping batch summarization under load")
+            for i in to_summarize:
+                results[i].response.degraded = True
+            to_summarize = []
+        if to_summarize:
+            with timeit("Batch summarization", "summarization"):
+                summaries = await asyncio.gather(
+                    *(self._summarize_limited(results[i].response.documents, requests[i].query) for i in to_summarize),
+                    return_exceptions=True,
+                )
+            for i, summary in zip(to_summarize, summaries):
+                if isinstance(summary, Exception):
+                    results[i].error = f"Summarization failed: {summary}"
+                    results[i].response = None
+                else:
+                    results[i].response.summary = summary
 
-            logger.info("Processed search request")
+        logger.info("Processed batch search request")
+        return BatchSearchResponse(results=results)
 
-            return SearchResponse(documents=formatted_documents, summary=summary)
+    async def _summarize_limited(self, documents, query: str) -> str:
+        async with self._stage("summarization"):
+            return await self.summarization_service.summarize([doc.payload.text for doc in documents[:5]], query)
 
+    async def _search_batch(self, query_embeddings, ks):
+        """Runs a batched search, falling back to per-query searches to isolate a failing item."""
+        try:
+            return await self.search_service.search_batch(query_embeddings, ks)
         except Exception as e:
-            logger.error(f"Error in perform_search: {e}", exc_info=True)
-            raise
+            logger.warning(f"Batch search failed, retrying queries individually: {e}")
+        return await asyncio.gather(
+            *(self.search_service.search(embedding, k) for embedding, k in zip(query_embeddings, ks)),
+            return_exceptions=True,
+        )
 
 
 # Define a function to instantiate SearchServiceHandler with injected dependencies
@@ -89,18 +324,60 @@ def get_search_service_handler(
     embedding_service=Depends(get_embedding_service),
     format_service=Depends(get_format_service),
     summarization_service=Depends(get_summarization_service),
+    response_cache=Depends(get_response_cache),
+    admission_controller=Depends(get_admission_controller),
 ):
     return SearchServiceHandler(
         search_service=search_service,
         embedding_service=embedding_service,
         format_service=format_service,
         summarization_service=summarization_service,
+        response_cache=response_cache,
+        admission_controller=admission_controller,
     )
 
 
 @search_router.post("/api/search", response_model=SearchResponse)
 async def search(
     request: SearchRequest,
+    response: Response,
+    x_profile: Optional[str] = Header(None),
+    search_service_handler: SearchServiceHandler = Depends(get_search_service_handler),
+    profiler: Optional[RequestProfiler] = Depends(get_request_profiler),
+):
+    with collect_stage_timings() as timings:
+        if profiler is None or not profiler.should_profile(x_profile is not None and x_profile.lower() in ('true', '1', 't')):
+            search_response = await search_service_handler.perform_search(request)
+        else:
+            # Profile this request; the result is served from /admin/profiles/<X-Profile-Id>
+            with profiler.profile("perform_search") as profile_id:
+                search_response = await search_service_handler.perform_search(request)
+            response.headers["X-Profile-Id"] = profile_id
+    response.headers["Server-Timing"] = server_timing_header(timings)
+    return search_response
+
+
+@search_router.post("/api/search/stream")
+async def search_stream(
+    request: SearchRequest,
+    search_service_handler: SearchServiceHandler = Depends(get_search_service_handler),
+):
+    search_service_handler.check_admission()
+    return StreamingResponse(
+        search_service_handler.stream_search(request),
+        media_type="text/event-stream",
+        # Disable proxy buffering (nginx) so events reach the client as they are produced
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@search_router.post("/api/search/batch", response_model=BatchSearchResponse)
+async def search_batch(
+    request: BatchSearchRequest,
+    response: Response,
     search_service_handler: SearchServiceHandler = Depends(get_search_service_handler),
 ):
-    return await search_service_handler.perform_search(request)
+    with collect_stage_timings() as timings:
+        batch_response = await search_service_handler.perform_batch_search(request)
+    response.headers["Server-Timing"] = server_timing_header(timings)
+    return batch_response
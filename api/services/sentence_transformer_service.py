@@ -2,14 +2,29 @@
 
 import logging
 import os
-import asyncio
+from typing import List
 
 from sentence_transformers import SentenceTransformer
 from abstract.embedding_base import EmbeddingServiceBase
+from services.embedding_batcher import EmbeddingBatcher
+from services.executors import available_cpus, get_executor_pools, run_cpu, set_torch_threads, start_process_pool
 import services.logger_base  # Ensure logging is configured
 
 logger = logging.getLogger(__name__)
 
+# Model loaded by each embedding worker process (see EMBEDDING_PROCESS_WORKERS).
+_worker_model = None
+
+
+def _init_embedding_worker(model_name: str, cache_folder: str, torch_threads: int):
+    global _worker_model
+    set_torch_threads(torch_threads)
+    _worker_model = SentenceTransformer(model_name, cache_folder=cache_folder)
+
+
+def _encode_in_worker(texts):
+    return _worker_model.encode(texts)
+
 
 class SentenceTransformerEmbeddingService(EmbeddingServiceBase):
     """Service for generating embeddings using SentenceTransformer."""
@@ -17,15 +32,59 @@ class SentenceTransformerEmbeddingService(EmbeddingServiceBase):
     def __init__(self):
         model_name = os.getenv("SENTENCE_TRANSFORMER", "default-model-name")
         cache_folder = os.getenv("TRANSFORMERS_CACHE", "/tmp/cache")
-        self.model = SentenceTransformer(model_name, cache_folder=cache_folder)
-        logger.info(f"SentenceTransformer model initialized with model: {model_name}")
+        self.model_name = model_name
+
+        # Encoding runs on the shared CPU executor, or in worker processes that each load the model.
+        process_workers = int(os.getenv("EMBEDDING_PROCESS_WORKERS", "0"))
+        self.process_pool = None
+        if process_workers > 0:
+            torch_threads = int(os.getenv("TORCH_NUM_THREADS", "0")) or max(1, available_cpus() // process_workers)
+            self.model = None
+            self.process_pool = start_process_pool(
+                "embedding", process_workers, _init_embedding_worker, (model_name, cache_folder, torch_threads)
+            )
+            self._encode, self._run_encode = _encode_in_worker, self.process_pool.run
+            logger.info(f"SentenceTransformer model {model_name} served by {process_workers} worker processes")
+        else:
+            # Torch is loaded with this module, possibly after the executor pools chose the thread count
+            set_torch_threads(get_executor_pools().torch_threads)
+            self.model = SentenceTransformer(model_name, cache_folder=cache_folder)
+            self._encode, self._run_encode = self.model.encode, run_cpu
+            logger.info(f"SentenceTransformer model initialized with model: {model_name}")
+
+        # Concurrent requests are coalesced into one encode call; a max batch size of 1 disables batching.
+        max_batch_size = int(os.getenv("EMBEDDING_BATCH_MAX_SIZE", "32"))
+        max_wait_ms = float(os.getenv("EMBEDDING_BATCH_MAX_WAIT_MS", "2"))
+        self.batcher = None
+        if max_batch_size > 1:
+            self.batcher = EmbeddingBatcher(self._encode, max_batch_size, max_wait_ms, self._run_encode)
+            logger.info(f"Embedding batching enabled (max_batch_size={max_batch_size}, max_wait_ms={max_wait_ms}).")
 
     async def generate_embedding(self, text: str):
         """Generates an embedding for the given text."""
         try:
-            embedding = await asyncio.to_thread(self.model.encode, text)
+            if self.batcher is not None:
+                embedding = await self.batcher.submit(text)
+            else:
+                embedding = await self._run_encode(self._encode, text)
             logger.debug("Generated embedding for text.")
             return embedding
         except Exception as e:
             logger.error(f"Error generating embedding: {e}", exc_info=True)
-            raise
\ No newline at end of file
+            raise
+
+    async def generate_embeddings(self, texts: List[str]):
+        """Generates embeddings for many texts with a single encode call."""
+        try:
+            embeddings = await self._run_encode(self._encode, texts)
+            logger.debug(f"Generated embeddings for {len(texts)} texts.")
+            return embeddings
+        except Exception as e:
+            logger.error(f"Error generating embeddings: {e}", exc_info=True)
+            raise
+
+    def get_batch_metrics(self) -> dict:
+        """Returns achieved batch-size statistics, or an empty dict when batching is disabled."""
+        if self.batcher is None:
+            return {}
+        return self.batcher.metrics.snapshot()
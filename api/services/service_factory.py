@@ -3,10 +3,12 @@
 import os
 import logging
 from functools import lru_cache
+from typing import Optional
 
-from services.qdrant_service import QdrantService
-from services.sentence_transformer_service import SentenceTransformerEmbeddingService
-from services.summarization_service import SummarizationService
+from services.embedding_cache import CachedEmbeddingService, EmbeddingCache
+from services.response_cache import SemanticResponseCache
+from services.admission_control import AdmissionController
+from services.profiling import MemoryProfiler, RequestProfiler
 from services.document_formatter import DocumentFormatter
 from services.search_service import SearchService
 from services.prompt_service import FilePromptService
@@ -18,14 +20,30 @@ import services.logger_base
 
 logger = logging.getLogger(__name__)
 
+# Backends are imported inside the factories so that only the selected backend's heavy dependencies
+# (torch and sentence-transformers, onnxruntime, qdrant-client, google-generativeai) are loaded.
+
 
 @lru_cache()
 def get_vector_db_service() -> VectorDBBase:
     """Get the vector database service instance based on environment configuration."""
     db_type = os.getenv("VECTOR_DB_TYPE", "qdrant")
     if db_type == "qdrant":
+        from services.qdrant_service import QdrantService
         logger.info("Initializing QdrantService.")
         return QdrantService()
+    elif db_type == "qdrant_async":
+        from services.async_qdrant_service import AsyncQdrantService
+        logger.info("Initializing AsyncQdrantService.")
+        return AsyncQdrantService()
+    elif db_type == "mmap":
+        from services.mmap_vector_service import MmapVectorService
+        logger.info("Initializing MmapVectorService.")
+        return MmapVectorService()
+    elif db_type == "ivfpq":
+        from services.ivfpq_vector_service import IvfPqVectorService
+        logger.info("Initializing IvfPqVectorService.")
+        return IvfPqVectorService()
     else:
         raise ValueError(f"Unsupported VECTOR_DB_TYPE: {db_type}")
 
@@ -35,17 +53,35 @@ def get_embedding_service() -> EmbeddingServiceBase:
     """Get the embedding service instance."""
     embedding_type = os.getenv("EMBEDDING_SERVICE_TYPE", "sentence_transformer")
     if embedding_type == "sentence_transformer":
+        from services.sentence_transformer_service import SentenceTransformerEmbeddingService
         logger.info("Initializing SentenceTransformerEmbeddingService.")
-        return SentenceTransformerEmbeddingService()
+        embedding_service = SentenceTransformerEmbeddingService()
+    elif embedding_type == "onnx":
+        from services.onnx_embedding_service import OnnxEmbeddingService
+        logger.info("Initializing OnnxEmbeddingService.")
+        embedding_service = OnnxEmbeddingService()
     else:
         raise ValueError(f"Unsupported EMBEDDING_SERVICE_TYPE: {embedding_type}")
 
+    if os.getenv("EMBEDDING_CACHE_ENABLED", "True").lower() in ('true', '1', 't'):
+        cache = EmbeddingCache(
+            max_bytes=int(os.getenv("EMBEDDING_CACHE_MAX_BYTES", str(32 * 1024 * 1024))),
+            ttl_seconds=float(os.getenv("EMBEDDING_CACHE_TTL_SECONDS", "3600")),
+        )
+        casefold = os.getenv("EMBEDDING_CACHE_CASEFOLD", "True").lower() in ('true', '1', 't')
+        embedding_service = CachedEmbeddingService(embedding_service, cache, casefold=casefold)
+    return embedding_service
+
 
 @lru_cache()
-def get_summarization_service() -> SummarizationBase:
-    """Get the summarization service instance."""
+def get_summarization_service() -> Optional[SummarizationBase]:
+    """Get the summarization service instance, or None when no Gemini API key is configured."""
     summarizer_type = os.getenv("SUMMARIZATION_SERVICE_TYPE", "default")
     if summarizer_type == "default":
+        if not os.getenv("GEMINI_API_KEY"):
+            logger.warning("GEMINI_API_KEY is not set; summarization is disabled.")
+            return None
+        from services.summarization_service import SummarizationService
         logger.info("Initializing SummarizationService.")
         return SummarizationService()
     else:
@@ -66,6 +102,62 @@ def get_format_service() -> DocumentFormatter:
     logger.info("Initializing DocumentFormatter.")
     return DocumentFormatter()
 
+@lru_cache()
+def get_response_cache() -> Optional[SemanticResponseCache]:
+    """Provides the semantic response cache, or None when it is disabled."""
+    if os.getenv("SEARCH_CACHE_ENABLED", "True").lower() not in ('true', '1', 't'):
+        return None
+    logger.info("Initializing SemanticResponseCache.")
+    return SemanticResponseCache(
+        max_distance=float(os.getenv("SEARCH_CACHE_MAX_DISTANCE", "0.05")),
+        capacity=int(os.getenv("SEARCH_CACHE_CAPACITY", "1024")),
+        ttl_seconds=float(os.getenv("SEARCH_CACHE_TTL_SECONDS", "300")),
+        version_provider=get_vector_db_service().get_collection_version,
+        version_check_seconds=float(os.getenv("SEARCH_CACHE_VERSION_CHECK_SECONDS", "5")),
+    )
+
+
+@lru_cache()
+def get_admission_controller() -> Optional[AdmissionController]:
+    """Provides the admission controller guarding the search pipeline, or None when disabled."""
+    if os.getenv("ADMISSION_CONTROL_ENABLED", "True").lower() not in ('true', '1', 't'):
+        return None
+    logger.info("Initializing AdmissionController.")
+    return AdmissionController(
+        max_in_flight=int(os.getenv("ADMISSION_MAX_IN_FLIGHT", "64")),
+        max_queue=int(os.getenv("ADMISSION_MAX_QUEUE", "256")),
+        stage_limits={
+            "embedding": int(os.getenv("ADMISSION_EMBEDDING_CONCURRENCY", "32")),
+            "search": int(os.getenv("ADMISSION_SEARCH_CONCURRENCY", "32")),
+            "summarization": int(os.getenv("ADMISSION_SUMMARIZATION_CONCURRENCY", "8")),
+        },
+        degrade_queue_depth=int(os.getenv("ADMISSION_DEGRADE_QUEUE_DEPTH", "32")),
+        retry_after_seconds=float(os.getenv("ADMISSION_RETRY_AFTER_SECONDS", "1")),
+    )
+
+
+@lru_cache()
+def get_request_profiler() -> Optional[RequestProfiler]:
+    """Provides the per-request CPU profiler, or None when profiling is disabled (the default)."""
+    if os.getenv("PROFILING_ENABLED", "False").lower() not in ('true', '1', 't'):
+        return None
+    logger.info("Initializing RequestProfiler.")
+    return RequestProfiler(
+        sample_rate=float(os.getenv("PROFILE_SAMPLE_RATE", "0")),
+        interval_seconds=float(os.getenv("PROFILE_INTERVAL_MS", "1")) / 1000,
+        history=int(os.getenv("PROFILE_HISTORY", "20")),
+    )
+
+
+@lru_cache()
+def get_memory_profiler() -> Optional[MemoryProfiler]:
+    """Provides the tracemalloc reporter, or None when memory tracing is disabled (the default)."""
+    if os.getenv("TRACEMALLOC_ENABLED", "False").lower() not in ('true', '1', 't'):
+        return None
+    logger.info("Initializing MemoryProfiler.")
+    return MemoryProfiler(frames=int(os.getenv("TRACEMALLOC_FRAMES", "10")))
+
+
 @lru_cache()
 def get_prompt_service() -> PromptBase:
     """Get the prompt service instance based on environment configuration."""
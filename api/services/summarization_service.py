@@ -3,10 +3,12 @@
 import os
 import logging
 import asyncio
-from typing import List
+from typing import AsyncIterator, List
 from requests.exceptions import RequestException
 
 from abstract.summarization_base import SummarizationBase
+from services.executors import run_io
+from services.metrics import SUMMARIZATION_RETRIES
 import services.logger_base  # Ensure logging is configured
 
 logger = logging.getLogger(__name__)
@@ -37,29 +39,34 @@ class SummarizationService(SummarizationBase):
         self.model = genai.GenerativeModel(model_name)
         logger.info(f"SummarizationService initialized with Gemini model: {model_name}")
 
+    @staticmethod
+    def _build_prompt(texts: List[str], question: str) -> str:
+        """Builds the summarization prompt for the given documents and question."""
+        # Combine texts into a single text block, adding distinct separation
+        text = '\n\n'.join(texts)[:3000]  # Adjust length as needed to fit context
+        logger.debug(f"Input text for summarization: {text}")
+        logger.debug(f"The question is: {question}")
+
+        # Construct a prompt emphasizing a targeted, relevant summary
+        return (
+            f"From the documents below, summarize the content that best answers the question shared with tag question: from content with tag as Documents: "
+            f"Focus only on relevant information and avoid adding anything extra and a.\n\n"
+            f"Question: {question}\n"
+            f"Documents:\n{text}\n\n"
+            f"Provide the best summary answer based solely on the provided documents."
+        )
+
     async def summarize(self, texts: List[str], question: str) -> str:
         """Summarizes the given texts using Gemini LLM."""
         try:
-            # Combine texts into a single text block, adding distinct separation
-            text = '\n\n'.join(texts)[:3000]  # Adjust length as needed to fit context
-            logger.debug(f"Input text for summarization: {text}")
-            logger.debug(f"The question is: {question}")
-
-            # Construct a prompt emphasizing a targeted, relevant summary
-            prompt = (
-                f"From the documents below, summarize the content that best answers the question shared with tag question: from content with tag as Documents: "
-                f"Focus only on relevant information and avoid adding anything extra and a.\n\n"
-                f"Question: {question}\n"
-                f"Documents:\n{text}\n\n"
-                f"Provide the best summary answer based solely on the provided documents."
-            )
+            prompt = self._build_prompt(texts, question)
 
             # Retry loop for generating content
             for attempt in range(1, MAX_RETRIES + 1):
                 try:
                     logger.info(f"Attempting summarization (Attempt {attempt})")
-                    # Since model.generate_content is blocking, run it in a thread
-                    response = await asyncio.to_thread(self.model.generate_content, prompt)
+                    # Since model.generate_content is blocking, run it on the I/O executor
+                    response = await run_io(self.model.generate_content, prompt)
                     summary = response.text  # Extract summary text from the response
                     logger.info("Summary generated successfully.")
                     return summary  # Return if successful
@@ -67,6 +74,7 @@ class SummarizationService(SummarizationBase):
                     logger.error(f"Attempt {attempt} failed with request error: {e}", exc_info=True)
                     if attempt < MAX_RETRIES:
                         logger.info(f"Retrying in {RETRY_DELAY} seconds...")
+                        SUMMARIZATION_RETRIES.inc()
                         await asyncio.sleep(RETRY_DELAY)
                     else:
                         logger.error("Max retries exceeded. Summarization failed.", exc_info=True)
@@ -76,4 +84,33 @@ class SummarizationService(SummarizationBase):
                     raise
         except Exception as e:
             logger.error(f"Error during summarization process: {e}", exc_info=True)
-            raise
\ No newline at end of file
+            raise
+
+    async def summarize_stream(self, texts: List[str], question: str) -> AsyncIterator[str]:
+        """Yields summary text chunks as the Gemini model produces them.
+
+        Failed attempts are retried only until the first chunk has been yielded;
+        after that, an error is raised to the caller since partial output was sent.
+        """
+        prompt = self._build_prompt(texts, question)
+        for attempt in range(1, MAX_RETRIES + 1):
+            started = False
+            try:
+                logger.info(f"Attempting streaming summarization (Attempt {attempt})")
+                response = await self.model.generate_content_async(prompt, stream=True)
+                async for chunk in response:
+                    if chunk.text:
+                        started = True
+                        yield chunk.text
+                logger.info("Streamed summary generated successfully.")
+                return
+            except RequestException as e:
+                logger.error(f"Streaming attempt {attempt} failed with request error: {e}", exc_info=True)
+                if started or attempt == MAX_RETRIES:
+                    raise
+                logger.info(f"Retrying in {RETRY_DELAY} seconds...")
+                SUMMARIZATION_RETRIES.inc()
+                await asyncio.sleep(RETRY_DELAY)
+            except Exception as e:
+                logger.error(f"Unexpected error during streaming summarization: {e}", exc_info=True)
+                raise
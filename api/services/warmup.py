@@ -0,0 +1,143 @@
+# services/warmup.py
+
+import asyncio
+import logging
+import time
+from functools import lru_cache
+from typing import Any, Callable, Optional
+
+from services.executors import get_executor_pools
+from services.service_factory import (
+    get_admission_controller,
+    get_embedding_service,
+    get_format_service,
+    get_response_cache,
+    get_search_service,
+    get_summarization_service,
+)
+import services.logger_base  # Ensure logging is configured
+
+logger = logging.getLogger(__name__)
+
+WARMUP_QUERIES = (
+    "What is the capital of France?",
+    "Who wrote the theory of general relativity?",
+    "When did the Second World War end?",
+    "How does photosynthesis work in plants?",
+)
+
+
+class ReadinessState:
+    """Tracks whether this worker has finished warming up and can serve at steady-state latency."""
+
+    def __init__(self):
+        self.status = "starting"
+        self.attempts = 0
+        self.last_error: Optional[str] = None
+        self.iterations = []
+        self.ready_after_seconds: Optional[float] = None
+        self._started = time.monotonic()
+
+    @property
+    def ready(self) -> bool:
+        return self.status == "ready"
+
+    def mark_ready(self):
+        self.status = "ready"
+        self.last_error = None
+        self.ready_after_seconds = time.monotonic() - self._started
+
+    def snapshot(self) -> dict:
+        return {
+            "status": self.status,
+            "attempts": self.attempts,
+            "last_error": self.last_error,
+            "ready_after_seconds": self.ready_after_seconds,
+            "warmup_iterations": self.iterations,
+        }
+
+
+@lru_cache()
+def get_readiness_state() -> ReadinessState:
+    return ReadinessState()
+
+
+def build_services(resolve: Optional[Callable[[Callable], Any]] = None):
+    """Creates every service up front so the first request does not load the model or open clients.
+
+    `resolve` maps a factory to the service the routes will use, e.g. honouring the
+    app's dependency overrides, so overridden services are not built for nothing.
+    """
+    resolve = resolve or (lambda factory: factory())
+    started = time.perf_counter()
+    get_executor_pools()
+    for factory in (get_embedding_service, get_search_service, get_format_service, get_summarization_service,
+                    get_response_cache, get_admission_controller):
+        resolve(factory)
+    logger.info(f"Services built in {time.perf_counter() - started:.2f} seconds.")
+
+
+async def _warm_up_once(state: ReadinessState, embedding_service: Any, search_service: Any,
+                        iterations: int, k: int, concurrency: int):
+    state.iterations = []
+    for i in range(iterations):
+        # Distinct texts per pass so the embedding cache does not answer instead of the model
+        texts = [f"{query} ({state.attempts}.{i})" for query in WARMUP_QUERIES]
+
+        start_time = time.perf_counter()
+        await asyncio.gather(*(embedding_service.generate_embeddings(texts) for _ in range(concurrency)))
+        batch_seconds = time.perf_counter() - start_time
+
+        start_time = time.perf_counter()
+        embedding = await embedding_service.generate_embedding(f"{WARMUP_QUERIES[0]} [{state.attempts}.{i}]")
+        embedding_seconds = time.perf_counter() - start_time
+
+        start_time = time.perf_counter()
+        await search_service.search(embedding, k)
+        search_seconds = time.perf_counter() - start_time
+
+        state.iterations.append({
+            "batch_embedding_ms": batch_seconds * 1000,
+            "embedding_ms": embedding_seconds * 1000,
+            "search_ms": search_seconds * 1000,
+        })
+        logger.info(f"Warm-up pass {i + 1}/{iterations}: batch embedding {batch_seconds:.3f}s, "
+                    f"embedding {embedding_seconds:.3f}s, search {search_seconds:.3f}s")
+
+
+async def warm_up(
+    state: ReadinessState,
+    embedding_service: Any,
+    search_service: Any,
+    iterations: int = 3,
+    k: int = 5,
+    concurrency: int = 1,
+    retry_seconds: float = 5.0,
+    max_attempts: int = 60,
+):
+    """Runs warm-up encodes and searches until they succeed, then marks the worker ready.
+
+    The first passes pay for lazy initialization (weights paged in, kernels selected,
+    connections opened); later passes show the steady-state latency. Failures, such as
+    Qdrant not accepting connections yet, are retried every `retry_seconds`, at most
+    `max_attempts` times (0 retries forever); after that the worker stays unready with
+    status "failed".
+    """
+    state.status = "warming"
+    while True:
+        state.attempts += 1
+        try:
+            await _warm_up_once(state, embedding_service, search_service, iterations, k, concurrency)
+            state.mark_ready()
+            logger.info(f"Worker ready after {state.ready_after_seconds:.2f} seconds.")
+            return
+        except Exception as e:
+            state.last_error = repr(e)
+            if max_attempts and state.attempts >= max_attempts:
+                state.status = "failed"
+                logger.error(f"Warm-up failed after {state.attempts} attempts; the worker stays unready: {e}",
+                             exc_info=True)
+                return
+            logger.warning(f"Warm-up attempt {state.attempts} failed, retrying in {retry_seconds} seconds: {e}",
+                           exc_info=True)
+            await asyncio.sleep(retry_seconds)
@@ -0,0 +1,55 @@
+# tests/unit/test_admission_control.py
+
+import asyncio
+import pytest
+from services.admission_control import AdmissionController, ServiceOverloadedError
+
+
+@pytest.mark.asyncio
+async def test_admission_controller_rejects_when_queue_is_full():
+    controller = AdmissionController(max_in_flight=1, max_queue=1, retry_after_seconds=2.5)
+    release = asyncio.Event()
+
+    async def hold():
+        async with controller.reserve():
+            await release.wait()
+
+    running = asyncio.create_task(hold())
+    await asyncio.sleep(0)
+    queued = asyncio.create_task(hold())
+    await asyncio.sleep(0)
+
+    # One request running and one queued: the next is rejected without waiting
+    with pytest.raises(ServiceOverloadedError) as exc_info:
+        controller.reserve()
+    assert exc_info.value.retry_after == 2.5
+
+    release.set()
+    await asyncio.gather(running, queued)
+    stats = controller.stats()
+    assert stats['admitted'] == 2
+    assert stats['rejected'] == 1
+    assert stats['in_flight'] == 0 and stats['queue_depth'] == 0
+
+
+@pytest.mark.asyncio
+async def test_admission_controller_stage_limit_and_degrade():
+    controller = AdmissionController(stage_limits={'embedding': 1, 'search': 0}, degrade_queue_depth=1)
+    release = asyncio.Event()
+
+    async def embed():
+        async with controller.stage('embedding'):
+            await release.wait()
+
+    tasks = [asyncio.create_task(embed()) for _ in range(2)]
+    await asyncio.sleep(0)
+
+    # A limit of 0 leaves the stage unlimited; the second embedding waits, deep enough to shed summaries
+    assert 'search' not in controller.stats()['stages']
+    assert controller.stats()['stages']['embedding'] == {'limit': 1, 'in_flight': 1, 'waiting': 1}
+    assert controller.should_shed_summarization()
+
+    release.set()
+    await asyncio.gather(*tasks)
+    assert not controller.should_shed_summarization()
+    assert controller.stats()['degraded'] == 1
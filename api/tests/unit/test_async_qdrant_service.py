@@ -0,0 +1,42 @@
+# tests/unit/test_async_qdrant_service.py
+
+import asyncio
+import pytest
+from unittest.mock import patch, AsyncMock
+from services.async_qdrant_service import AsyncQdrantService
+
+
+@pytest.mark.asyncio
+@patch('services.async_qdrant_service.AsyncQdrantClient')
+async def test_async_qdrant_service_search(mock_async_qdrant_client):
+    # Mock the async Qdrant client
+    mock_client_instance = mock_async_qdrant_client.return_value
+    mock_client_instance.search = AsyncMock(return_value=[{'id': 1, 'score': 0.9}])
+
+    with patch.dict('os.environ', {'QDRANT_URL': 'http://localhost:6333', 'TABLE': 'test_collection',
+                                   'QDRANT_POOL_MAX_CONNECTIONS': '8'}):
+        qdrant_service = AsyncQdrantService()
+
+    results = await qdrant_service.search([0.1, 0.2, 0.3], 5)
+
+    # Assertions
+    mock_client_instance.search.assert_awaited_once_with(
+        collection_name='test_collection', query_vector=[0.1, 0.2, 0.3], limit=5, search_params=None
+    )
+    assert results == [{'id': 1, 'score': 0.9}]
+    assert mock_async_qdrant_client.call_args.kwargs['limits'].max_connections == 8
+
+
+@pytest.mark.asyncio
+@patch('services.async_qdrant_service.AsyncQdrantClient')
+async def test_async_qdrant_service_search_timeout(mock_async_qdrant_client):
+    async def slow_search(**kwargs):
+        await asyncio.sleep(1)
+
+    mock_async_qdrant_client.return_value.search = slow_search
+
+    with patch.dict('os.environ', {'TABLE': 'test_collection', 'QDRANT_TIMEOUT_SECONDS': '0.01'}):
+        qdrant_service = AsyncQdrantService()
+
+    with pytest.raises(asyncio.TimeoutError):
+        await qdrant_service.search([0.1, 0.2, 0.3], 5)
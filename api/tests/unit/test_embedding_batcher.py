@@ -0,0 +1,42 @@
+# tests/unit/test_embedding_batcher.py
+
+import asyncio
+import pytest
+from unittest.mock import MagicMock
+from services.embedding_batcher import EmbeddingBatcher
+
+
+@pytest.mark.asyncio
+async def test_embedding_batcher_coalesces_concurrent_requests():
+    encode = MagicMock(side_effect=lambda texts: [[float(len(t))] for t in texts])
+    batcher = EmbeddingBatcher(encode, max_batch_size=8, max_wait_ms=50)
+
+    texts = ["a", "bb", "ccc", "dddd"]
+    embeddings = await asyncio.gather(*(batcher.submit(t) for t in texts))
+
+    # One encode call for all four requests, rows routed back to their callers
+    encode.assert_called_once_with(texts)
+    assert embeddings == [[1.0], [2.0], [3.0], [4.0]]
+    metrics = batcher.metrics.snapshot()
+    assert metrics['batches'] == 1
+    assert metrics['max_batch_size'] == 4
+
+
+@pytest.mark.asyncio
+async def test_embedding_batcher_respects_max_batch_size():
+    encode = MagicMock(side_effect=lambda texts: [[0.0] for _ in texts])
+    batcher = EmbeddingBatcher(encode, max_batch_size=2, max_wait_ms=50)
+
+    await asyncio.gather(*(batcher.submit(str(i)) for i in range(5)))
+
+    assert all(len(call.args[0]) <= 2 for call in encode.call_args_list)
+    assert batcher.metrics.snapshot()['items'] == 5
+
+
+@pytest.mark.asyncio
+async def test_embedding_batcher_propagates_encode_errors():
+    encode = MagicMock(side_effect=RuntimeError("model failure"))
+    batcher = EmbeddingBatcher(encode, max_batch_size=4, max_wait_ms=1)
+
+    with pytest.raises(RuntimeError):
+        await batcher.submit("text")
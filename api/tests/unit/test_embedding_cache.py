@@ -0,0 +1,64 @@
+# tests/unit/test_embedding_cache.py
+
+import numpy as np
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+from services.embedding_cache import CachedEmbeddingService, EmbeddingCache, normalize_query
+
+
+def test_normalize_query():
+    assert normalize_query("  What is   the Capital\tof France? ") == "what is the capital of france?"
+    assert normalize_query("What  Is", casefold=False) == "What Is"
+
+
+@pytest.mark.asyncio
+async def test_cached_embedding_service_hits_on_normalized_repeat():
+    mock_embedding_service = MagicMock()
+    mock_embedding_service.model_name = 'test_model'
+    mock_embedding_service.generate_embedding = AsyncMock(return_value=[0.1, 0.2, 0.3])
+
+    service = CachedEmbeddingService(mock_embedding_service, EmbeddingCache())
+
+    first = await service.generate_embedding("What is the capital of France?")
+    second = await service.generate_embedding("what is the  capital of france? ")
+
+    # Assertions
+    mock_embedding_service.generate_embedding.assert_awaited_once()
+    assert first.dtype == np.float32
+    np.testing.assert_array_equal(first, second)
+    metrics = service.get_cache_metrics()
+    assert metrics['hits'] == 1
+    assert metrics['misses'] == 1
+
+
+def test_embedding_cache_evicts_least_recently_used():
+    row = np.zeros(4, dtype=np.float32)  # 16 bytes per entry
+    cache = EmbeddingCache(max_bytes=32, ttl_seconds=0)
+
+    cache.put('a', row)
+    cache.put('b', row)
+    cache.get('a')
+    cache.put('c', row)
+
+    assert cache.get('b') is None
+    assert cache.get('a') is not None
+    assert cache.stats()['evictions'] == 1
+    assert cache.current_bytes == 32
+
+
+@pytest.mark.asyncio
+async def test_cached_embedding_service_batch_encodes_only_misses():
+    mock_embedding_service = MagicMock()
+    mock_embedding_service.model_name = 'test_model'
+    mock_embedding_service.generate_embedding = AsyncMock(return_value=[1.0, 0.0])
+    mock_embedding_service.generate_embeddings = AsyncMock(return_value=[[0.0, 1.0], [0.5, 0.5]])
+
+    service = CachedEmbeddingService(mock_embedding_service, EmbeddingCache())
+    await service.generate_embedding("cached query")
+
+    embeddings = await service.generate_embeddings(["Cached query", "new query", "other", "New  query"])
+
+    # Only the two distinct misses are encoded, in one call
+    mock_embedding_service.generate_embeddings.assert_awaited_once_with(["new query", "other"])
+    np.testing.assert_array_equal(embeddings[0], [1.0, 0.0])
+    np.testing.assert_array_equal(embeddings[1], embeddings[3])
@@ -0,0 +1,38 @@
+# tests/unit/test_executors.py
+
+import threading
+import pytest
+from unittest.mock import patch
+from services.executors import ExecutorPools, get_executor_pools
+
+
+@pytest.mark.asyncio
+async def test_executor_pools_separate_cpu_and_io_work():
+    pools = ExecutorPools(cpu_workers=1, io_workers=2, torch_threads=1)
+    try:
+        cpu_thread = await pools.cpu.run(lambda: threading.current_thread().name)
+        io_thread = await pools.io.run(lambda: threading.current_thread().name)
+        assert cpu_thread.startswith('cpu')
+        assert io_thread.startswith('io')
+
+        stats = pools.stats()
+        assert stats['cpu'] == {'workers': 1, 'submitted': 1, 'active': 0}
+        assert stats['io']['workers'] == 2
+    finally:
+        pools.shutdown()
+
+
+def test_get_executor_pools_coordinates_torch_threads():
+    get_executor_pools.cache_clear()
+    try:
+        with patch('services.executors.available_cpus', return_value=8), \
+                patch('services.executors.set_torch_threads') as mock_set_torch_threads, \
+                patch.dict('os.environ', {'EXECUTOR_CPU_WORKERS': '2'}):
+            pools = get_executor_pools()
+
+        # Two inference threads share the eight cores, four torch threads each
+        mock_set_torch_threads.assert_called_once_with(4)
+        assert pools.cpu.workers == 2
+        pools.shutdown()
+    finally:
+        get_executor_pools.cache_clear()
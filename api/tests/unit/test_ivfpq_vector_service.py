@@ -0,0 +1,65 @@
+# tests/unit/test_ivfpq_vector_service.py
+
+import json
+import os
+import numpy as np
+import pytest
+from unittest.mock import patch
+from services.ivfpq_vector_service import IvfPqVectorService
+
+
+def write_index(index_dir, vectors, centroids):
+    """Writes an IVF-PQ index whose one-dimensional subquantizers reproduce every residual exactly."""
+    os.makedirs(index_dir)
+    vectors = np.asarray(vectors, dtype=np.float32)
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    centroids = np.asarray(centroids, dtype=np.float32)
+    count, dim = vectors.shape
+    lists = np.argmax(vectors @ centroids.T, axis=1)
+    order = np.argsort(lists, kind='stable')
+    residuals = vectors - centroids[lists]
+
+    vectors.tofile(os.path.join(index_dir, 'vectors.bin'))
+    encoded = [json.dumps({'text': f'Doc {i}'}).encode('utf-8') for i in range(count)]
+    with open(os.path.join(index_dir, 'payloads.bin'), 'wb') as f:
+        f.write(b''.join(encoded))
+    np.save(os.path.join(index_dir, 'payload_offsets.npy'), np.cumsum([0] + [len(e) for e in encoded]))
+    np.save(os.path.join(index_dir, 'coarse_centroids.npy'), centroids)
+    np.save(os.path.join(index_dir, 'pq_codebooks.npy'), residuals.T[:, :, None].copy())
+    np.save(os.path.join(index_dir, 'list_offsets.npy'), np.concatenate(([0], np.cumsum(np.bincount(lists, minlength=len(centroids))))))
+    np.save(os.path.join(index_dir, 'codes.npy'), np.tile(order[:, None], (1, dim)).astype(np.uint8))
+    np.save(os.path.join(index_dir, 'ids.npy'), order)
+    with open(os.path.join(index_dir, 'meta.json'), 'w') as f:
+        json.dump({'count': count, 'dim': dim, 'dtype': 'float32', 'distance': 'Cosine', 'version': 3,
+                   'index': 'ivfpq', 'nlist': len(centroids), 'm': dim, 'ksub': count}, f)
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize('rerank', ['0', '10'])
+async def test_ivfpq_vector_service_search(tmp_path, rerank):
+    index_dir = str(tmp_path / 'ivfpq')
+    write_index(index_dir, [[1, 0.1], [0.8, 0.3], [0.1, 1], [-1, 0.2]], [[1, 0], [0, 1]])
+
+    with patch.dict('os.environ', {'IVFPQ_NPROBE': '2', 'IVFPQ_RERANK': rerank}):
+        ivfpq_service = IvfPqVectorService(index_path=index_dir)
+
+    results = await ivfpq_service.search([1.0, 0.0], 2)
+
+    # Assertions
+    assert [hit.payload['text'] for hit in results] == ['Doc 0', 'Doc 1']
+    assert results[0].score > results[1].score
+    assert await ivfpq_service.get_collection_version() == '3'
+
+
+@pytest.mark.asyncio
+async def test_ivfpq_vector_service_nprobe_limits_lists(tmp_path):
+    index_dir = str(tmp_path / 'ivfpq')
+    write_index(index_dir, [[1, 0.1], [0.8, 0.3], [0.1, 1], [-1, 0.2]], [[1, 0], [0, 1]])
+
+    with patch.dict('os.environ', {'IVFPQ_NPROBE': '1', 'IVFPQ_RERANK': '0'}):
+        ivfpq_service = IvfPqVectorService(index_path=index_dir)
+
+    results = await ivfpq_service.search([1.0, 0.0], 10)
+
+    # Only the list closest to the query is scanned
+    assert [hit.payload['text'] for hit in results] == ['Doc 0', 'Doc 1']
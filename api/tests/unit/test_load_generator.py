@@ -0,0 +1,52 @@
+# tests/unit/test_load_generator.py
+
+import asyncio
+import httpx
+import pytest
+from benchmarks.load_generator import load_requests, parse_server_timing, percentile, run_load
+
+
+def test_parse_server_timing():
+    timings = parse_server_timing("embedding;dur=12.5, search;desc=\"vector\";dur=4, total;dur=20")
+    assert timings == pytest.approx({"embedding": 0.0125, "search": 0.004, "total": 0.02})
+    assert parse_server_timing(None) == {}
+
+
+def test_percentile_uses_nearest_rank():
+    values = list(range(1, 1001))
+    assert percentile(values, 50) == 500
+    assert percentile(values, 99) == 990
+    assert percentile(values, 99.9) == 999
+    assert percentile([7], 99.9) == 7
+
+
+def test_load_requests_fills_defaults(tmp_path):
+    requests_file = tmp_path / "requests.jsonl"
+    requests_file.write_text('{"query": "a"}\n\n{"query": "b", "k": 2, "summarizer": true}\n')
+    assert load_requests(str(requests_file), None, k=30, summarizer=False) == [
+        {"query": "a", "k": 30, "summarizer": False},
+        {"query": "b", "k": 2, "summarizer": True},
+    ]
+    assert load_requests(None, None, k=5, summarizer=False)[0]["query"] == "What is the capital of India?"
+
+
+@pytest.mark.asyncio
+async def test_run_load_is_open_loop_and_reads_stage_timings():
+    async def handler(request):
+        # Every request takes longer than the send interval; an open loop keeps sending anyway
+        await asyncio.sleep(0.05)
+        if request.read() == b'{"query":"fail"}':
+            return httpx.Response(503)
+        return httpx.Response(200, json={}, headers={"Server-Timing": "embedding;dur=3, search;dur=1, total;dur=5"})
+
+    bodies = [{"query": "ok"}, {"query": "ok"}, {"query": "ok"}, {"query": "fail"}]
+    async with httpx.AsyncClient(transport=httpx.MockTransport(handler), base_url="http://test") as client:
+        result = await run_load(client, bodies, rps=200, duration=0.2)
+
+    summary = result.summary()
+    assert 35 <= summary["sent"] <= 45
+    assert summary["statuses"]["503"] == summary["sent"] // 4
+    assert summary["latency"]["p50_ms"] >= 50
+    assert summary["elapsed_seconds"] < 0.5
+    assert summary["stages"]["embedding"]["p99_ms"] == pytest.approx(3)
+    assert summary["service_time"]["max_ms"] == pytest.approx(5)
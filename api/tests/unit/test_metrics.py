@@ -0,0 +1,101 @@
+# tests/unit/test_metrics.py
+
+import pytest
+from unittest.mock import MagicMock
+from prometheus_client import CollectorRegistry, generate_latest
+from services.metrics import (
+    REGISTRY,
+    ServiceStatsCollector,
+    collect_stage_timings,
+    observe_stage,
+    server_timing_header,
+    track_request,
+)
+
+
+def sample(name, **labels):
+    return REGISTRY.get_sample_value(name, labels) or 0.0
+
+
+def test_observe_stage_records_latency_histogram():
+    before = sample('search_stage_duration_seconds_count', stage='test-stage')
+    observe_stage('test-stage', 0.003)
+    observe_stage('test-stage', 0.2)
+
+    assert sample('search_stage_duration_seconds_count', stage='test-stage') == before + 2
+    assert sample('search_stage_duration_seconds_bucket', stage='test-stage', le='0.005') >= 1
+
+
+def test_track_request_counts_errors_and_duration():
+    with track_request('test-endpoint'):
+        pass
+    with pytest.raises(ValueError):
+        with track_request('test-endpoint'):
+            raise ValueError('boom')
+
+    assert REGISTRY.get_sample_value('search_request_duration_seconds_count', {'endpoint': 'test-endpoint'}) == 2
+    assert REGISTRY.get_sample_value('search_request_errors_total', {'endpoint': 'test-endpoint'}) == 1
+    assert REGISTRY.get_sample_value('search_requests_in_flight') == 0
+
+
+def test_service_stats_collector_exports_service_counters():
+    registry = CollectorRegistry()
+    registry.register(ServiceStatsCollector(lambda: {
+        'admission': {'queue_depth': 3, 'admitted': 10, 'rejected': 2, 'degraded': 1,
+                      'stages': {'embedding': {'limit': 4, 'in_flight': 4, 'waiting': 1}}},
+        'executors': {'cpu': {'workers': 2, 'submitted': 9, 'active': 5},
+                      'io': {'workers': 8, 'submitted': 3, 'active': 1}},
+        'embedding_cache': {'hits': 7, 'misses': 3},
+        'response_cache': None,
+    }))
+
+    assert registry.get_sample_value('cache_hits_total', {'cache': 'embedding_cache'}) == 7
+    assert registry.get_sample_value('cache_misses_total', {'cache': 'embedding_cache'}) == 3
+    assert registry.get_sample_value('admission_queue_depth') == 3
+    assert registry.get_sample_value('admission_outcomes_total', {'outcome': 'rejected'}) == 2
+    assert registry.get_sample_value('admission_stage_waiting', {'stage': 'embedding'}) == 1
+    assert registry.get_sample_value('executor_queue_depth', {'pool': 'cpu'}) == 3
+    assert registry.get_sample_value('executor_queue_depth', {'pool': 'io'}) == 0
+    assert b'executor_active_calls' in generate_latest(registry)
+
+
+def test_registering_service_stats_collector_does_not_collect():
+    stats_provider = MagicMock(return_value={})
+    CollectorRegistry().register(ServiceStatsCollector(stats_provider))
+    stats_provider.assert_not_called()
+
+
+def test_collect_stage_timings_reports_server_timing():
+    with collect_stage_timings() as timings:
+        observe_stage('embedding', 0.002)
+        observe_stage('summarization', 0.5)
+        observe_stage('summarization', 0.25)
+    observe_stage('embedding', 1.0)  # Outside the block, not collected
+
+    assert timings['embedding'] == 0.002
+    assert timings['summarization'] == 0.75
+    header = server_timing_header(timings)
+    assert header.startswith('embedding;dur=2.00, summarization;dur=750.00, total;dur=')
+
+
+def test_service_stats_collector_skips_series_when_stats_fail():
+    registry = CollectorRegistry()
+    registry.register(ServiceStatsCollector(MagicMock(side_effect=OSError("model not found"))))
+
+    assert registry.get_sample_value('admission_queue_depth') is None
+    assert generate_latest(registry) == b''
+
+
+def test_stats_and_metrics_do_not_build_services():
+    import my_app
+    from fastapi.testclient import TestClient
+    from services.service_factory import get_embedding_service, get_response_cache
+
+    get_embedding_service.cache_clear()
+    get_response_cache.cache_clear()
+    client = TestClient(my_app.app)  # Without the lifespan, so nothing is built at startup either
+
+    assert client.get('/stats').json()['embedding_cache'] == {}
+    assert client.get('/metrics').status_code == 200
+    assert get_embedding_service.cache_info().currsize == 0
+    assert get_response_cache.cache_info().currsize == 0
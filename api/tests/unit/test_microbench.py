@@ -0,0 +1,58 @@
+# tests/unit/test_microbench.py
+
+import asyncio
+import json
+from benchmarks.microbench import BENCHMARKS, compare, main, measure
+
+
+def make_results(**times):
+    return {"meta": {}, "results": {name: {"min_ns": ns, "median_ns": ns} for name, ns in times.items()}}
+
+
+def test_compare_flags_changes_beyond_threshold():
+    rows = {row["name"]: row for row in compare(
+        make_results(fast=100.0, slow=100.0, same=100.0, removed=100.0),
+        make_results(fast=80.0, slow=125.0, same=105.0, added=1.0),
+        threshold=0.10,
+    )}
+
+    assert rows["fast"]["status"] == "improved"
+    assert rows["slow"]["status"] == "regressed"
+    assert rows["slow"]["change"] == 0.25
+    assert rows["same"]["status"] == "ok"
+    assert rows["removed"]["status"] == "missing"
+    assert rows["added"]["status"] == "new"
+
+
+def test_compare_command_exits_non_zero_on_regression(tmp_path):
+    baseline, current = tmp_path / "baseline.json", tmp_path / "current.json"
+    baseline.write_text(json.dumps(make_results(search=100.0)))
+    current.write_text(json.dumps(make_results(search=150.0)))
+
+    assert main(["compare", str(baseline), str(current), "--threshold", "0.5"]) == 0
+    assert main(["compare", str(baseline), str(current), "--threshold", "0.2"]) == 1
+
+
+def test_measure_times_sync_and_async_callables():
+    loop = asyncio.new_event_loop()
+    try:
+        calls = []
+        sync_result = measure(lambda: calls.append(1), loop, repeat=3, min_time=0.001)
+
+        async def noop():
+            calls.append(2)
+
+        async_result = measure(noop, loop, repeat=3, min_time=0.001)
+    finally:
+        loop.close()
+
+    assert sync_result["number"] >= 1 and sync_result["min_ns"] <= sync_result["median_ns"]
+    assert async_result["repeat"] == 3
+    assert 2 in calls
+
+
+def test_benchmarks_cover_the_hot_path():
+    names = set(BENCHMARKS)
+    for k in (5, 30, 100):
+        assert f"formatter.format_documents[k={k}]" in names
+    assert {"embedding.single", "embedding.batch[n=32]", "qdrant.search[k=30]", "prompt.get_prompt"} <= names
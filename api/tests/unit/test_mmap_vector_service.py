@@ -0,0 +1,50 @@
+# tests/unit/test_mmap_vector_service.py
+
+import json
+import os
+import numpy as np
+import pytest
+from services.mmap_vector_service import MmapVectorService
+from services.document_formatter import DocumentFormatter
+
+
+def write_index(index_dir, vectors, texts, dtype='float32'):
+    """Writes an index in the layout produced by data/mmap_export.py."""
+    os.makedirs(index_dir)
+    vectors = np.asarray(vectors, dtype=np.float32)
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    vectors.astype(dtype).tofile(os.path.join(index_dir, 'vectors.bin'))
+    encoded = [json.dumps({'text': text, 'file_path': '/path/doc.csv'}).encode('utf-8') for text in texts]
+    with open(os.path.join(index_dir, 'payloads.bin'), 'wb') as f:
+        f.write(b''.join(encoded))
+    np.save(os.path.join(index_dir, 'payload_offsets.npy'), np.cumsum([0] + [len(e) for e in encoded]))
+    with open(os.path.join(index_dir, 'meta.json'), 'w') as f:
+        json.dump({'count': len(texts), 'dim': vectors.shape[1], 'dtype': dtype, 'distance': 'Cosine', 'version': 7}, f)
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize('dtype', ['float32', 'float16'])
+async def test_mmap_vector_service_search(tmp_path, dtype):
+    index_dir = str(tmp_path / 'index')
+    write_index(index_dir, [[1, 0, 0], [0, 1, 0], [0.9, 0.1, 0], [0, 0, 1]], ['Doc 1', 'Doc 2', 'Doc 3', 'Doc 4'], dtype)
+    mmap_service = MmapVectorService(index_path=index_dir)
+
+    results = await mmap_service.search([2.0, 0.0, 0.0], 2)
+
+    # Exact top-k in descending score order, compatible with the formatter
+    assert [hit.payload['text'] for hit in results] == ['Doc 1', 'Doc 3']
+    assert results[0].score == pytest.approx(1.0, abs=1e-3)
+    documents = DocumentFormatter().format_documents(results)
+    assert [doc.payload.text for doc in documents] == ['Doc 1', 'Doc 3']
+    assert await mmap_service.get_collection_version() == '7'
+
+
+@pytest.mark.asyncio
+async def test_mmap_vector_service_search_batch(tmp_path):
+    index_dir = str(tmp_path / 'index')
+    write_index(index_dir, [[1, 0, 0], [0, 1, 0], [0.9, 0.1, 0], [0, 0, 1]], ['Doc 1', 'Doc 2', 'Doc 3', 'Doc 4'])
+    mmap_service = MmapVectorService(index_path=index_dir)
+
+    results = await mmap_service.search_batch([[1.0, 0.0, 0.0], [0.0, 0.0, 1.0]], [2, 1])
+
+    assert [[hit.payload['text'] for hit in hits] for hits in results] == [['Doc 1', 'Doc 3'], ['Doc 4']]
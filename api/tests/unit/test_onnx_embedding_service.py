@@ -0,0 +1,114 @@
+# tests/unit/test_onnx_embedding_service.py
+
+import json
+import numpy as np
+import onnx
+import pytest
+from onnx import TensorProto, helper, numpy_helper
+from tokenizers import Tokenizer
+from tokenizers.models import WordLevel
+from tokenizers.pre_tokenizers import Whitespace
+from unittest.mock import MagicMock, patch
+from services.onnx_embedding_service import (
+    CONFIG_FILE,
+    MODEL_FILES,
+    TOKENIZER_FILE,
+    OnnxEmbeddingService,
+    OnnxEncoder,
+    pool,
+)
+
+VOCABULARY = {"[PAD]": 0, "[UNK]": 1, "capital": 2, "of": 3, "france": 4}
+EMBEDDINGS = np.arange(len(VOCABULARY) * 3, dtype=np.float32).reshape(len(VOCABULARY), 3)
+
+
+def write_model(model_dir, pooling_mode="mean", normalize=False):
+    """A tokenizer and an ONNX graph that looks up one fixed embedding per token."""
+    tokenizer = Tokenizer(WordLevel(VOCABULARY, unk_token="[UNK]"))
+    tokenizer.pre_tokenizer = Whitespace()
+    tokenizer.save(str(model_dir / TOKENIZER_FILE))
+
+    graph = helper.make_graph(
+        [helper.make_node("Gather", ["embeddings", "input_ids"], ["token_embeddings"])],
+        "token_lookup",
+        [helper.make_tensor_value_info("input_ids", TensorProto.INT64, ["batch", "sequence"]),
+         helper.make_tensor_value_info("attention_mask", TensorProto.INT64, ["batch", "sequence"])],
+        [helper.make_tensor_value_info("token_embeddings", TensorProto.FLOAT, ["batch", "sequence", 3])],
+        [numpy_helper.from_array(EMBEDDINGS, "embeddings")],
+    )
+    model = helper.make_model(graph, opset_imports=[helper.make_opsetid("", 17)])
+    model.ir_version = 8
+    onnx.save(model, str(model_dir / MODEL_FILES["fp32"]))
+
+    config = {"pooling_mode": pooling_mode, "normalize": normalize, "max_seq_length": 8, "pad_token": "[PAD]",
+              "pad_token_id": 0, "parity": {"fp32": {"min_cosine": 1.0}}}
+    (model_dir / CONFIG_FILE).write_text(json.dumps(config))
+
+
+def test_pool_ignores_padding():
+    token_embeddings = np.array([[[1.0, 2.0], [3.0, 4.0], [100.0, 100.0]]], dtype=np.float32)
+    attention_mask = np.array([[1, 1, 0]])
+
+    assert pool(token_embeddings, attention_mask, "mean").tolist() == [[2.0, 3.0]]
+    assert pool(token_embeddings, attention_mask, "max").tolist() == [[3.0, 4.0]]
+    assert pool(token_embeddings, attention_mask, "cls").tolist() == [[1.0, 2.0]]
+    with pytest.raises(ValueError):
+        pool(token_embeddings, attention_mask, "lasttoken")
+
+
+def test_onnx_encoder_tokenizes_runs_and_pools(tmp_path):
+    write_model(tmp_path)
+    encoder = OnnxEncoder(str(tmp_path), "fp32")
+
+    # Padded batch rows pool the same as the unpadded single text
+    single = encoder.encode("capital of")
+    batch = encoder.encode(["capital of", "capital of france"])
+
+    assert single.shape == (3,)
+    assert batch.shape == (2, 3)
+    np.testing.assert_allclose(single, EMBEDDINGS[[2, 3]].mean(axis=0))
+    np.testing.assert_allclose(batch[0], single)
+    np.testing.assert_allclose(batch[1], EMBEDDINGS[[2, 3, 4]].mean(axis=0))
+
+
+def test_onnx_encoder_normalizes(tmp_path):
+    write_model(tmp_path, pooling_mode="cls", normalize=True)
+
+    embedding = OnnxEncoder(str(tmp_path), "fp32").encode("france")
+
+    np.testing.assert_allclose(embedding, EMBEDDINGS[4] / np.linalg.norm(EMBEDDINGS[4]), rtol=1e-6)
+
+
+@pytest.mark.asyncio
+@patch('services.onnx_embedding_service.OnnxEncoder')
+@patch('services.onnx_embedding_service.export_onnx_model')
+async def test_onnx_service_exports_missing_model(mock_export, mock_encoder, tmp_path):
+    encoder = MagicMock()
+    encoder.config = {"parity": {"int8": {"min_cosine": 0.999}}}
+    encoder.encode.return_value = [[0.1, 0.2, 0.3]]
+    mock_encoder.return_value = encoder
+
+    with patch.dict('os.environ', {'SENTENCE_TRANSFORMER': 'test_model', 'ONNX_MODEL_DIR': str(tmp_path)}):
+        embedding_service = OnnxEmbeddingService()
+
+    mock_export.assert_called_once_with('test_model', '/tmp/cache', str(tmp_path), quantize=True)
+    assert mock_encoder.call_args.args[:2] == (str(tmp_path), "int8")
+
+    embedding = await embedding_service.generate_embedding("Sample text")
+
+    encoder.encode.assert_called_once_with(["Sample text"])
+    assert embedding == [0.1, 0.2, 0.3]
+    assert embedding_service.get_batch_metrics()['items'] == 1
+
+
+@patch('services.onnx_embedding_service.OnnxEncoder')
+@patch('services.onnx_embedding_service.export_onnx_model')
+def test_onnx_service_rejects_model_below_parity(mock_export, mock_encoder, tmp_path):
+    (tmp_path / MODEL_FILES["int8"]).write_bytes(b"")
+    mock_encoder.return_value.config = {"parity": {"int8": {"min_cosine": 0.95}}}
+
+    with patch.dict('os.environ', {'ONNX_MODEL_DIR': str(tmp_path), 'ONNX_MIN_COSINE': '0.99'}):
+        with pytest.raises(ValueError, match="deviates from PyTorch"):
+            OnnxEmbeddingService()
+
+    mock_export.assert_not_called()
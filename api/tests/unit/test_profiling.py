@@ -0,0 +1,77 @@
+# tests/unit/test_profiling.py
+
+import time
+import tracemalloc
+import pytest
+from fastapi import Response
+from unittest.mock import AsyncMock
+from services.profiling import MemoryProfiler, RequestProfiler
+from services.schema import SearchRequest, SearchResponse
+from services.search_service_handler import search
+
+
+def busy_loop(seconds):
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        pass
+
+
+def test_request_profiler_samples_running_code():
+    profiler = RequestProfiler(interval_seconds=0.001)
+    with profiler.profile("busy") as profile_id:
+        busy_loop(0.1)
+
+    profile = profiler.get_profile(profile_id)
+    assert profile["name"] == "busy"
+    assert profile["samples"] > 0
+    assert any("busy_loop" in stack["stack"] and stack["stack"].startswith("loop;") for stack in profile["stacks"])
+    assert profiler.list_profiles()[0]["id"] == profile_id
+
+
+def test_request_profiler_sampling_decision():
+    assert not RequestProfiler(sample_rate=0.0).should_profile()
+    assert RequestProfiler(sample_rate=0.0).should_profile(requested=True)
+    assert RequestProfiler(sample_rate=0.5, random_source=lambda: 0.25).should_profile()
+    assert not RequestProfiler(sample_rate=0.5, random_source=lambda: 0.75).should_profile()
+
+
+def test_request_profiler_keeps_recent_history():
+    profiler = RequestProfiler(interval_seconds=0.001, history=2)
+    ids = []
+    for _ in range(3):
+        with profiler.profile("noop") as profile_id:
+            ids.append(profile_id)
+
+    assert [profile["id"] for profile in profiler.list_profiles()] == [ids[2], ids[1]]
+    assert profiler.get_profile(ids[0]) is None
+
+
+def test_memory_profiler_reports_top_allocations_and_diff():
+    profiler = MemoryProfiler(frames=1)
+    try:
+        first = profiler.snapshot(limit=5)
+        retained = [bytearray(1024) for _ in range(1000)]
+        second = profiler.snapshot(limit=5)
+    finally:
+        tracemalloc.stop()
+
+    assert first["diff"] is None
+    assert len(second["top"]) <= 5
+    assert any(entry["size_diff_bytes"] >= 1024 * 1000 for entry in second["diff"])
+    del retained
+
+
+@pytest.mark.asyncio
+async def test_search_route_profiles_requested_search():
+    handler = AsyncMock()
+    handler.perform_search.return_value = SearchResponse(documents=[], summary="")
+    profiler = RequestProfiler(interval_seconds=0.001)
+    request = SearchRequest(query="Sample query", k=5)
+
+    response = Response()
+    await search(request, response, x_profile=None, search_service_handler=handler, profiler=profiler)
+    assert "X-Profile-Id" not in response.headers
+
+    response = Response()
+    await search(request, response, x_profile="1", search_service_handler=handler, profiler=profiler)
+    assert profiler.get_profile(response.headers["X-Profile-Id"])["name"] == "perform_search"
@@ -2,7 +2,7 @@
 
 import pytest
 from unittest.mock import patch, AsyncMock
-from services.qdrant_service import QdrantService
+from services.qdrant_service import QdrantService, build_search_params
 
 
 @pytest.mark.asyncio
@@ -22,4 +22,26 @@ async def test_qdrant_service_search(mock_qdrant_client):
 
     # Assertions
     mock_client_instance.search.assert_called_once()
-    assert results == [{'id': 1, 'score': 0.9}]
\ No newline at end of file
+    assert results == [{'id': 1, 'score': 0.9}]
+
+def test_search_params_default_to_collection_settings():
+    with patch.dict('os.environ', {}, clear=True):
+        assert build_search_params() is None
+
+
+@pytest.mark.asyncio
+@patch('services.qdrant_service.QdrantClient')
+async def test_qdrant_service_search_passes_search_params(mock_qdrant_client):
+    mock_client_instance = mock_qdrant_client.return_value
+    mock_client_instance.search.return_value = []
+    env = {'TABLE': 'test_collection', 'QDRANT_HNSW_EF': '128', 'QDRANT_QUANTIZATION_RESCORE': 'true',
+           'QDRANT_QUANTIZATION_OVERSAMPLING': '2.0'}
+    with patch.dict('os.environ', env):
+        qdrant_service = QdrantService()
+
+    await qdrant_service.search([0.1, 0.2, 0.3], 5)
+
+    search_params = mock_client_instance.search.call_args.kwargs['search_params']
+    assert search_params.hnsw_ef == 128
+    assert search_params.quantization.rescore is True
+    assert search_params.quantization.oversampling == 2.0
@@ -0,0 +1,72 @@
+# tests/unit/test_response_cache.py
+
+import pytest
+from unittest.mock import AsyncMock
+from services.response_cache import SemanticResponseCache
+from services.schema import SearchRequest, SearchResponse, Document, Payload
+
+
+def make_response(text):
+    return SearchResponse(documents=[Document(payload=Payload(text=text), score=0.9)], summary='Summary')
+
+
+@pytest.mark.asyncio
+async def test_response_cache_reuses_close_paraphrase():
+    cache = SemanticResponseCache(max_distance=0.05)
+    request = SearchRequest(query='What is the capital of France?', k=5, summarizer=True)
+    response = make_response('Paris')
+
+    cache.store([1.0, 0.0, 0.0], request, response)
+
+    # A near-identical embedding is served from the cache, an unrelated one is not
+    assert await cache.lookup([0.99, 0.05, 0.0], request) is response
+    assert await cache.lookup([0.0, 1.0, 0.0], request) is None
+    # Different k is a different partition
+    assert await cache.lookup([1.0, 0.0, 0.0], SearchRequest(query='q', k=2, summarizer=True)) is None
+    assert cache.stats()['hits'] == 1
+
+
+@pytest.mark.asyncio
+async def test_response_cache_invalidates_on_collection_version_change():
+    version_provider = AsyncMock(side_effect=['v1', 'v1', 'v2'])
+    cache = SemanticResponseCache(version_provider=version_provider, version_check_seconds=0)
+    request = SearchRequest(query='q', k=5)
+
+    assert await cache.lookup([1.0, 0.0], request) is None
+    cache.store([1.0, 0.0], request, make_response('doc'))
+    assert await cache.lookup([1.0, 0.0], request) is not None
+    assert await cache.lookup([1.0, 0.0], request) is None
+    assert cache.stats()['invalidations'] == 1
+
+
+@pytest.mark.asyncio
+async def test_response_cache_drops_store_after_invalidation():
+    version_provider = AsyncMock(side_effect=['v1', 'v2', 'v2'])
+    cache = SemanticResponseCache(version_provider=version_provider, version_check_seconds=0)
+    request = SearchRequest(query='q', k=5)
+
+    # Request A misses and starts searching the v1 collection
+    assert await cache.lookup([1.0, 0.0], request) is None
+    generation = cache.generation
+    # Meanwhile request B sees v2 and the cache is cleared
+    assert await cache.lookup([0.0, 1.0], request) is None
+    # A's response was computed against v1 and must not be served afterwards
+    cache.store([1.0, 0.0], request, make_response('stale'), generation)
+
+    assert await cache.lookup([1.0, 0.0], request) is None
+    assert cache.stats()['entries'] == 0
+
+
+@pytest.mark.asyncio
+async def test_response_cache_keeps_entries_when_version_check_fails():
+    version_provider = AsyncMock(side_effect=['v1', None, ConnectionError('qdrant down')])
+    cache = SemanticResponseCache(version_provider=version_provider, version_check_seconds=0)
+    request = SearchRequest(query='q', k=5)
+
+    assert await cache.lookup([1.0, 0.0], request) is None
+    cache.store([1.0, 0.0], request, make_response('doc'), cache.generation)
+
+    assert await cache.lookup([1.0, 0.0], request) is not None
+    assert await cache.lookup([1.0, 0.0], request) is not None
+    assert cache.stats()['collection_version'] == 'v1'
+    assert cache.stats()['invalidations'] == 0
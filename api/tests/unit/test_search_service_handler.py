@@ -1,9 +1,11 @@
 # tests/unit/test_search_service_handler.py
 
+import json
 import pytest
 from unittest.mock import AsyncMock, MagicMock
 from services.search_service_handler import SearchServiceHandler
-from services.schema import SearchRequest, Document, Payload
+from services.admission_control import AdmissionController
+from services.schema import SearchRequest, SearchResponse, BatchSearchRequest, Document, Payload
 
 @pytest.mark.asyncio
 async def test_search_service_handler_perform_search():
@@ -41,3 +43,173 @@ async def test_search_service_handler_perform_search():
     mock_format_service.format_documents.assert_called_once()  # Use assert_called_once
     mock_summarization_service.summarize.assert_awaited_once()
     assert response.summary == 'Summarized text'
+
+
+@pytest.mark.asyncio
+async def test_search_service_handler_serves_cached_response():
+    mock_search_service = AsyncMock()
+    mock_embedding_service = AsyncMock()
+    mock_embedding_service.generate_embedding.return_value = [0.1, 0.2, 0.3]
+    mock_format_service = MagicMock()
+    mock_summarization_service = AsyncMock()
+
+    cached_response = SearchResponse(documents=[], summary='Cached summary')
+    mock_response_cache = MagicMock()
+    mock_response_cache.lookup = AsyncMock(return_value=cached_response)
+
+    handler = SearchServiceHandler(
+        search_service=mock_search_service,
+        embedding_service=mock_embedding_service,
+        format_service=mock_format_service,
+        summarization_service=mock_summarization_service,
+        response_cache=mock_response_cache,
+    )
+
+    response = await handler.perform_search(SearchRequest(query='Sample query', k=5, summarizer=True))
+
+    # Neither Qdrant nor the summarizer is called on a cache hit
+    assert response is cached_response
+    mock_search_service.search.assert_not_awaited()
+    mock_summarization_service.summarize.assert_not_awaited()
+    mock_response_cache.store.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_search_service_handler_sheds_summarization_under_load():
+    mock_search_service = AsyncMock()
+    mock_search_service.search.return_value = [{'payload': {'text': 'Doc 1'}, 'score': 0.9}]
+    mock_embedding_service = AsyncMock()
+    mock_embedding_service.generate_embedding.return_value = [0.1, 0.2, 0.3]
+    mock_format_service = MagicMock()
+    mock_format_service.format_documents.return_value = [
+        Document(payload=Payload(text='Formatted Doc 1', file_path='/path/doc1'), score=0.9)
+    ]
+    mock_summarization_service = AsyncMock()
+    mock_response_cache = MagicMock()
+    mock_response_cache.lookup = AsyncMock(return_value=None)
+
+    admission_controller = AdmissionController(degrade_queue_depth=1)
+    admission_controller.should_shed_summarization = MagicMock(return_value=True)
+
+    handler = SearchServiceHandler(
+        search_service=mock_search_service,
+        embedding_service=mock_embedding_service,
+        format_service=mock_format_service,
+        summarization_service=mock_summarization_service,
+        response_cache=mock_response_cache,
+        admission_controller=admission_controller,
+    )
+
+    response = await handler.perform_search(SearchRequest(query='Sample query', k=5, summarizer=True))
+
+    # Documents are still returned, the summary is skipped and the partial response is not cached
+    assert response.degraded is True
+    assert response.summary == ''
+    assert len(response.documents) == 1
+    mock_summarization_service.summarize.assert_not_awaited()
+    mock_response_cache.store.assert_not_called()
+    assert admission_controller.stats()['in_flight'] == 0
+
+
+@pytest.mark.asyncio
+async def test_search_service_handler_perform_batch_search():
+    mock_search_service = AsyncMock()
+    mock_search_service.search_batch.return_value = [
+        [{'payload': {'text': 'Doc 1'}, 'score': 0.9}],
+        [{'payload': {'text': 'Doc 2'}, 'score': 0.8}],
+    ]
+
+    mock_embedding_service = AsyncMock()
+    mock_embedding_service.generate_embeddings.return_value = [[0.1, 0.2], [0.3, 0.4]]
+
+    mock_format_service = MagicMock()
+    mock_format_service.format_documents.side_effect = lambda hits: [
+        Document(payload=Payload(text=hit['payload']['text']), score=hit['score']) for hit in hits
+    ]
+
+    mock_summarization_service = AsyncMock()
+    mock_summarization_service.summarize.return_value = 'Summarized text'
+
+    handler = SearchServiceHandler(
+        search_service=mock_search_service,
+        embedding_service=mock_embedding_service,
+        format_service=mock_format_service,
+        summarization_service=mock_summarization_service,
+    )
+
+    batch_request = BatchSearchRequest(requests=[
+        {'query': 'First query', 'k': 1, 'summarizer': True},
+        {'query': '   ', 'k': 1},
+        {'query': 'Second query', 'k': 1},
+    ])
+    response = await handler.perform_batch_search(batch_request)
+
+    # One embedding call and one batched search for the two valid queries
+    mock_embedding_service.generate_embeddings.assert_awaited_once_with(['First query', 'Second query'])
+    mock_search_service.search_batch.assert_awaited_once_with([[0.1, 0.2], [0.3, 0.4]], [1, 1])
+    mock_summarization_service.summarize.assert_awaited_once()
+    results = response.results
+    assert results[0].response.summary == 'Summarized text'
+    assert results[1].response is None and 'Query must not be empty' in results[1].error
+    assert results[2].response.documents[0].payload.text == 'Doc 2'
+
+
+@pytest.mark.asyncio
+async def test_search_service_handler_stream_search():
+    mock_search_service = AsyncMock()
+    mock_search_service.search.return_value = [{'payload': {'text': 'Doc 1'}, 'score': 0.9}]
+
+    mock_embedding_service = AsyncMock()
+    mock_embedding_service.generate_embedding.return_value = [0.1, 0.2, 0.3]
+
+    mock_format_service = MagicMock()
+    mock_format_service.format_documents.return_value = [
+        Document(payload=Payload(text='Formatted Doc 1', file_path='/path/doc1'), score=0.9)
+    ]
+
+    async def summarize_stream(texts, question):
+        for token in ['Summarized ', 'text']:
+            yield token
+
+    mock_summarization_service = MagicMock()
+    mock_summarization_service.summarize_stream = summarize_stream
+
+    handler = SearchServiceHandler(
+        search_service=mock_search_service,
+        embedding_service=mock_embedding_service,
+        format_service=mock_format_service,
+        summarization_service=mock_summarization_service,
+    )
+
+    events = [event async for event in handler.stream_search(SearchRequest(query='Sample query', k=5, summarizer=True))]
+
+    # Documents come first, then summary tokens, then the completion event
+    assert [event.split('\n')[0] for event in events] == [
+        'event: documents', 'event: summary', 'event: summary', 'event: done'
+    ]
+    assert 'Formatted Doc 1' in events[0]
+    assert json.loads(events[-1].split('data: ')[1]) == {'summary': 'Summarized text', 'degraded': False}
+
+
+@pytest.mark.asyncio
+async def test_search_service_handler_skips_summary_without_summarization_service():
+    mock_search_service = AsyncMock()
+    mock_search_service.search.return_value = []
+    mock_embedding_service = AsyncMock()
+    mock_format_service = MagicMock()
+    mock_format_service.format_documents.return_value = [
+        Document(payload=Payload(text='Formatted Doc 1', file_path='/path/doc1'), score=0.9)
+    ]
+
+    handler = SearchServiceHandler(
+        search_service=mock_search_service,
+        embedding_service=mock_embedding_service,
+        format_service=mock_format_service,
+        summarization_service=None,
+    )
+
+    response = await handler.perform_search(SearchRequest(query='Sample query', k=5, summarizer=True))
+
+    assert response.summary == ''
+    assert not response.degraded
+    assert len(response.documents) == 1
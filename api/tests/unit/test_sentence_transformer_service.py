@@ -9,7 +9,7 @@ from services.sentence_transformer_service import SentenceTransformerEmbeddingSe
 async def test_sentence_transformer_generate_embedding(mock_sentence_transformer):
     # Mock the SentenceTransformer model
     mock_model_instance = MagicMock()
-    mock_model_instance.encode.return_value = [0.1, 0.2, 0.3]
+    mock_model_instance.encode.return_value = [[0.1, 0.2, 0.3]]
     mock_sentence_transformer.return_value = mock_model_instance
 
     # Set environment variables
@@ -19,6 +19,25 @@ async def test_sentence_transformer_generate_embedding(mock_sentence_transformer
     text = "Sample text"
     embedding = await embedding_service.generate_embedding(text)
 
-    # Assertions
+    # Assertions: the text is encoded as part of a batch and its row is returned
+    mock_model_instance.encode.assert_called_once_with([text])
+    assert embedding == [0.1, 0.2, 0.3]
+    assert embedding_service.get_batch_metrics()['items'] == 1
+
+
+@pytest.mark.asyncio
+@patch('services.sentence_transformer_service.SentenceTransformer')
+async def test_sentence_transformer_generate_embedding_unbatched(mock_sentence_transformer):
+    mock_model_instance = MagicMock()
+    mock_model_instance.encode.return_value = [0.1, 0.2, 0.3]
+    mock_sentence_transformer.return_value = mock_model_instance
+
+    with patch.dict('os.environ', {'SENTENCE_TRANSFORMER': 'test_model', 'EMBEDDING_BATCH_MAX_SIZE': '1'}):
+        embedding_service = SentenceTransformerEmbeddingService()
+
+    text = "Sample text"
+    embedding = await embedding_service.generate_embedding(text)
+
     mock_model_instance.encode.assert_called_once_with(text)
-    assert embedding == [0.1, 0.2, 0.3]
\ No newline at end of file
+    assert embedding == [0.1, 0.2, 0.3]
+    assert embedding_service.get_batch_metrics() == {}
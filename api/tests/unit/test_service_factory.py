@@ -0,0 +1,29 @@
+# tests/unit/test_service_factory.py
+
+import os
+import subprocess
+import sys
+from unittest.mock import patch
+from services.service_factory import get_summarization_service
+
+API_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def test_summarization_is_disabled_without_api_key():
+    get_summarization_service.cache_clear()
+    try:
+        with patch.dict('os.environ', {'GEMINI_API_KEY': ''}):
+            assert get_summarization_service() is None
+    finally:
+        get_summarization_service.cache_clear()
+
+
+def test_importing_the_app_does_not_load_backend_dependencies():
+    # A fresh interpreter, since this test process may already have imported the backends
+    code = (
+        "import sys, my_app; "
+        "print(','.join(m for m in ('torch', 'sentence_transformers', 'qdrant_client', 'google.generativeai') "
+        "if m in sys.modules))"
+    )
+    result = subprocess.run([sys.executable, "-c", code], cwd=API_DIR, capture_output=True, text=True, check=True)
+    assert result.stdout.strip() == ""
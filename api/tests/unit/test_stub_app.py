@@ -0,0 +1,34 @@
+# tests/unit/test_stub_app.py
+
+import importlib
+import time
+from unittest.mock import patch
+from fastapi.testclient import TestClient
+from services.warmup import get_readiness_state
+
+
+def test_stub_app_starts_and_warms_up_with_default_settings():
+    import my_app
+
+    overrides = dict(my_app.app.dependency_overrides)
+    get_readiness_state.cache_clear()
+    try:
+        # Warm-up stays enabled: it must use the stubbed services instead of loading the model or Qdrant
+        with patch.dict('os.environ', {'STUB_EMBEDDINGS': 'true', 'STUB_SUMMARY_LATENCY_MS': '0',
+                                       'WARMUP_RETRY_SECONDS': '0'}):
+            stub_app = importlib.import_module("benchmarks.stub_app")
+            importlib.reload(stub_app)
+            with TestClient(stub_app.app) as client:
+                deadline = time.monotonic() + 10
+                while (response := client.get("/ready")).status_code != 200 and time.monotonic() < deadline:
+                    time.sleep(0.05)
+                assert response.status_code == 200, response.json()
+                assert response.json()["attempts"] == 1
+
+                search = client.post("/api/search", json={"query": "What is the capital of France?", "k": 3})
+                assert search.status_code == 200
+                assert len(search.json()["documents"]) == 3
+    finally:
+        my_app.app.dependency_overrides.clear()
+        my_app.app.dependency_overrides.update(overrides)
+        get_readiness_state.cache_clear()
@@ -23,4 +23,24 @@ async def test_summarization_service_summarize(mock_genai):
 
     # Assertions
     mock_model_instance.generate_content.assert_called_once()
-    assert summary == 'Summarized text'
\ No newline at end of file
+    assert summary == 'Summarized text'
+
+@pytest.mark.asyncio
+@patch('services.summarization_service.genai')
+async def test_summarization_service_summarize_stream(mock_genai):
+    async def stream():
+        for text in ['Summarized ', 'text']:
+            yield MagicMock(text=text)
+
+    mock_model_instance = MagicMock()
+    mock_model_instance.generate_content_async = AsyncMock(return_value=stream())
+    mock_genai.GenerativeModel.return_value = mock_model_instance
+
+    with patch.dict('os.environ', {'GEMINI_API_KEY': 'test_key', 'GEMINI_MODEL_SUMMARY': 'test_model'}):
+        summarization_service = SummarizationService()
+
+    tokens = [token async for token in summarization_service.summarize_stream(["Text 1"], "What is the summary?")]
+
+    # Assertions
+    assert mock_model_instance.generate_content_async.call_args.kwargs['stream'] is True
+    assert tokens == ['Summarized ', 'text']
@@ -0,0 +1,60 @@
+# tests/unit/test_warmup.py
+
+import pytest
+from unittest.mock import AsyncMock
+from services.warmup import ReadinessState, WARMUP_QUERIES, warm_up
+
+
+@pytest.mark.asyncio
+async def test_warm_up_marks_worker_ready():
+    embedding_service = AsyncMock()
+    embedding_service.generate_embedding.return_value = [0.1, 0.2, 0.3]
+    search_service = AsyncMock()
+    state = ReadinessState()
+
+    await warm_up(state, embedding_service, search_service, iterations=2, k=3, concurrency=2)
+
+    assert state.ready
+    assert state.snapshot()["status"] == "ready"
+    assert len(state.iterations) == 2
+    assert embedding_service.generate_embeddings.await_count == 4
+    search_service.search.assert_awaited_with([0.1, 0.2, 0.3], 3)
+    # Every pass embeds new texts, so a cache in front of the model cannot answer them
+    first_texts = embedding_service.generate_embeddings.await_args_list[0].args[0]
+    last_texts = embedding_service.generate_embeddings.await_args_list[-1].args[0]
+    assert len(first_texts) == len(WARMUP_QUERIES) and first_texts != last_texts
+
+
+@pytest.mark.asyncio
+async def test_warm_up_retries_until_search_succeeds():
+    embedding_service = AsyncMock()
+    search_service = AsyncMock()
+    search_service.search.side_effect = [ConnectionError("qdrant not up"), []]
+    state = ReadinessState()
+
+    await warm_up(state, embedding_service, search_service, iterations=1, retry_seconds=0)
+
+    assert state.ready
+    assert state.attempts == 2
+    assert state.last_error is None
+
+
+def test_readiness_state_starts_not_ready():
+    state = ReadinessState()
+    assert not state.ready
+    assert state.snapshot()["status"] == "starting"
+
+
+@pytest.mark.asyncio
+async def test_warm_up_gives_up_after_max_attempts():
+    embedding_service = AsyncMock()
+    search_service = AsyncMock()
+    search_service.search.side_effect = ConnectionError("qdrant not up")
+    state = ReadinessState()
+
+    await warm_up(state, embedding_service, search_service, iterations=1, retry_seconds=0, max_attempts=3)
+
+    assert not state.ready
+    assert state.snapshot()["status"] == "failed"
+    assert state.attempts == 3
+    assert "qdrant not up" in state.last_error
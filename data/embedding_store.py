@@ -0,0 +1,163 @@
+# data/embedding_store.py
+
+import os
+import re
+import json
+import hashlib
+import logging
+
+import numpy as np
+
+
+def text_key(text):
+    """64-bit content hash of a row text, used as the store key."""
+    return int.from_bytes(hashlib.blake2b(text.encode('utf-8'), digest_size=8).digest(), 'little')
+
+
+class EmbeddingStore:
+    """Append-only, memory-mapped embedding cache for one model, keyed by row text hash.
+
+    Layout of `<store_dir>/<model>/`:
+        meta.json     {"model", "dim", "dtype"}
+        vectors.bin   raw (rows, dim) float32 embeddings, appended in order
+        keys.bin      raw (rows,) uint64 text hashes, appended after their vectors
+
+    The index is a sorted key array searched with `np.searchsorted`, plus a small
+    dict of rows appended since it was last rebuilt, so lookups stay compact even
+    with millions of rows. Vectors are written before keys; after a crash, rows
+    without a key are simply truncated on the next load.
+    """
+
+    def __init__(self, store_dir, model_name, merge_threshold=65536):
+        self.logger = logging.getLogger(__name__)
+        self.model_name = model_name
+        self.path = os.path.join(store_dir, re.sub(r'[^A-Za-z0-9_.-]+', '_', model_name))
+        os.makedirs(self.path, exist_ok=True)
+        self.vectors_path = os.path.join(self.path, "vectors.bin")
+        self.keys_path = os.path.join(self.path, "keys.bin")
+        self.meta_path = os.path.join(self.path, "meta.json")
+        self.merge_threshold = merge_threshold
+        self.dim = None
+        self.rows = 0
+        self.hits = 0
+        self.misses = 0
+        self._vectors = None
+        self._sorted_keys = np.zeros(0, dtype=np.uint64)
+        self._sorted_rows = np.zeros(0, dtype=np.int64)
+        self._recent = {}
+        self._load()
+
+    def _load(self):
+        if not os.path.exists(self.meta_path):
+            return
+        with open(self.meta_path, 'r') as f:
+            self.dim = json.load(f)["dim"]
+        row_bytes = self.dim * 4
+        key_rows = os.path.getsize(self.keys_path) // 8 if os.path.exists(self.keys_path) else 0
+        vector_rows = os.path.getsize(self.vectors_path) // row_bytes if os.path.exists(self.vectors_path) else 0
+        self.rows = min(key_rows, vector_rows)
+        # Drop partially written rows left by an interrupted append.
+        for path, size in ((self.keys_path, self.rows * 8), (self.vectors_path, self.rows * row_bytes)):
+            if os.path.exists(path) and os.path.getsize(path) != size:
+                os.truncate(path, size)
+        keys = np.fromfile(self.keys_path, dtype=np.uint64) if self.rows else np.zeros(0, dtype=np.uint64)
+        self._rebuild_index(keys)
+        self.logger.info(f"Loaded embedding store {self.path} with {self.rows} rows.")
+
+    def _rebuild_index(self, keys):
+        order = np.argsort(keys, kind='stable')
+        self._sorted_keys = keys[order]
+        self._sorted_rows = order.astype(np.int64)
+        self._recent = {}
+
+    def _vectors_view(self):
+        if self._vectors is None or len(self._vectors) < self.rows:
+            self._vectors = np.memmap(self.vectors_path, dtype=np.float32, mode='r', shape=(self.rows, self.dim))
+        return self._vectors
+
+    def _find(self, keys):
+        """Returns the store row of each key, or -1."""
+        rows = np.full(len(keys), -1, dtype=np.int64)
+        if len(self._sorted_keys):
+            positions = np.searchsorted(self._sorted_keys, keys)
+            positions = np.minimum(positions, len(self._sorted_keys) - 1)
+            found = self._sorted_keys[positions] == keys
+            rows[found] = self._sorted_rows[positions[found]]
+        if self._recent:
+            for i in np.flatnonzero(rows < 0):
+                rows[i] = self._recent.get(int(keys[i]), -1)
+        return rows
+
+    def _append(self, keys, embeddings):
+        embeddings = np.ascontiguousarray(embeddings, dtype=np.float32)
+        if self.dim is None:
+            self.dim = embeddings.shape[1]
+            with open(self.meta_path, 'w') as f:
+                json.dump({"model": self.model_name, "dim": self.dim, "dtype": "float32"}, f)
+        with open(self.vectors_path, 'ab') as f:
+            f.write(embeddings.tobytes())
+        with open(self.keys_path, 'ab') as f:
+            f.write(np.ascontiguousarray(keys, dtype=np.uint64).tobytes())
+        for offset, key in enumerate(keys):
+            self._recent[int(key)] = self.rows + offset
+        self.rows += len(keys)
+        if len(self._recent) >= self.merge_threshold:
+            self._rebuild_index(np.fromfile(self.keys_path, dtype=np.uint64))
+
+    def encode(self, texts, encode):
+        """Returns embeddings for `texts`, calling `encode` only for texts not in the store."""
+        texts = list(texts)
+        if not texts:
+            return np.zeros((0, self.dim or 0), dtype=np.float32)
+        keys = np.fromiter((text_key(text) for text in texts), dtype=np.uint64, count=len(texts))
+        rows = self._find(keys)
+        missing = np.flatnonzero(rows < 0)
+        self.hits += len(texts) - len(missing)
+        self.misses += len(missing)
+
+        new_embeddings = None
+        if len(missing):
+            # Encode each distinct missing text once, in order of first appearance.
+            unique_keys, first, inverse = np.unique(keys[missing], return_index=True, return_inverse=True)
+            order = np.argsort(first)
+            encoded = np.asarray(encode([texts[missing[i]] for i in first[order]]), dtype=np.float32)
+            self._append(unique_keys[order], encoded)
+            new_embeddings = np.empty_like(encoded)
+            new_embeddings[order] = encoded
+            if len(missing) == len(texts):
+                return new_embeddings[inverse]
+
+        output = np.empty((len(texts), self.dim), dtype=np.float32)
+        hit_positions = np.flatnonzero(rows >= 0)
+        if len(hit_positions):
+            output[hit_positions] = self._vectors_view()[rows[hit_positions]]
+        if new_embeddings is not None:
+            output[missing] = new_embeddings[inverse]
+        return output
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {"rows": self.rows, "hits": self.hits, "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0}
+
+
+class StoreBackedEncoder:
+    """Wraps an encoder so `encode` consults an `EmbeddingStore` first."""
+
+    def __init__(self, encoder, store):
+        self.encoder = encoder
+        self.store = store
+        self.logger = logging.getLogger(__name__)
+
+    def encode(self, texts, **kwargs):
+        return self.store.encode(texts, lambda missing: self.encoder.encode(missing, **kwargs))
+
+    def close(self):
+        """Closes the wrapped encoder if it holds resources, e.g. a ParallelEncoder's worker processes."""
+        if hasattr(self.encoder, "close"):
+            self.encoder.close()
+
+    def log_stats(self):
+        stats = self.store.stats()
+        self.logger.info(f"Embedding store: {stats['hits']} hits, {stats['misses']} misses "
+                         f"({stats['hit_rate']:.1%} hit rate), {stats['rows']} rows stored.")
@@ -16,6 +16,9 @@ echo "Tests passed. Starting the application..."
 echo "Deleting existing .csv files in /mnt/data/files..."
 find /mnt/data/files -name "*.csv" -type f -exec rm -f {} +
 
+# Start from an empty manifest since the files are re-extracted below
+rm -f /mnt/data/log/uploaded_files_manifest.json
+
 # Clear the content of uploaded_files_checklist.txt if it exists
 if [ -f "/mnt/data/log/uploaded_files_checklist.txt" ]; then
     echo "Clearing content of uploaded_files_checklist.txt..."
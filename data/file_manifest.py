@@ -0,0 +1,107 @@
+# data/file_manifest.py
+
+import os
+import json
+import hashlib
+import logging
+import uuid
+from collections import Counter
+
+# Namespace of the UUIDv5 point IDs; changing it would re-key every indexed row.
+POINT_ID_NAMESPACE = uuid.UUID('6f1c3a52-2b1e-5d0c-9a57-3d1f0f4e8b21')
+# Recorded per manifest entry; entries without it were uploaded with random point IDs.
+POINT_ID_SCHEME = "uuid5"
+
+
+def hash_row(document):
+    """Short content hash identifying one indexed row."""
+    return hashlib.blake2b(document.encode('utf-8'), digest_size=8).hexdigest()
+
+
+def hash_file(path, block_size=1 << 20):
+    """SHA-256 of a file's contents, read in blocks."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as file:
+        for block in iter(lambda: file.read(block_size), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def point_ids(file_path, row_hashes):
+    """Deterministic Qdrant point IDs for the rows of a file.
+
+    A row's ID is a UUIDv5 of its file path, content hash and occurrence number
+    among identical rows, so re-uploading a row overwrites its point in place and an
+    unchanged row keeps its ID when other rows are added, edited or moved.
+    """
+    occurrences = Counter()
+    ids = []
+    for row_hash in row_hashes:
+        ids.append(str(uuid.uuid5(POINT_ID_NAMESPACE, f"{file_path}\n{row_hash}\n{occurrences[row_hash]}")))
+        occurrences[row_hash] += 1
+    return ids
+
+
+class FileManifest:
+    """Records what was indexed from each CSV file: size, mtime, content hash and row hashes.
+
+    Stored as JSON next to the uploader log and rewritten atomically. Entries adopted
+    from the legacy `uploaded_files_checklist.txt` have no hashes; they are trusted
+    until the file changes, at which point the whole file is re-uploaded once with
+    deterministic point IDs.
+    """
+
+    def __init__(self, path, legacy_checklist=None):
+        self.path = path
+        self.logger = logging.getLogger(__name__)
+        self.entries = {}
+        if os.path.exists(path):
+            with open(path, 'r', encoding='utf-8') as file:
+                self.entries = json.load(file)
+        elif legacy_checklist and os.path.exists(legacy_checklist):
+            with open(legacy_checklist, 'r') as file:
+                names = {line.strip() for line in file if line.strip()}
+            self.entries = {name: {"size": None, "mtime_ns": None, "sha256": None, "rows": None} for name in names}
+            self.logger.info(f"Adopted {len(names)} files from legacy checklist {legacy_checklist}.")
+            self.save()
+
+    def files(self):
+        return set(self.entries)
+
+    def get(self, name):
+        return self.entries.get(name)
+
+    def is_unchanged(self, name, path):
+        """True when `path` still matches its entry; size/mtime first, content hash only if they differ."""
+        entry = self.entries.get(name)
+        if entry is None:
+            return False
+        stat = os.stat(path)
+        if entry["size"] is None:
+            # Legacy entry: record the current state and trust it.
+            entry.update(size=stat.st_size, mtime_ns=stat.st_mtime_ns, sha256=hash_file(path))
+            self.save()
+            return True
+        if entry["size"] == stat.st_size and entry["mtime_ns"] == stat.st_mtime_ns:
+            return True
+        if entry["size"] == stat.st_size and entry["sha256"] == hash_file(path):
+            entry["mtime_ns"] = stat.st_mtime_ns  # Touched but not modified
+            self.save()
+            return True
+        return False
+
+    def update(self, name, path, sha256, row_hashes):
+        stat = os.stat(path)
+        self.entries[name] = {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "sha256": sha256, "rows": row_hashes,
+                              "point_ids": POINT_ID_SCHEME}
+        self.save()
+
+    def remove(self, name):
+        if self.entries.pop(name, None) is not None:
+            self.save()
+
+    def save(self):
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as file:
+            json.dump(self.entries, file)
+        os.replace(tmp_path, self.path)
@@ -1,34 +1,65 @@
 # data/file_uploader_to_qdrant.py
 
 import os
-import csv
 import logging
-import time
 from sentence_transformers import SentenceTransformer
 from qdrant_utils import QdrantUtils  # Import only the QdrantUtils class
+from mmap_export import export_collection_to_mmap
+from ivfpq_build import build_ivfpq_index
+from ingest_pipeline import IngestPipeline, iter_document_chunks
+from parallel_encoder import ParallelEncoder
+from file_manifest import FileManifest, POINT_ID_SCHEME, hash_file, hash_row, point_ids
+from embedding_store import EmbeddingStore, StoreBackedEncoder
 
 
 class FileUploaderToQdrant:
-    def __init__(self, qdrant_url, mounted_dir, checklist_file="uploaded_files_checklist.txt"):
+    def __init__(self, qdrant_url, mounted_dir, manifest_file="uploaded_files_manifest.json",
+                 checklist_file="uploaded_files_checklist.txt"):
         self.qdrant_utils = QdrantUtils(qdrant_url)
         self.qdrant_url = qdrant_url
         self.mounted_dir = mounted_dir
+        self.manifest_file = os.path.join(mounted_dir, "log", manifest_file)
         self.checklist_file = os.path.join(mounted_dir, "log", checklist_file)
         self.collection_name = os.getenv('TABLE')
+        self.mmap_export_dir = os.getenv('MMAP_EXPORT_DIR')
+        self.ivfpq_export_dir = os.getenv('IVFPQ_EXPORT_DIR')
+        self.upload_chunk_size = int(os.getenv('UPLOAD_CHUNK_SIZE', '1024'))
+        self.upload_queue_depth = int(os.getenv('UPLOAD_QUEUE_DEPTH', '2'))
+        # Memory/recall trade-offs applied when the collection is first created.
+        self.collection_options = {
+            'quantization': os.getenv('QDRANT_QUANTIZATION', 'none').lower(),
+            'on_disk': os.getenv('QDRANT_ON_DISK_VECTORS', 'False').lower() in ('true', '1', 't'),
+            'hnsw_m': int(os.getenv('QDRANT_HNSW_M', '0')) or None,
+            'hnsw_ef_construct': int(os.getenv('QDRANT_HNSW_EF_CONSTRUCT', '0')) or None,
+        }
 
+        # ENCODER_WORKERS > 1 runs one model replica per worker process instead of one in-process model.
+        encoder_workers = int(os.getenv('ENCODER_WORKERS', '0'))
+        self.parallel_encoder = None
         try:
-            self.embedding_model = SentenceTransformer(os.environ["SENTENCE_TRANSFORMER"])
+            if encoder_workers > 1:
+                self.parallel_encoder = ParallelEncoder(os.environ["SENTENCE_TRANSFORMER"], encoder_workers)
+                self.embedding_model = self.parallel_encoder
+            else:
+                self.embedding_model = SentenceTransformer(os.environ["SENTENCE_TRANSFORMER"])
         except Exception as e:
             raise RuntimeError("Failed to initialize SentenceTransformer model") from e
 
+        # Embeddings of previously seen row texts are reused from EMBEDDING_STORE_DIR instead of re-encoded.
+        self.store_encoder = None
+        if os.getenv('EMBEDDING_STORE_DIR'):
+            store = EmbeddingStore(os.environ['EMBEDDING_STORE_DIR'], os.environ["SENTENCE_TRANSFORMER"])
+            self.store_encoder = StoreBackedEncoder(self.embedding_model, store)
+            self.embedding_model = self.store_encoder
+
         self.files_location = os.path.join(mounted_dir, "files")
         log_file_path = os.path.join(mounted_dir, "log", "service.log")
         logging.basicConfig(filename=log_file_path, level=logging.INFO,
                             format='%(asctime)s - %(levelname)s - %(message)s')
         self.logger = logging.getLogger(__name__)
 
-        if not os.path.exists(self.checklist_file):
-            open(self.checklist_file, 'w').close()  # Create an empty file if it doesn't exist
+        # The legacy checklist is only read to seed a missing manifest.
+        self.manifest = FileManifest(self.manifest_file, legacy_checklist=self.checklist_file)
 
         self.logger.info("Initialized FileUploaderToQdrant")
 
@@ -42,110 +73,176 @@ class FileUploaderToQdrant:
             self.logger.error(f"Error listing CSV files: {str(e)}")
             return []
 
-    def read_checklist(self):
-        """Reads the checklist file to get the list of already uploaded files."""
+    def delete_from_qdrant(self, file_paths):
+        """Deletes the records of the given files from Qdrant in one filtered operation; returns success."""
         try:
-            with open(self.checklist_file, 'r') as file:
-                uploaded_files = {line.strip() for line in file.readlines()}
-            self.logger.info(f"Read checklist with {len(uploaded_files)} files.")
-            return uploaded_files
+            self.logger.info(f"Deleting records from Qdrant for {len(file_paths)} files: {file_paths}")
+            self.qdrant_utils.delete_points_by_file_paths(self.collection_name, file_paths)
+            self.logger.info(f"Successfully deleted records for {len(file_paths)} files from Qdrant.")
+            return True
         except Exception as e:
-            self.logger.error(f"Error reading checklist file: {str(e)}")
-            return set()
+            self.logger.error(f"Error deleting records from Qdrant: {str(e)}")
+            return False
 
-    def update_checklist(self, filename):
-        """Adds a file to the checklist once uploaded to Qdrant."""
-        try:
-            with open(self.checklist_file, 'a') as file:
-                file.write(filename + '\n')
-            self.logger.info(f"Updated checklist with file: {filename}")
-        except Exception as e:
-            self.logger.error(f"Error updating checklist file: {str(e)}")
+    def _select_rows(self, csv_file, row_point_ids, to_upload):
+        """Streams only the rows whose point IDs are in `to_upload`, with their IDs appended to each chunk."""
+        for document_ids, documents in iter_document_chunks(csv_file, self.upload_chunk_size):
+            selected_ids, selected_documents = [], []
+            for doc_id, document in zip(document_ids, documents):
+                if row_point_ids[doc_id - 1] in to_upload:
+                    selected_ids.append(doc_id)
+                    selected_documents.append(document)
+            if selected_documents:
+                yield selected_ids, selected_documents
 
-    def remove_from_checklist(self, filename):
-        """Removes a file from the checklist if it no longer exists in the mounted directory."""
-        try:
-            uploaded_files = self.read_checklist()
-            if filename in uploaded_files:
-                uploaded_files.remove(filename)
-                with open(self.checklist_file, 'w') as file:
-                    for file_name in uploaded_files:
-                        file.write(file_name + '\n')
-                self.logger.info(f"Removed {filename} from checklist.")
-        except Exception as e:
-            self.logger.error(f"Error removing file from checklist: {str(e)}")
+    def upload_file_to_qdrant(self, csv_file):
+        """Indexes a new or modified CSV file, embedding only rows that are not indexed yet.
 
-    def delete_from_qdrant(self, file_path):
-        """Deletes records from Qdrant based on the file path and logs document counts."""
+        Every row has a deterministic point ID (see `file_manifest.point_ids`). IDs that are
+        new since the previous version in the manifest are encoded and upserted first; only
+        then are the IDs of removed or edited rows deleted, so searches never see the file
+        partially missing.
+        """
         try:
-            count_before = self.qdrant_utils.get_document_count(self.collection_name)
-            self.logger.info(f"Document count before deletion: {count_before}")
+            file_name = os.path.basename(csv_file)
+            sha256 = hash_file(csv_file)
+            row_hashes = [hash_row(document) for _, documents in iter_document_chunks(csv_file, self.upload_chunk_size)
+                          for document in documents]
+            row_point_ids = point_ids(csv_file, row_hashes)
+            entry = self.manifest.get(file_name)
+            # Entries written before point IDs were deterministic cannot be diffed by ID.
+            legacy = entry is not None and entry.get("point_ids") != POINT_ID_SCHEME
+            old_point_ids = set(point_ids(csv_file, entry["rows"])) if entry and not legacy else set()
 
-            self.logger.info(f"Deleting records from Qdrant with file path: {file_path}")
-            success = self.qdrant_utils.delete_points_by_file_path(self.qdrant_url, self.collection_name, file_path)
-            if success:
-                self.logger.info(f"Successfully deleted records for {file_path} from Qdrant.")
-            else:
-                self.logger.error(f"Failed to delete records for {file_path} from Qdrant.")
-
-            time.sleep(1)
-            count_after = self.qdrant_utils.get_document_count(self.collection_name)
-            self.logger.info(f"Document count after deletion: {count_after}")
+            to_upload = set(row_point_ids) - old_point_ids
+            vanished = sorted(old_point_ids - set(row_point_ids))
+            self.logger.info(f"{file_name}: {len(row_hashes)} rows, {len(to_upload)} to embed, {len(vanished)} to delete.")
 
-        except Exception as e:
-            self.logger.error(f"Error deleting records from Qdrant: {str(e)}")
+            collection_ready = False
 
-    def upload_file_to_qdrant(self, csv_file):
-        """Uploads the contents of a CSV file to the Qdrant collection and logs document counts."""
-        try:
-            count_before = self.qdrant_utils.get_document_count(self.collection_name)
-            self.logger.info(f"Document count before upload: {count_before}")
+            def upload(document_ids, documents, embeddings):
+                nonlocal collection_ready
+                if not collection_ready:
+                    self.qdrant_utils.create_collection_if_not_exists(self.collection_name, len(embeddings[0]),
+                                                                       **self.collection_options)
+                    collection_ready = True
+                self.qdrant_utils.upload_documents(self.collection_name, documents, embeddings, csv_file, document_ids,
+                                                   row_hashes=[row_hashes[doc_id - 1] for doc_id in document_ids],
+                                                   point_ids=[row_point_ids[doc_id - 1] for doc_id in document_ids])
 
-            documents, document_ids = [], []
-            with open(csv_file, mode='r', encoding='utf-8') as file:
-                reader = csv.DictReader(file, delimiter='|')
-                for doc_id, row in enumerate(reader, start=1):
-                    document = f"Context: {row['Context']}\nQuestion: {row['Question']}\nAnswer: {row['Answer']}"
-                    documents.append(document)
-                    document_ids.append(doc_id)
+            # Rows are streamed in chunks; chunk N is encoded while chunk N-1 uploads.
+            pipeline = IngestPipeline(self.embedding_model.encode, upload, self.upload_queue_depth)
+            stats = pipeline.run(self._select_rows(csv_file, row_point_ids, to_upload))
+            self.logger.info(f"Uploaded {stats['upload']['rows']} documents from {csv_file} to Qdrant collection: {self.collection_name}")
+            if self.parallel_encoder is not None:
+                self.parallel_encoder.log_stats()
+            if self.store_encoder is not None:
+                self.store_encoder.log_stats()
 
-            self.logger.info(f"Read {len(documents)} documents from file: {csv_file}")
+            if legacy:
+                self.qdrant_utils.delete_points_by_file_path_except(self.collection_name, csv_file, row_point_ids)
+            elif vanished:
+                self.qdrant_utils.delete_points_by_ids(self.collection_name, vanished)
 
-            embeddings = self.embedding_model.encode(documents, show_progress_bar=True)
-            self.qdrant_utils.create_collection_if_not_exists(self.collection_name, embeddings.shape[1])
-            self.qdrant_utils.upload_documents(self.collection_name, documents, embeddings, csv_file)
-            self.logger.info(f"Uploaded {len(documents)} documents to Qdrant collection: {self.collection_name}")
+            self.manifest.update(file_name, csv_file, sha256, row_hashes)
+            return legacy or bool(vanished) or stats['upload']['rows'] > 0
 
-            time.sleep(1)
-            count_after = self.qdrant_utils.get_document_count(self.collection_name)
-            self.logger.info(f"Document count after upload: {count_after}")
+        except Exception as e:
+            self.logger.error(f"Error uploading {csv_file} to Qdrant: {str(e)}")
+            return False
 
-            self.update_checklist(os.path.basename(csv_file))
+    def export_mmap_index(self):
+        """Exports the collection to the memory-mapped index format served by VECTOR_DB_TYPE=mmap."""
+        try:
+            index_dir = export_collection_to_mmap(
+                self.qdrant_utils.qdrant_client,
+                self.collection_name,
+                self.mmap_export_dir,
+                dtype=os.getenv('MMAP_EXPORT_DTYPE', 'float32')
+            )
+            self.logger.info(f"Exported mmap index to {index_dir}")
+            if self.ivfpq_export_dir:
+                self.build_ivfpq_index(index_dir)
+        except Exception as e:
+            self.logger.error(f"Error exporting mmap index: {str(e)}")
 
+    def build_ivfpq_index(self, source_dir):
+        """Builds the compressed IVF-PQ index served by VECTOR_DB_TYPE=ivfpq from an exported mmap index."""
+        try:
+            index_dir = build_ivfpq_index(
+                source_dir,
+                self.ivfpq_export_dir,
+                nlist=int(os.getenv('IVFPQ_NLIST', '0')) or None,
+                m=int(os.getenv('IVFPQ_M', '0')) or None
+            )
+            self.logger.info(f"Built IVF-PQ index at {index_dir}")
         except Exception as e:
-            self.logger.error(f"Error uploading {csv_file} to Qdrant: {str(e)}")
+            self.logger.error(f"Error building IVF-PQ index: {str(e)}")
 
     def sync_files_with_qdrant(self):
-        """Sync CSV files with Qdrant based on the checklist."""
+        """Sync CSV files with Qdrant based on the manifest: new and modified files are (re-)indexed, removed ones deleted."""
         try:
             csv_files = set(self.list_csv_files())
-            uploaded_files = self.read_checklist()
+            indexed_files = self.manifest.files()
 
-            files_to_upload = csv_files - uploaded_files
-            files_to_delete = uploaded_files - csv_files
+            files_to_upload = [file for file in sorted(csv_files)
+                               if not self.manifest.is_unchanged(file, os.path.join(self.files_location, file))]
+            files_to_delete = indexed_files - csv_files
 
+            changed = False
             for file in files_to_upload:
                 csv_path = os.path.join(self.files_location, file)
-                self.upload_file_to_qdrant(csv_path)
+                changed = self.upload_file_to_qdrant(csv_path) or changed
 
-            for file in files_to_delete:
-                csv_path = os.path.join(self.files_location, file)
-                self.delete_from_qdrant(csv_path)
-                self.remove_from_checklist(file)
+            deleted = self._delete_files(sorted(files_to_delete))
+
+            if changed or deleted:
+                self.publish_changes()
 
         except Exception as e:
             self.logger.error(f"Error syncing files with Qdrant: {str(e)}")
 
+    def sync_files(self, file_names):
+        """Syncs only the named files, e.g. those reported by the file watcher."""
+        try:
+            changed, files_to_delete = False, []
+            for file in sorted(set(file_names)):
+                csv_path = os.path.join(self.files_location, file)
+                if os.path.exists(csv_path):
+                    if not self.manifest.is_unchanged(file, csv_path):
+                        changed = self.upload_file_to_qdrant(csv_path) or changed
+                elif self.manifest.get(file) is not None:
+                    files_to_delete.append(file)
+
+            if self._delete_files(files_to_delete) or changed:
+                self.publish_changes()
+
+        except Exception as e:
+            self.logger.error(f"Error syncing files {sorted(file_names)} with Qdrant: {str(e)}")
+
+    def _delete_files(self, file_names):
+        """Deletes the points of removed files and drops them from the manifest; returns True if any were deleted."""
+        if not file_names:
+            return False
+        if not self.delete_from_qdrant([os.path.join(self.files_location, file) for file in file_names]):
+            return False  # Kept in the manifest so the next sweep retries
+        for file in file_names:
+            self.manifest.remove(file)
+        return True
+
+    def publish_changes(self):
+        """Stamps a new collection version and refreshes the exported indexes after a change."""
+        self.logger.info(f"Collection '{self.collection_name}' holds about "
+                         f"{self.qdrant_utils.get_document_count(self.collection_name, exact=False)} documents.")
+        self.qdrant_utils.bump_collection_version(self.collection_name)
+        if self.mmap_export_dir:
+            self.export_mmap_index()
+
+    def close(self):
+        """Stops the encoder worker processes, if any, and frees their shared memory."""
+        if self.parallel_encoder is not None:
+            self.parallel_encoder.close()
+
     def manual_trigger_sync(self):
         """Manually triggers the sync operation."""
         try:
@@ -159,4 +256,7 @@ if __name__ == "__main__":
     mounted_dir = "/mnt/data/"
 
     uploader = FileUploaderToQdrant(qdrant_url=qdrant_url, mounted_dir=mounted_dir)
-    uploader.manual_trigger_sync()
+    try:
+        uploader.manual_trigger_sync()
+    finally:
+        uploader.close()
@@ -0,0 +1,107 @@
+# data/file_watcher.py
+
+import os
+import logging
+import threading
+import time
+
+from watchdog.events import FileSystemEventHandler
+from watchdog.observers import Observer
+
+
+class DebouncedFileQueue:
+    """Collects changed file names and releases each one after it has been quiet for `debounce_seconds`.
+
+    A file being copied in produces a burst of create/modify events; waiting for
+    the burst to end keeps half-written CSVs from being indexed.
+    """
+
+    def __init__(self, debounce_seconds):
+        self.debounce_seconds = debounce_seconds
+        self._last_event = {}
+        self._condition = threading.Condition()
+
+    def touch(self, file_name):
+        with self._condition:
+            self._last_event[file_name] = time.monotonic()
+            self._condition.notify()
+
+    def pending(self):
+        with self._condition:
+            return len(self._last_event)
+
+    def get_ready(self, timeout):
+        """Waits up to `timeout` seconds and returns the files whose events have settled."""
+        deadline = time.monotonic() + timeout
+        with self._condition:
+            while True:
+                now = time.monotonic()
+                ready = [name for name, last in self._last_event.items() if now - last >= self.debounce_seconds]
+                if ready:
+                    for name in ready:
+                        del self._last_event[name]
+                    return ready
+                if now >= deadline:
+                    return []
+                next_due = min((last + self.debounce_seconds for last in self._last_event.values()), default=deadline)
+                self._condition.wait(max(0.0, min(next_due, deadline) - now))
+
+
+class CsvEventHandler(FileSystemEventHandler):
+    """Queues the CSV files touched by create, modify, delete and move events."""
+
+    def __init__(self, queue):
+        self.queue = queue
+
+    def _queue_path(self, path):
+        if path.endswith('.csv'):
+            self.queue.touch(os.path.basename(path))
+
+    def on_any_event(self, event):
+        if event.is_directory:
+            return
+        if event.event_type in ('created', 'modified', 'deleted', 'closed', 'moved'):
+            self._queue_path(event.src_path)
+        if event.event_type == 'moved':
+            self._queue_path(event.dest_path)
+
+
+class FileWatcher:
+    """Syncs files as soon as inotify reports them changed, with a slow full sweep as a safety net.
+
+    Events only enqueue file names; all syncing runs on the calling thread, so the
+    uploader is never used concurrently. The periodic sweep catches anything the
+    watcher misses (events lost on overflow, file systems without inotify support).
+    """
+
+    def __init__(self, uploader, files_dir, debounce_seconds=2.0, sweep_seconds=300.0):
+        self.uploader = uploader
+        self.files_dir = files_dir
+        self.sweep_seconds = sweep_seconds
+        self.queue = DebouncedFileQueue(debounce_seconds)
+        self.observer = Observer()
+        self.observer.schedule(CsvEventHandler(self.queue), files_dir, recursive=False)
+        self.logger = logging.getLogger(__name__)
+        self._stop = threading.Event()
+
+    def run(self):
+        self.observer.start()
+        self.logger.info(f"Watching {self.files_dir} (debounce {self.queue.debounce_seconds}s, sweep every {self.sweep_seconds}s)")
+        try:
+            # Start with a sweep so changes made while the uploader was down are picked up.
+            next_sweep = time.monotonic()
+            while not self._stop.is_set():
+                if time.monotonic() >= next_sweep:
+                    self.logger.info("Running consistency sweep.")
+                    self.uploader.sync_files_with_qdrant()
+                    next_sweep = time.monotonic() + self.sweep_seconds
+                ready = self.queue.get_ready(timeout=min(1.0, max(0.0, next_sweep - time.monotonic())))
+                if ready:
+                    self.logger.info(f"Syncing changed files: {sorted(ready)}")
+                    self.uploader.sync_files(ready)
+        finally:
+            self.observer.stop()
+            self.observer.join()
+
+    def stop(self):
+        self._stop.set()
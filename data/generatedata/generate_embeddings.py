@@ -7,10 +7,13 @@ def generate_and_upload_embeddings():
     documents = load_documents()
 
     # Initialize the embedding model
-    embedding_model = SentenceTransformer('all-MiniLM-L6-v2')
+    embedding_model = create_encoder('all-MiniLM-L6-v2')
 
     # Generate data
-    embeddings = embedding_model.encode(documents, show_progress_bar=True)
+    try:
+        embeddings = embedding_model.encode(documents, show_progress_bar=True)
+    finally:
+        close_encoder(embedding_model)
 
     # Initialize Qdrant client
     qdrant_url = os.getenv('QDRANT_URL', 'http://qdrant:6333')
@@ -37,8 +40,44 @@ from sentence_transformers import SentenceTransformer
 from qdrant_client import QdrantClient
 from qdrant_client.http import models as qdrant_models
 
-# Generate data using a pre-trained model
-embedding_model = os.getenv("SENTENCE_TRANSFORMER")
+from data.parallel_encoder import ParallelEncoder
+from data.embedding_store import EmbeddingStore, StoreBackedEncoder
+
+
+def create_encoder(model_name):
+    """Returns a SentenceTransformer, or a multi-process encoder when ENCODER_WORKERS > 1.
+
+    With EMBEDDING_STORE_DIR set, previously encoded texts are served from the on-disk store.
+    """
+    workers = int(os.getenv("ENCODER_WORKERS", "0"))
+    encoder = ParallelEncoder(model_name, workers) if workers > 1 else SentenceTransformer(model_name)
+    if os.getenv("EMBEDDING_STORE_DIR"):
+        encoder = StoreBackedEncoder(encoder, EmbeddingStore(os.environ["EMBEDDING_STORE_DIR"], model_name))
+    return encoder
+
+
+def close_encoder(encoder):
+    """Stops the worker processes and frees the shared memory of a multi-process encoder."""
+    if hasattr(encoder, "close"):
+        encoder.close()
+
+
+# Generate data using a pre-trained model; created on first use so spawned encoder workers don't re-create it
+embedding_model = None
+
+
+def get_embedding_model():
+    global embedding_model
+    if embedding_model is None:
+        embedding_model = create_encoder(os.getenv("SENTENCE_TRANSFORMER"))
+    return embedding_model
+
+
+def close_embedding_model():
+    global embedding_model
+    if embedding_model is not None:
+        close_encoder(embedding_model)
+        embedding_model = None
 
 
 def upload_csv_to_qdrant(input_dir, csv_file, qdrant_client, collection_name):
@@ -70,7 +109,7 @@ def upload_csv_to_qdrant(input_dir, csv_file, qdrant_client, collection_name):
 
         print(f"Read {len(documents)} documents from file: {csv_file}")
 
-        embeddings = embedding_model.encode(documents, show_progress_bar=True)
+        embeddings = get_embedding_model().encode(documents, show_progress_bar=True)
 
         # Check if the collection exists in Qdrant
         collections = qdrant_client.get_collections().collections
@@ -100,10 +139,15 @@ def upload_csv_to_qdrant(input_dir, csv_file, qdrant_client, collection_name):
         )
 
         print(f"Successfully uploaded {len(documents)} documents to Qdrant collection: {collection_name}")
+        if isinstance(get_embedding_model(), StoreBackedEncoder):
+            print(f"Embedding store stats: {get_embedding_model().store.stats()}")
 
     except Exception as e:
         print(f"Error while uploading file {csv_file} to Qdrant: {str(e)}")
 
 
 if __name__ == "__main__":
-    generate_and_upload_embeddings()
+    try:
+        generate_and_upload_embeddings()
+    finally:
+        close_embedding_model()
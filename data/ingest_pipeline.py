@@ -0,0 +1,111 @@
+# data/ingest_pipeline.py
+
+import csv
+import logging
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+
+def format_document(row):
+    """Builds the indexed text of one CSV row."""
+    return f"Context: {row['Context']}\nQuestion: {row['Question']}\nAnswer: {row['Answer']}"
+
+
+def iter_document_chunks(csv_file, chunk_size):
+    """Streams `(document_ids, documents)` chunks from a '|'-delimited CSV without reading it whole."""
+    with open(csv_file, mode='r', encoding='utf-8') as file:
+        reader = csv.DictReader(file, delimiter='|')
+        document_ids, documents = [], []
+        for doc_id, row in enumerate(reader, start=1):
+            document_ids.append(doc_id)
+            documents.append(format_document(row))
+            if len(documents) >= chunk_size:
+                yield document_ids, documents
+                document_ids, documents = [], []
+        if documents:
+            yield document_ids, documents
+
+
+class StageStats:
+    """Rows processed and busy time of one pipeline stage."""
+
+    def __init__(self, name):
+        self.name = name
+        self.rows = 0
+        self.seconds = 0.0
+
+    def record(self, rows, seconds):
+        self.rows += rows
+        self.seconds += seconds
+
+    @property
+    def rows_per_second(self):
+        return self.rows / self.seconds if self.seconds else 0.0
+
+    def summary(self):
+        return f"{self.name}: {self.rows} rows in {self.seconds:.2f}s ({self.rows_per_second:.1f} rows/s)"
+
+
+class IngestPipeline:
+    """Overlaps reading/encoding with uploading so memory stays flat for any file size.
+
+    The calling thread reads and encodes chunk N while a single uploader thread
+    sends earlier chunks to Qdrant. At most `queue_depth` encoded chunks wait for
+    upload; once the queue is full, encoding blocks until the oldest upload is done,
+    so only `(queue_depth + 1) * chunk_size` rows are ever held in memory.
+    """
+
+    def __init__(self, encode, upload, queue_depth=2):
+        self.encode = encode
+        self.upload = upload
+        self.queue_depth = max(1, queue_depth)
+        self.logger = logging.getLogger(__name__)
+        self.stages = {name: StageStats(name) for name in ("read", "encode", "upload")}
+
+    def _upload(self, document_ids, documents, embeddings):
+        start_time = time.perf_counter()
+        self.upload(document_ids, documents, embeddings)
+        self.stages["upload"].record(len(documents), time.perf_counter() - start_time)
+
+    def run(self, chunks):
+        """Processes `(document_ids, documents)` chunks; re-raises the first read, encode or upload error."""
+        start_time = time.perf_counter()
+        pending = deque()
+        chunks = iter(chunks)
+        with ThreadPoolExecutor(max_workers=1, thread_name_prefix="upload") as uploader:
+            try:
+                while True:
+                    read_start = time.perf_counter()
+                    chunk = next(chunks, None)
+                    if chunk is None:
+                        break
+                    document_ids, documents = chunk
+                    self.stages["read"].record(len(documents), time.perf_counter() - read_start)
+
+                    encode_start = time.perf_counter()
+                    embeddings = self.encode(documents)
+                    self.stages["encode"].record(len(documents), time.perf_counter() - encode_start)
+
+                    while len(pending) >= self.queue_depth:
+                        pending.popleft().result()
+                    pending.append(uploader.submit(self._upload, document_ids, documents, embeddings))
+                while pending:
+                    pending.popleft().result()
+            finally:
+                for future in pending:
+                    future.cancel()
+
+        elapsed_time = time.perf_counter() - start_time
+        rows = self.stages["upload"].rows
+        for stage in self.stages.values():
+            self.logger.info(f"Ingest stage {stage.summary()}")
+        self.logger.info(f"Ingested {rows} rows in {elapsed_time:.2f}s ({rows / elapsed_time if elapsed_time else 0.0:.1f} rows/s)")
+        return self.stats(elapsed_time)
+
+    def stats(self, elapsed_time=None):
+        stats = {name: {"rows": stage.rows, "seconds": stage.seconds, "rows_per_second": stage.rows_per_second}
+                 for name, stage in self.stages.items()}
+        if elapsed_time is not None:
+            stats["elapsed_seconds"] = elapsed_time
+        return stats
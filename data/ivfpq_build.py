@@ -0,0 +1,143 @@
+# data/ivfpq_build.py
+
+import os
+import json
+import logging
+import shutil
+import time
+
+import numpy as np
+
+from mmap_export import CURRENT_LINK, remove_old_indexes
+
+# Rows processed per vectorized step while assigning and encoding.
+CHUNK_ROWS = 65536
+
+
+def load_mmap_vectors(index_dir):
+    """Opens the vectors of an index written by mmap_export.py without loading them into memory."""
+    with open(os.path.join(index_dir, "meta.json"), 'r') as f:
+        meta = json.load(f)
+    vectors = np.memmap(os.path.join(index_dir, "vectors.bin"), dtype=meta["dtype"], mode='r',
+                        shape=(meta["count"], meta["dim"]))
+    return meta, vectors
+
+
+def _assign(x, centroids):
+    """Returns the index of the nearest centroid (L2) for every row of `x`."""
+    centroid_norms = (centroids * centroids).sum(axis=1)
+    assignments = np.empty(len(x), dtype=np.int64)
+    for start in range(0, len(x), CHUNK_ROWS):
+        chunk = np.asarray(x[start:start + CHUNK_ROWS], dtype=np.float32)
+        distances = centroid_norms[None, :] - 2.0 * (chunk @ centroids.T)
+        assignments[start:start + len(chunk)] = np.argmin(distances, axis=1)
+    return assignments
+
+
+def kmeans(x, k, iterations=20, rng=None):
+    """Lloyd's k-means with vectorized assignment and update steps."""
+    rng = rng or np.random.default_rng(0)
+    x = np.asarray(x, dtype=np.float32)
+    k = min(k, len(x))
+    centroids = x[rng.choice(len(x), k, replace=False)].copy()
+    for _ in range(iterations):
+        assignments = _assign(x, centroids)
+        order = np.argsort(assignments, kind='stable')
+        counts = np.bincount(assignments, minlength=k)
+        non_empty = np.flatnonzero(counts)
+        starts = np.concatenate(([0], np.cumsum(counts)[:-1]))[non_empty]
+        centroids[non_empty] = np.add.reduceat(x[order], starts, axis=0) / counts[non_empty, None]
+        empty = np.flatnonzero(counts == 0)
+        if len(empty):
+            # Re-seed empty clusters on random points so every list stays usable.
+            centroids[empty] = x[rng.choice(len(x), len(empty), replace=False)]
+    return centroids
+
+
+def encode_pq(residuals, codebooks):
+    """Encodes residual rows into one uint8 code per subquantizer."""
+    m, ksub, dsub = codebooks.shape
+    sub_vectors = residuals.reshape(len(residuals), m, dsub)
+    codes = np.empty((len(residuals), m), dtype=np.uint8)
+    for j in range(m):
+        codes[:, j] = _assign(sub_vectors[:, j, :], codebooks[j])
+    return codes
+
+
+def build_ivfpq_index(source_dir, out_dir, nlist=None, m=None, train_size=100000, iterations=20, seed=0, keep=2):
+    """Builds an IVF-PQ index from an mmap index directory (see mmap_export.py).
+
+    Layout written to `<out_dir>/<version>/`:
+        meta.json               mmap meta plus {"index": "ivfpq", "nlist", "m", "ksub"}
+        coarse_centroids.npy    (nlist, dim) float32
+        pq_codebooks.npy        (m, ksub, dim / m) float32 residual codebooks
+        list_offsets.npy        (nlist + 1,) int64 start of each inverted list
+        codes.npy               (count, m) uint8 PQ codes grouped by list
+        ids.npy                 (count,) int64 source row of each code
+        vectors.bin, payloads.bin, payload_offsets.npy
+                                hard links to the source index, used for payloads and exact re-ranking
+    """
+    logger = logging.getLogger(__name__)
+    rng = np.random.default_rng(seed)
+    meta, vectors = load_mmap_vectors(source_dir)
+    count, dim = meta["count"], meta["dim"]
+    if count == 0:
+        raise ValueError(f"Cannot build an IVF-PQ index from the empty index at {source_dir}.")
+    nlist = nlist or max(1, min(int(4 * np.sqrt(count)), 65536))
+    nlist = min(nlist, count)
+    m = m or next(candidate for candidate in (48, 32, 24, 16, 12, 8, 6, 4, 3, 2, 1) if dim % candidate == 0)
+    if dim % m != 0:
+        raise ValueError(f"Vector dimension {dim} is not divisible by m={m}.")
+    ksub = min(256, count)
+
+    start_time = time.perf_counter()
+    sample = np.asarray(vectors[np.sort(rng.choice(count, min(train_size, count), replace=False))], dtype=np.float32)
+    coarse_centroids = kmeans(sample, nlist, iterations, rng)
+    residuals = (sample - coarse_centroids[_assign(sample, coarse_centroids)]).reshape(len(sample), m, dim // m)
+    pq_codebooks = np.stack([kmeans(residuals[:, j, :], ksub, iterations, rng) for j in range(m)])
+    logger.info(f"Trained IVF-PQ (nlist={nlist}, m={m}) on {len(sample)} vectors in {time.perf_counter() - start_time:.1f}s")
+
+    lists = np.empty(count, dtype=np.int64)
+    codes = np.empty((count, m), dtype=np.uint8)
+    for start in range(0, count, CHUNK_ROWS):
+        chunk = np.asarray(vectors[start:start + CHUNK_ROWS], dtype=np.float32)
+        chunk_lists = _assign(chunk, coarse_centroids)
+        lists[start:start + len(chunk)] = chunk_lists
+        codes[start:start + len(chunk)] = encode_pq(chunk - coarse_centroids[chunk_lists], pq_codebooks)
+
+    order = np.argsort(lists, kind='stable')
+    list_offsets = np.concatenate(([0], np.cumsum(np.bincount(lists, minlength=nlist)))).astype(np.int64)
+
+    version = time.time_ns()
+    index_dir = os.path.join(out_dir, str(version))
+    os.makedirs(index_dir, exist_ok=True)
+    np.save(os.path.join(index_dir, "coarse_centroids.npy"), coarse_centroids)
+    np.save(os.path.join(index_dir, "pq_codebooks.npy"), pq_codebooks)
+    np.save(os.path.join(index_dir, "list_offsets.npy"), list_offsets)
+    np.save(os.path.join(index_dir, "codes.npy"), codes[order])
+    np.save(os.path.join(index_dir, "ids.npy"), order.astype(np.int64))
+    for file_name in ("vectors.bin", "payloads.bin", "payload_offsets.npy"):
+        source, target = os.path.join(source_dir, file_name), os.path.join(index_dir, file_name)
+        try:
+            os.link(source, target)
+        except OSError:
+            shutil.copyfile(source, target)
+    with open(os.path.join(index_dir, "meta.json"), 'w') as f:
+        json.dump(dict(meta, index="ivfpq", nlist=nlist, m=m, ksub=ksub, version=version), f)
+
+    tmp_link = os.path.join(out_dir, f".{CURRENT_LINK}.{version}")
+    os.symlink(str(version), tmp_link)
+    os.replace(tmp_link, os.path.join(out_dir, CURRENT_LINK))
+    remove_old_indexes(out_dir, keep)
+    logger.info(f"Built IVF-PQ index with {count} vectors at {index_dir} in {time.perf_counter() - start_time:.1f}s")
+    return index_dir
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    build_ivfpq_index(
+        os.path.join(os.getenv('MMAP_EXPORT_DIR', '/mnt/data/index'), CURRENT_LINK),
+        os.getenv('IVFPQ_EXPORT_DIR', '/mnt/data/ivfpq'),
+        nlist=int(os.getenv('IVFPQ_NLIST', '0')) or None,
+        m=int(os.getenv('IVFPQ_M', '0')) or None,
+    )
@@ -0,0 +1,118 @@
+# data/mmap_export.py
+
+import os
+import json
+import logging
+import time
+
+import numpy as np
+
+# Must match the reader in api/services/mmap_vector_service.py:
+#   meta.json, vectors.bin (raw count x dim rows, L2-normalized), payload_offsets.npy (count + 1), payloads.bin
+CURRENT_LINK = "current"
+
+
+class MmapIndexWriter:
+    """Streams vectors and payloads into a versioned mmap index directory.
+
+    Rows are appended to raw files batch by batch, so exporting never holds the whole
+    collection in memory. `publish()` atomically repoints `<out_dir>/current` at the
+    finished directory, which API workers pick up on their next reload check.
+    """
+
+    def __init__(self, out_dir, dim, dtype='float32', normalize=True):
+        self.out_dir = out_dir
+        self.version = time.time_ns()
+        self.index_dir = os.path.join(out_dir, str(self.version))
+        os.makedirs(self.index_dir, exist_ok=True)
+        self.dim = dim
+        self.dtype = np.dtype(dtype)
+        self.normalize = normalize
+        self.vector_file = open(os.path.join(self.index_dir, "vectors.bin"), 'wb')
+        self.payload_file = open(os.path.join(self.index_dir, "payloads.bin"), 'wb')
+        self.offsets = [0]
+        self.rows_written = 0
+        self.logger = logging.getLogger(__name__)
+
+    def add(self, vectors, payloads):
+        """Appends a batch of vectors with their payload dicts."""
+        vectors = np.asarray(vectors, dtype=np.float32).reshape(-1, self.dim)
+        if self.normalize:
+            norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+            vectors = vectors / np.where(norms == 0, 1, norms)
+        self.vector_file.write(np.ascontiguousarray(vectors, dtype=self.dtype).tobytes())
+        for payload in payloads:
+            encoded = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+            self.payload_file.write(encoded)
+            self.offsets.append(self.offsets[-1] + len(encoded))
+        self.rows_written += len(vectors)
+
+    def publish(self):
+        """Finalizes the files and atomically makes this index the current one."""
+        self.vector_file.close()
+        self.payload_file.close()
+        np.save(os.path.join(self.index_dir, "payload_offsets.npy"), np.asarray(self.offsets, dtype=np.int64))
+        with open(os.path.join(self.index_dir, "meta.json"), 'w') as f:
+            json.dump({
+                "count": self.rows_written,
+                "dim": self.dim,
+                "dtype": self.dtype.name,
+                "distance": "Cosine" if self.normalize else "Dot",
+                "version": self.version,
+            }, f)
+
+        tmp_link = os.path.join(self.out_dir, f".{CURRENT_LINK}.{self.version}")
+        os.symlink(str(self.version), tmp_link)
+        os.replace(tmp_link, os.path.join(self.out_dir, CURRENT_LINK))
+        self.logger.info(f"Published mmap index with {self.rows_written} vectors at {self.index_dir}")
+        return self.index_dir
+
+
+def export_collection_to_mmap(qdrant_client, collection_name, out_dir, dtype='float32', batch_size=1024, keep=2):
+    """Exports a Qdrant collection (vectors and payloads) to the mmap index format."""
+    logger = logging.getLogger(__name__)
+    os.makedirs(out_dir, exist_ok=True)
+
+    dim = qdrant_client.get_collection(collection_name).config.params.vectors.size
+    writer = MmapIndexWriter(out_dir, dim, dtype=dtype)
+
+    offset = None
+    while True:
+        points, offset = qdrant_client.scroll(
+            collection_name=collection_name,
+            limit=batch_size,
+            offset=offset,
+            with_payload=True,
+            with_vectors=True
+        )
+        if points:
+            writer.add([point.vector for point in points], [point.payload for point in points])
+        if offset is None:
+            break
+
+    index_dir = writer.publish()
+    remove_old_indexes(out_dir, keep)
+    logger.info(f"Exported collection '{collection_name}' to {index_dir}")
+    return index_dir
+
+
+def remove_old_indexes(out_dir, keep):
+    """Deletes all but the newest `keep` index versions; open mmaps stay valid until unmapped."""
+    versions = sorted((name for name in os.listdir(out_dir) if name.isdigit()), key=int)
+    for name in versions[:-keep]:
+        index_dir = os.path.join(out_dir, name)
+        for file_name in os.listdir(index_dir):
+            os.remove(os.path.join(index_dir, file_name))
+        os.rmdir(index_dir)
+
+
+if __name__ == "__main__":
+    from qdrant_client import QdrantClient
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    export_collection_to_mmap(
+        QdrantClient(url=os.getenv('QDRANT_URL', 'http://localhost:6333')),
+        os.getenv('TABLE'),
+        os.getenv('MMAP_EXPORT_DIR', '/mnt/data/index'),
+        dtype=os.getenv('MMAP_EXPORT_DTYPE', 'float32'),
+    )
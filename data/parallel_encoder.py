@@ -0,0 +1,188 @@
+# data/parallel_encoder.py
+
+import os
+import logging
+import multiprocessing
+import queue
+import time
+from multiprocessing import shared_memory
+
+import numpy as np
+
+# Rows encoded per task; also the row capacity of each worker's shared output buffer.
+TASK_ROWS = 256
+# How often a wait for results checks that every worker is still alive.
+LIVENESS_CHECK_SECONDS = 5.0
+
+
+def _available_cpus():
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+def load_sentence_transformer(model_name, torch_threads):
+    import torch
+    from sentence_transformers import SentenceTransformer
+
+    torch.set_num_threads(torch_threads)
+    return SentenceTransformer(model_name)
+
+
+def _encoder_worker(worker_id, model_loader, model_name, torch_threads, tasks, results):
+    """Worker process: loads one model replica and encodes the text chunks it is sent.
+
+    Embeddings are written into the shared-memory buffer named in each task instead
+    of being pickled back; only `(worker_id, rows, seconds)` travels through the queue.
+    """
+    try:
+        model = model_loader(model_name, torch_threads)
+    except Exception as e:
+        results.put(("error", worker_id, repr(e)))
+        return
+    results.put(("ready", worker_id, model.get_sentence_embedding_dimension()))
+
+    buffers = {}
+    while True:
+        task = tasks.get()
+        if task is None:
+            break
+        buffer_name, texts = task
+        try:
+            start_time = time.perf_counter()
+            embeddings = np.asarray(model.encode(texts), dtype=np.float32)
+            if buffer_name not in buffers:
+                buffers[buffer_name] = shared_memory.SharedMemory(name=buffer_name)
+            out = np.ndarray(embeddings.shape, dtype=np.float32, buffer=buffers[buffer_name].buf)
+            out[:] = embeddings
+            results.put(("done", worker_id, (len(texts), time.perf_counter() - start_time)))
+        except Exception as e:
+            results.put(("error", worker_id, repr(e)))
+    for buffer in buffers.values():
+        buffer.close()
+
+
+class ParallelEncoder:
+    """Encodes texts with one SentenceTransformer replica per worker process.
+
+    `encode(texts)` splits its input into `TASK_ROWS` tasks and deals them out
+    round-robin, one in flight per worker. Every worker owns a shared-memory output
+    buffer in which it leaves its embeddings; the parent copies them straight into
+    the result array, so no vectors are pickled between processes. Torch threads per
+    worker default to `cpus // workers` so the replicas do not oversubscribe cores.
+
+    A worker that dies (OOM kill, crash in torch) makes `encode` raise instead of
+    waiting forever. Use it as a context manager, or call `close()`, to stop the
+    workers and free the shared memory.
+    """
+
+    def __init__(self, model_name, workers, torch_threads=None, task_rows=TASK_ROWS,
+                 model_loader=load_sentence_transformer, liveness_check_seconds=LIVENESS_CHECK_SECONDS):
+        self.logger = logging.getLogger(__name__)
+        self.workers = workers
+        self.task_rows = task_rows
+        self.liveness_check_seconds = liveness_check_seconds
+        self.closed = False
+        torch_threads = torch_threads or max(1, _available_cpus() // workers)
+        context = multiprocessing.get_context("spawn")
+        self.results = context.Queue()
+        self.tasks = [context.Queue() for _ in range(workers)]
+        self.processes = [
+            context.Process(target=_encoder_worker, daemon=True,
+                            args=(i, model_loader, model_name, torch_threads, self.tasks[i], self.results))
+            for i in range(workers)
+        ]
+        for process in self.processes:
+            process.start()
+
+        dims = {}
+        try:
+            while len(dims) < workers:
+                kind, worker_id, value = self._next_result()
+                if kind == "error":
+                    raise RuntimeError(f"Encoder worker {worker_id} failed to start: {value}")
+                dims[worker_id] = value
+        except RuntimeError:
+            self.close()
+            raise
+        self.dim = dims[0]
+        self.buffers = [shared_memory.SharedMemory(create=True, size=task_rows * self.dim * 4) for _ in range(workers)]
+        self.worker_rows = [0] * workers
+        self.worker_seconds = [0.0] * workers
+        self.logger.info(f"Started {workers} encoder processes for {model_name} ({torch_threads} torch threads each)")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def _next_result(self):
+        """Waits for the next worker message, raising if a worker process has died meanwhile."""
+        while True:
+            try:
+                return self.results.get(timeout=self.liveness_check_seconds)
+            except queue.Empty:
+                for worker_id, process in enumerate(self.processes):
+                    if not process.is_alive():
+                        raise RuntimeError(f"Encoder worker {worker_id} exited unexpectedly "
+                                           f"(exit code {process.exitcode})")
+
+    def encode(self, texts, **kwargs):
+        """Returns a `(len(texts), dim)` float32 array; extra SentenceTransformer kwargs are ignored."""
+        texts = list(texts)
+        output = np.empty((len(texts), self.dim), dtype=np.float32)
+        starts = list(range(0, len(texts), self.task_rows))
+        next_task, in_flight = 0, {}
+
+        def dispatch(worker_id):
+            nonlocal next_task
+            start = starts[next_task]
+            next_task += 1
+            in_flight[worker_id] = start
+            self.tasks[worker_id].put((self.buffers[worker_id].name, texts[start:start + self.task_rows]))
+
+        for worker_id in range(min(self.workers, len(starts))):
+            dispatch(worker_id)
+        while in_flight:
+            kind, worker_id, value = self._next_result()
+            start = in_flight.pop(worker_id)
+            if kind == "error":
+                # Drain the tasks still running so their buffers are not overwritten later.
+                for _ in range(len(in_flight)):
+                    self._next_result()
+                raise RuntimeError(f"Encoder worker {worker_id} failed: {value}")
+            rows, seconds = value
+            output[start:start + rows] = np.ndarray((rows, self.dim), dtype=np.float32, buffer=self.buffers[worker_id].buf)
+            self.worker_rows[worker_id] += rows
+            self.worker_seconds[worker_id] += seconds
+            if next_task < len(starts):
+                dispatch(worker_id)
+        return output
+
+    def stats(self):
+        """Rows and rows/sec encoded by each worker so far."""
+        return [
+            {"worker": i, "rows": rows, "rows_per_second": rows / seconds if seconds else 0.0}
+            for i, (rows, seconds) in enumerate(zip(self.worker_rows, self.worker_seconds))
+        ]
+
+    def log_stats(self):
+        for worker in self.stats():
+            self.logger.info(f"Encoder worker {worker['worker']}: {worker['rows']} rows ({worker['rows_per_second']:.1f} rows/s)")
+
+    def close(self):
+        """Stops the workers and unlinks the shared-memory buffers; safe to call more than once."""
+        if self.closed:
+            return
+        self.closed = True
+        for tasks in self.tasks:
+            tasks.put(None)
+        for process in self.processes:
+            process.join(timeout=10)
+            if process.is_alive():
+                process.terminate()
+        for buffer in getattr(self, "buffers", []):
+            buffer.close()
+            buffer.unlink()
@@ -7,40 +7,97 @@ from qdrant_client import QdrantClient
 from qdrant_client.http import models as qdrant_models
 from requests.exceptions import HTTPError, RequestException
 
+# Side collection holding a single point whose payload stamps the main collection's version.
+# The API's response cache polls it (see api/services/qdrant_service.py).
+VERSION_COLLECTION_SUFFIX = "__meta"
+VERSION_POINT_ID = 0
+
+
+def build_quantization_config(quantization):
+    """Qdrant quantization settings for 'scalar' (int8) or 'binary'; None or 'none' disables quantization."""
+    if quantization in (None, '', 'none'):
+        return None
+    if quantization == 'scalar':
+        return qdrant_models.ScalarQuantization(scalar=qdrant_models.ScalarQuantizationConfig(
+            type=qdrant_models.ScalarType.INT8, quantile=0.99, always_ram=True))
+    if quantization == 'binary':
+        return qdrant_models.BinaryQuantization(binary=qdrant_models.BinaryQuantizationConfig(always_ram=True))
+    raise ValueError(f"Unsupported quantization: {quantization}")
+
+
 class QdrantUtils:
     def __init__(self, qdrant_url):
         self.qdrant_url = qdrant_url
         self.qdrant_client = QdrantClient(url=qdrant_url)
         self.logger = logging.getLogger(__name__)
 
-    def create_collection_if_not_exists(self, collection_name, vector_size, distance='Cosine'):
-        """Creates a collection in Qdrant if it does not exist."""
+    def create_collection_if_not_exists(self, collection_name, vector_size, distance='Cosine', quantization=None,
+                                        on_disk=False, hnsw_m=None, hnsw_ef_construct=None):
+        """Creates a collection in Qdrant if it does not exist.
+
+        `quantization` ('scalar' for int8, 'binary' or None) keeps a compressed copy of every
+        vector in RAM for the search; with `on_disk` the original vectors are only kept on disk
+        and read to rescore candidates. `hnsw_m` and `hnsw_ef_construct` override Qdrant's HNSW
+        graph defaults. The options only apply when the collection is created.
+        """
         try:
             collections = self.qdrant_client.get_collections().collections
             existing_collections = [col.name for col in collections]
 
             if collection_name not in existing_collections:
+                hnsw_config = None
+                if hnsw_m is not None or hnsw_ef_construct is not None:
+                    hnsw_config = qdrant_models.HnswConfigDiff(m=hnsw_m, ef_construct=hnsw_ef_construct)
                 self.qdrant_client.create_collection(
                     collection_name=collection_name,
-                    vectors_config=qdrant_models.VectorParams(size=vector_size, distance=distance)
+                    vectors_config=qdrant_models.VectorParams(size=vector_size, distance=distance,
+                                                              on_disk=on_disk or None),
+                    hnsw_config=hnsw_config,
+                    quantization_config=build_quantization_config(quantization)
                 )
-                self.logger.info(f"Created collection '{collection_name}' with vector size {vector_size}.")
+                self.logger.info(f"Created collection '{collection_name}' with vector size {vector_size} "
+                                 f"(quantization={quantization}, on_disk={on_disk}, hnsw_m={hnsw_m}, "
+                                 f"hnsw_ef_construct={hnsw_ef_construct}).")
             else:
                 self.logger.info(f"Collection '{collection_name}' already exists.")
+            self.create_payload_indexes(collection_name)
         except Exception as e:
             self.logger.error(f"Error creating collection '{collection_name}': {str(e)}")
             raise  # Re-raise exception for external handling if required
 
-    def upload_documents(self, collection_name, documents, embeddings, file_path):
-        """Uploads documents and their embeddings to the specified collection."""
+    def create_payload_indexes(self, collection_name):
+        """Indexes `file_path` as a keyword so per-file filters and deletes don't scan the whole collection.
+
+        Creating an index that already exists is a no-op, so this also upgrades older collections.
+        """
+        self.qdrant_client.create_payload_index(
+            collection_name=collection_name,
+            field_name='file_path',
+            field_schema=qdrant_models.PayloadSchemaType.KEYWORD,
+            wait=True
+        )
+
+    def upload_documents(self, collection_name, documents, embeddings, file_path, document_ids=None, row_hashes=None,
+                         point_ids=None):
+        """Uploads (upserts) documents and their embeddings to the specified collection.
+
+        `document_ids` are the row numbers of the documents within the file; they default to 1..n.
+        `row_hashes` are stored in the payload. With `point_ids`, existing points are overwritten
+        in place; without them Qdrant assigns random IDs.
+        """
         try:
-            payload = [{'document_id': i + 1, 'text': doc, 'file_path': file_path} for i, doc in enumerate(documents)]
+            document_ids = document_ids or range(1, len(documents) + 1)
+            payload = [{'document_id': doc_id, 'text': doc, 'file_path': file_path}
+                       for doc_id, doc in zip(document_ids, documents)]
+            if row_hashes is not None:
+                for point_payload, row_hash in zip(payload, row_hashes):
+                    point_payload['row_hash'] = row_hash
 
             result = self.qdrant_client.upload_collection(
                 collection_name=collection_name,
                 vectors=embeddings,
                 payload=payload,
-                ids=None,
+                ids=point_ids,
                 batch_size=64
             )
             self.logger.info(f"Uploaded {len(documents)} documents to collection '{collection_name}' from file {file_path}.")
@@ -49,73 +106,94 @@ class QdrantUtils:
             self.logger.error(f"Error uploading documents to collection '{collection_name}': {str(e)}")
             raise
 
-    def delete_points_by_file_path(self, qdrant_url, collection_name, file_path, max_retries=3, backoff_factor=2):
-        """Deletes points from a Qdrant collection based on file_path filter using HTTP POST."""
-        scroll_url = f"{qdrant_url}/collections/{collection_name}/points/scroll"
-        delete_url = f"{qdrant_url}/collections/{collection_name}/points/delete"
-        search_payload = {
-            "filter": {
-                "must": [
-                    {"key": "file_path", "match": {"value": file_path}}
-                ]
-            },
-            "limit": 1,
-            "with_payload": False,
-            "with_vector": False
-        }
-        delete_payload = {
-            "filter": {
-                "must": [
-                    {"key": "file_path", "match": {"value": file_path}}
-                ]
-            }
-        }
-
-        for attempt in range(1, max_retries + 1):
-            try:
-                response = requests.post(scroll_url, json=search_payload, timeout=10)
-                response.raise_for_status()
-                scroll_data = response.json()
-
-                if not scroll_data.get("result", {}).get("points"):
-                    self.logger.info("No matching points found for deletion.")
-                    return False
-
-                delete_response = requests.post(delete_url, json=delete_payload, timeout=10)
-                delete_response.raise_for_status()
+    def bump_collection_version(self, collection_name):
+        """Stamps a new version for the collection so API-side caches drop stale responses."""
+        version_collection = f"{collection_name}{VERSION_COLLECTION_SUFFIX}"
+        try:
+            if not self.qdrant_client.collection_exists(version_collection):
+                self.qdrant_client.create_collection(
+                    collection_name=version_collection,
+                    vectors_config=qdrant_models.VectorParams(size=1, distance='Dot')
+                )
+            version = time.time_ns()
+            self.qdrant_client.upsert(
+                collection_name=version_collection,
+                points=[qdrant_models.PointStruct(id=VERSION_POINT_ID, vector=[1.0], payload={'version': version})],
+                wait=True
+            )
+            self.logger.info(f"Bumped version of collection '{collection_name}' to {version}.")
+            return version
+        except Exception as e:
+            self.logger.error(f"Error bumping version of collection '{collection_name}': {str(e)}")
+            return None
 
-                delete_data = delete_response.json()
-                operation_id = delete_data["result"]["operation_id"]
-                status = delete_data["result"]["status"]
+    def delete_points_by_ids(self, collection_name, point_ids, batch_size=1000):
+        """Deletes the given points, waiting until the deletion is applied."""
+        try:
+            for start in range(0, len(point_ids), batch_size):
+                self.qdrant_client.delete(
+                    collection_name=collection_name,
+                    points_selector=qdrant_models.PointIdsList(points=point_ids[start:start + batch_size]),
+                    wait=True
+                )
+            self.logger.info(f"Deleted {len(point_ids)} points from '{collection_name}'.")
+        except Exception as e:
+            self.logger.error(f"Error deleting points from '{collection_name}': {str(e)}")
+            raise
 
-                self.logger.info(f"Delete operation initiated. Operation ID: {operation_id}, Status: {status}")
-                if status == "acknowledged":
-                    self.logger.info(f"Delete operation for {file_path} successfully acknowledged.")
-                    return True
+    def delete_points_by_file_path_except(self, collection_name, file_path, keep_ids):
+        """Deletes the points of a file except `keep_ids`, e.g. points uploaded before IDs were deterministic."""
+        try:
+            self.qdrant_client.delete(
+                collection_name=collection_name,
+                points_selector=qdrant_models.FilterSelector(filter=qdrant_models.Filter(
+                    must=[qdrant_models.FieldCondition(key='file_path', match=qdrant_models.MatchValue(value=file_path))],
+                    must_not=[qdrant_models.HasIdCondition(has_id=keep_ids)]
+                )),
+                wait=True
+            )
+            self.logger.info(f"Deleted points of {file_path} not among its {len(keep_ids)} current rows.")
+        except Exception as e:
+            self.logger.error(f"Error deleting outdated points of {file_path} from '{collection_name}': {str(e)}")
+            raise
 
-                self.logger.error(f"Unexpected delete status: {status}")
-                return False
+    def delete_points_by_file_paths(self, collection_name, file_paths, batch_size=256):
+        """Deletes all points of the given files with one filtered delete per `batch_size` files.
 
-            except HTTPError as http_err:
-                self.logger.error(f"HTTP error on attempt {attempt}/{max_retries}: {http_err}")
-            except RequestException as req_err:
-                self.logger.error(f"Request exception on attempt {attempt}/{max_retries}: {req_err}")
-            except Exception as err:
-                self.logger.error(f"Unexpected error on attempt {attempt}/{max_retries}: {err}")
+        Uses the `file_path` payload index and waits until the deletion is applied, so callers
+        can rely on it being visible without sleeping.
+        """
+        try:
+            for start in range(0, len(file_paths), batch_size):
+                self.qdrant_client.delete(
+                    collection_name=collection_name,
+                    points_selector=qdrant_models.FilterSelector(filter=qdrant_models.Filter(must=[
+                        qdrant_models.FieldCondition(key='file_path',
+                                                     match=qdrant_models.MatchAny(any=file_paths[start:start + batch_size]))
+                    ])),
+                    wait=True
+                )
+            self.logger.info(f"Deleted points of {len(file_paths)} files from '{collection_name}'.")
+        except Exception as e:
+            self.logger.error(f"Error deleting points of {len(file_paths)} files from '{collection_name}': {str(e)}")
+            raise
 
-            if attempt < max_retries:
-                sleep_time = backoff_factor ** attempt
-                self.logger.info(f"Retrying in {sleep_time} seconds...")
-                time.sleep(sleep_time)
+    def delete_points_by_file_path(self, qdrant_url, collection_name, file_path):
+        """Deletes the points of a single file; returns False if the deletion failed."""
+        try:
+            self.delete_points_by_file_paths(collection_name, [file_path])
+            return True
+        except Exception:
+            return False
 
-        self.logger.error("Max retries exceeded. Deletion failed.")
-        return False
+    def get_document_count(self, collection_name, max_retries=3, backoff_factor=2, exact=True):
+        """Fetch the document count for a specified collection with retry logic and exception handling.
 
-    def get_document_count(self, collection_name, max_retries=3, backoff_factor=2):
-        """Fetch the document count for a specified collection with retry logic and exception handling."""
+        `exact=False` returns Qdrant's cheap estimate instead of counting every point.
+        """
         url = f"{self.qdrant_url}/collections/{collection_name}/points/count"
         headers = {"Content-Type": "application/json"}
-        payload = {"exact": True}
+        payload = {"exact": exact}
 
         for attempt in range(1, max_retries + 1):
             try:
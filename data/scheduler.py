@@ -5,6 +5,7 @@ import schedule
 import logging
 import os
 from file_uploader_to_qdrant import FileUploaderToQdrant
+from file_watcher import FileWatcher
 
 # Load environment variables for directory and URL
 qdrant_url = os.getenv('QDRANT_URL', 'http://localhost:6333')
@@ -22,7 +23,11 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 # Configuration constants
-RUN_INTERVAL = 10  # Run interval in seconds
+RUN_INTERVAL = 10  # Run interval in seconds (poll mode)
+# "watch" syncs files on inotify events and sweeps every SYNC_SWEEP_SECONDS; "poll" syncs every RUN_INTERVAL.
+UPLOADER_MODE = os.getenv('UPLOADER_MODE', 'watch')
+WATCH_DEBOUNCE_SECONDS = float(os.getenv('WATCH_DEBOUNCE_SECONDS', '2'))
+SYNC_SWEEP_SECONDS = float(os.getenv('SYNC_SWEEP_SECONDS', '300'))
 
 # Initialize the FileUploaderToQdrant
 uploader = FileUploaderToQdrant(qdrant_url=qdrant_url, mounted_dir=mounted_dir)
@@ -36,12 +41,18 @@ def scheduled_job():
     except Exception as e:
         logger.exception(f"Job failed: {e}")
 
-# Schedule the job
-schedule.every(RUN_INTERVAL).seconds.do(scheduled_job)
-
-# Run the scheduled job indefinitely
+# Run the watcher or the scheduled job indefinitely
 if __name__ == "__main__":
-    logger.info("Starting scheduler for Qdrant file uploader.")
-    while True:
-        schedule.run_pending()
-        time.sleep(1)
+    try:
+        if UPLOADER_MODE == "watch":
+            logger.info("Starting file watcher for Qdrant file uploader.")
+            FileWatcher(uploader, uploader.files_location, WATCH_DEBOUNCE_SECONDS, SYNC_SWEEP_SECONDS).run()
+        else:
+            logger.info("Starting scheduler for Qdrant file uploader.")
+            schedule.every(RUN_INTERVAL).seconds.do(scheduled_job)
+            while True:
+                schedule.run_pending()
+                time.sleep(1)
+    finally:
+        # Stop encoder worker processes and free their shared memory on exit (including Ctrl+C)
+        uploader.close()
@@ -0,0 +1,49 @@
+# tests/test_embedding_store.py
+
+import tempfile
+import unittest
+from unittest.mock import MagicMock
+import numpy as np
+from app.embedding_store import EmbeddingStore, StoreBackedEncoder
+
+
+def fake_encode(texts):
+    return np.array([[len(text), 1.0] for text in texts], dtype=np.float32)
+
+
+class TestEmbeddingStore(unittest.TestCase):
+    def test_reuses_stored_embeddings_across_reloads(self):
+        with tempfile.TemporaryDirectory() as store_dir:
+            encode = MagicMock(side_effect=fake_encode)
+            store = EmbeddingStore(store_dir, 'org/model')
+            first = store.encode(['a', 'bb', 'a'], encode)
+
+            # Duplicates within a call are encoded once
+            encode.assert_called_once_with(['a', 'bb'])
+            np.testing.assert_array_equal(first[:, 0], [1.0, 2.0, 1.0])
+
+            reloaded = EmbeddingStore(store_dir, 'org/model', merge_threshold=1)
+            encode.reset_mock()
+            second = reloaded.encode(['bb', 'ccc'], encode)
+
+            encode.assert_called_once_with(['ccc'])
+            np.testing.assert_array_equal(second[:, 0], [2.0, 3.0])
+            self.assertEqual(reloaded.stats()['hits'], 1)
+            self.assertEqual(reloaded.stats()['rows'], 3)
+
+    def test_truncates_partial_rows(self):
+        with tempfile.TemporaryDirectory() as store_dir:
+            store = EmbeddingStore(store_dir, 'model')
+            store.encode(['a', 'bb'], fake_encode)
+            # Simulate a crash after the vector of a third row was written but not its key
+            with open(store.vectors_path, 'ab') as f:
+                f.write(np.zeros(2, dtype=np.float32).tobytes())
+
+            reloaded = EmbeddingStore(store_dir, 'model')
+            self.assertEqual(reloaded.rows, 2)
+            encoder = StoreBackedEncoder(MagicMock(), reloaded)
+            np.testing.assert_array_equal(encoder.encode(['bb'])[:, 0], [2.0])
+
+
+if __name__ == '__main__':
+    unittest.main()
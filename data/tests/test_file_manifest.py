@@ -0,0 +1,50 @@
+# tests/test_file_manifest.py
+
+import os
+import tempfile
+import unittest
+from app.file_manifest import FileManifest, hash_file, point_ids
+
+
+class TestFileManifest(unittest.TestCase):
+    def test_point_ids_are_stable(self):
+        ids = point_ids('/mnt/data/files/file1.csv', ['a', 'b', 'a'])
+
+        # Identical rows get distinct IDs; an unchanged row keeps its ID when others change
+        self.assertEqual(len(set(ids)), 3)
+        self.assertEqual(point_ids('/mnt/data/files/file1.csv', ['c', 'a', 'b'])[1:], ids[:2])
+        self.assertNotEqual(point_ids('/mnt/data/files/file2.csv', ['a'])[0], ids[0])
+
+    def test_detects_modified_file(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            csv_file = os.path.join(tmp_dir, 'file1.csv')
+            with open(csv_file, 'w') as file:
+                file.write('Context|Question|Answer\n')
+            manifest = FileManifest(os.path.join(tmp_dir, 'manifest.json'))
+            manifest.update('file1.csv', csv_file, hash_file(csv_file), ['a'])
+
+            # Touching without changing the content is not a modification
+            os.utime(csv_file, ns=(0, 0))
+            self.assertTrue(manifest.is_unchanged('file1.csv', csv_file))
+
+            with open(csv_file, 'a') as file:
+                file.write('context|question|answer\n')
+            self.assertFalse(manifest.is_unchanged('file1.csv', csv_file))
+
+            # Entries survive a reload
+            self.assertEqual(FileManifest(manifest.path).get('file1.csv')['rows'], ['a'])
+
+    def test_adopts_legacy_checklist(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            checklist = os.path.join(tmp_dir, 'uploaded_files_checklist.txt')
+            with open(checklist, 'w') as file:
+                file.write('file1.csv\nfile2.csv\n')
+
+            manifest = FileManifest(os.path.join(tmp_dir, 'manifest.json'), legacy_checklist=checklist)
+
+            self.assertEqual(manifest.files(), {'file1.csv', 'file2.csv'})
+            self.assertIsNone(manifest.get('file1.csv')['rows'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -17,23 +17,19 @@ class TestFileUploaderToQdrant(unittest.TestCase):
         files = self.uploader.list_csv_files()
         self.assertEqual(files, ['file1.csv', 'file2.csv'])
 
-    @patch('builtins.open', new_callable=mock_open, read_data='file1.csv\nfile2.csv\n')
-    def test_read_checklist(self, mock_file):
-        uploaded_files = self.uploader.read_checklist()
-        self.assertEqual(uploaded_files, {'file1.csv', 'file2.csv'})
-
-    @patch('builtins.open', new_callable=mock_open)
-    def test_update_checklist(self, mock_file):
-        self.uploader.update_checklist('file3.csv')
-        mock_file.assert_called_with(self.uploader.checklist_file, 'a')
-        mock_file().write.assert_called_with('file3.csv\n')
-
-    @patch('builtins.open', new_callable=mock_open, read_data='file1.csv\nfile2.csv\n')
-    def test_remove_from_checklist(self, mock_file):
-        with patch.object(self.uploader, 'read_checklist', return_value={'file1.csv', 'file2.csv'}):
-            self.uploader.remove_from_checklist('file1.csv')
-            mock_file.assert_called_with(self.uploader.checklist_file, 'w')
-            mock_file().write.assert_called_with('file2.csv\n')
+    def test_sync_skips_unchanged_files(self):
+        with patch.object(self.uploader, 'list_csv_files', return_value=['file1.csv', 'file2.csv']), \
+                patch.object(self.uploader.manifest, 'files', return_value={'file1.csv', 'old.csv'}), \
+                patch.object(self.uploader.manifest, 'is_unchanged', side_effect=lambda name, path: name == 'file1.csv'), \
+                patch.object(self.uploader.manifest, 'remove') as mock_remove, \
+                patch.object(self.uploader, 'upload_file_to_qdrant', return_value=True) as mock_upload, \
+                patch.object(self.uploader, 'delete_from_qdrant') as mock_delete, \
+                patch.object(self.uploader, 'qdrant_utils'):
+            self.uploader.sync_files_with_qdrant()
+
+        mock_upload.assert_called_once_with(os.path.join(self.uploader.files_location, 'file2.csv'))
+        mock_delete.assert_called_once_with(os.path.join(self.uploader.files_location, 'old.csv'))
+        mock_remove.assert_called_once_with('old.csv')
 
     @patch('file_uploader_to_qdrant.QdrantUtils')
     @patch('file_uploader_to_qdrant.SentenceTransformer')
@@ -48,13 +44,17 @@ class TestFileUploaderToQdrant(unittest.TestCase):
 
         # Mock reading the CSV file
         csv_content = 'Context|Question|Answer\nThis is context|This is question|This is answer\n'
-        with patch('builtins.open', new_callable=mock_open, read_data=csv_content):
+        with patch('builtins.open', new_callable=mock_open, read_data=csv_content), \
+                patch('file_uploader_to_qdrant.hash_file', return_value='sha256'), \
+                patch.object(self.uploader.manifest, 'get', return_value=None), \
+                patch.object(self.uploader.manifest, 'update') as mock_manifest_update:
             with patch('csv.DictReader', return_value=[{'Context': 'This is context', 'Question': 'This is question', 'Answer': 'This is answer'}]):
                 self.uploader.upload_file_to_qdrant('/mnt/data/files/file1.csv')
 
         # Assertions
         mock_model_instance.encode.assert_called_once()
         mock_qdrant_instance.upload_documents.assert_called_once()
+        mock_manifest_update.assert_called_once()
 
     # Additional tests can be added for other methods
 
@@ -0,0 +1,48 @@
+# tests/test_file_watcher.py
+
+import os
+import tempfile
+import threading
+import time
+import unittest
+from unittest.mock import MagicMock
+from app.file_watcher import DebouncedFileQueue, FileWatcher
+
+
+class TestFileWatcher(unittest.TestCase):
+    def test_debounce_waits_for_quiet_period(self):
+        queue = DebouncedFileQueue(debounce_seconds=0.2)
+        queue.touch('file1.csv')
+        self.assertEqual(queue.get_ready(timeout=0.05), [])
+
+        # Further events push the release back
+        queue.touch('file1.csv')
+        self.assertEqual(queue.get_ready(timeout=1.0), ['file1.csv'])
+        self.assertEqual(queue.pending(), 0)
+
+    def test_watcher_syncs_changed_files(self):
+        with tempfile.TemporaryDirectory() as files_dir:
+            uploader = MagicMock()
+            synced = threading.Event()
+            uploader.sync_files.side_effect = lambda names: synced.set()
+            watcher = FileWatcher(uploader, files_dir, debounce_seconds=0.1, sweep_seconds=3600)
+            thread = threading.Thread(target=watcher.run)
+            thread.start()
+            try:
+                time.sleep(0.2)
+                with open(os.path.join(files_dir, 'file1.csv'), 'w') as file:
+                    file.write('Context|Question|Answer\n')
+                with open(os.path.join(files_dir, 'notes.txt'), 'w') as file:
+                    file.write('ignored')
+                self.assertTrue(synced.wait(5))
+            finally:
+                watcher.stop()
+                thread.join(5)
+
+            # One initial consistency sweep, then a targeted sync of the CSV only
+            uploader.sync_files_with_qdrant.assert_called_once()
+            uploader.sync_files.assert_called_once_with(['file1.csv'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,55 @@
+# tests/test_ingest_pipeline.py
+
+import os
+import tempfile
+import threading
+import unittest
+from app.ingest_pipeline import IngestPipeline, iter_document_chunks
+
+
+class TestIngestPipeline(unittest.TestCase):
+    def test_iter_document_chunks(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            csv_file = os.path.join(tmp_dir, 'file1.csv')
+            with open(csv_file, 'w', encoding='utf-8') as file:
+                file.write('Context|Question|Answer\n')
+                for i in range(5):
+                    file.write(f'context {i}|question {i}|answer {i}\n')
+
+            chunks = list(iter_document_chunks(csv_file, chunk_size=2))
+
+        self.assertEqual([ids for ids, _ in chunks], [[1, 2], [3, 4], [5]])
+        self.assertEqual(chunks[0][1][0], 'Context: context 0\nQuestion: question 0\nAnswer: answer 0')
+
+    def test_pipeline_overlaps_encode_and_upload(self):
+        first_upload_started = threading.Event()
+        uploaded = []
+
+        def encode(documents):
+            # The second chunk is only encoded while the first one is uploading
+            if documents == ['c']:
+                self.assertTrue(first_upload_started.wait(5))
+            return [[float(len(doc))] for doc in documents]
+
+        def upload(document_ids, documents, embeddings):
+            first_upload_started.set()
+            uploaded.append((document_ids, embeddings))
+
+        pipeline = IngestPipeline(encode, upload, queue_depth=1)
+        stats = pipeline.run([([1, 2], ['a', 'bb']), ([3], ['c'])])
+
+        self.assertEqual(uploaded, [([1, 2], [[1.0], [2.0]]), ([3], [[1.0]])])
+        self.assertEqual(stats['encode']['rows'], 3)
+        self.assertEqual(stats['upload']['rows'], 3)
+
+    def test_pipeline_propagates_upload_errors(self):
+        def upload(document_ids, documents, embeddings):
+            raise RuntimeError('qdrant unavailable')
+
+        pipeline = IngestPipeline(lambda documents: [[0.0]] * len(documents), upload)
+        with self.assertRaises(RuntimeError):
+            pipeline.run([([1], ['a']), ([2], ['b'])])
+
+
+if __name__ == '__main__':
+    unittest.main()
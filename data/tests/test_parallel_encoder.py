@@ -0,0 +1,37 @@
+# tests/test_parallel_encoder.py
+
+import unittest
+import numpy as np
+from app.parallel_encoder import ParallelEncoder
+
+
+class FakeModel:
+    def get_sentence_embedding_dimension(self):
+        return 2
+
+    def encode(self, texts):
+        return np.array([[len(text), 1.0] for text in texts], dtype=np.float32)
+
+
+def load_fake_model(model_name, torch_threads):
+    return FakeModel()
+
+
+class TestParallelEncoder(unittest.TestCase):
+    def test_encode_across_workers(self):
+        encoder = ParallelEncoder('fake-model', workers=2, task_rows=3, model_loader=load_fake_model)
+        try:
+            texts = ['a' * i for i in range(10)]
+            embeddings = encoder.encode(texts)
+
+            # Rows come back in input order even though tasks ran on different workers
+            np.testing.assert_array_equal(embeddings[:, 0], np.arange(10, dtype=np.float32))
+            stats = encoder.stats()
+            self.assertEqual(sum(worker['rows'] for worker in stats), 10)
+            self.assertTrue(all(worker['rows'] > 0 for worker in stats))
+        finally:
+            encoder.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
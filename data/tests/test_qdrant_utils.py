@@ -2,7 +2,7 @@
 
 import unittest
 from unittest.mock import MagicMock, patch
-from app.qdrant_utils import QdrantUtils
+from app.qdrant_utils import QdrantUtils, build_quantization_config
 import os
 import numpy as np
 
@@ -41,6 +41,46 @@ class TestQdrantUtils(unittest.TestCase):
         self.assertTrue(result)
         mock_client_instance.delete.assert_called_once()
 
+    def test_5_delete_points_by_file_paths(self):
+        self.utils.qdrant_client = MagicMock()
+
+        self.utils.delete_points_by_file_paths('test_collection', ['/path/a.csv', '/path/b.csv'])
+
+        # One filtered delete for all files, applied before returning
+        self.utils.qdrant_client.delete.assert_called_once()
+        kwargs = self.utils.qdrant_client.delete.call_args.kwargs
+        self.assertTrue(kwargs['wait'])
+        self.assertEqual(kwargs['points_selector'].filter.must[0].match.any, ['/path/a.csv', '/path/b.csv'])
+
+    def test_6_create_collection_indexes_file_path(self):
+        self.utils.qdrant_client = MagicMock()
+        self.utils.qdrant_client.get_collections.return_value.collections = []
+
+        self.utils.create_collection_if_not_exists('test_collection', 300)
+
+        self.utils.qdrant_client.create_payload_index.assert_called_once()
+        self.assertEqual(self.utils.qdrant_client.create_payload_index.call_args.kwargs['field_name'], 'file_path')
+
+    def test_7_create_collection_with_quantization_and_hnsw_options(self):
+        self.utils.qdrant_client = MagicMock()
+        self.utils.qdrant_client.get_collections.return_value.collections = []
+
+        self.utils.create_collection_if_not_exists('test_collection', 300, quantization='scalar', on_disk=True,
+                                                   hnsw_m=32, hnsw_ef_construct=200)
+
+        kwargs = self.utils.qdrant_client.create_collection.call_args.kwargs
+        self.assertTrue(kwargs['vectors_config'].on_disk)
+        self.assertEqual(kwargs['hnsw_config'].m, 32)
+        self.assertEqual(kwargs['hnsw_config'].ef_construct, 200)
+        self.assertEqual(kwargs['quantization_config'].scalar.type, 'int8')
+        self.assertTrue(kwargs['quantization_config'].scalar.always_ram)
+
+    def test_8_build_quantization_config(self):
+        self.assertIsNone(build_quantization_config('none'))
+        self.assertTrue(build_quantization_config('binary').binary.always_ram)
+        with self.assertRaises(ValueError):
+            build_quantization_config('pq')
+
     @patch('qdrant_utils.QdrantClient')
     def test_4_get_document_count(self, mock_qdrant_client):
         mock_client_instance = mock_qdrant_client.return_value